@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from modules.db.core import engine, execute_one, read_df
+
+# Durumlar: queued -> running -> done | failed
+DDL = """
+CREATE TABLE IF NOT EXISTS jobs (
+  id BIGSERIAL PRIMARY KEY,
+  kind TEXT NOT NULL,
+  params TEXT,
+  status TEXT NOT NULL DEFAULT 'queued',
+  progress REAL DEFAULT 0,
+  message TEXT,
+  result TEXT,
+  error TEXT,
+  worker TEXT,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  created_at TIMESTAMP DEFAULT NOW(),
+  started_at TIMESTAMP,
+  heartbeat_at TIMESTAMP,
+  finished_at TIMESTAMP
+);
+"""
+
+INDEX_DDL = "CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs (status, id);"
+
+# Bir işin en fazla deneme sayısı; işçisini tekrar tekrar öldüren iş sonsuza dek alınmaz
+MAX_ATTEMPTS = 3
+
+# Kalp atışı kesilmiş ve deneme hakkı bitmiş işler yeniden alınmaz, başarısız sayılır
+EXPIRE = """
+UPDATE jobs
+   SET status = 'failed',
+       error = COALESCE(error, '') || 'İşçi yanıt vermedi; deneme sınırı (' || attempts || ') aşıldı.',
+       finished_at = NOW()
+ WHERE status = 'running'
+   AND attempts >= :max_attempts
+   AND heartbeat_at < NOW() - make_interval(secs => :stale_after);
+"""
+
+# Sıradaki işi kilitleyip sahiplenir; SKIP LOCKED sayesinde birden çok işçi aynı
+# işi almaz ve birbirini beklemez. Kalp atışı `stale_after` saniyeden eski
+# 'running' işler (ölen işçi) deneme hakkı kaldıkça yeniden alınır.
+CLAIM = """
+UPDATE jobs
+   SET status = 'running',
+       worker = :worker,
+       attempts = attempts + 1,
+       started_at = COALESCE(started_at, NOW()),
+       heartbeat_at = NOW()
+ WHERE id = (
+       SELECT id FROM jobs
+        WHERE status = 'queued'
+           OR (status = 'running' AND attempts < :max_attempts
+               AND heartbeat_at < NOW() - make_interval(secs => :stale_after))
+        ORDER BY id
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1)
+RETURNING id, kind, params, attempts;
+"""
+
+PROGRESS = """
+UPDATE jobs SET progress = COALESCE(CAST(:progress AS REAL), progress),
+       message = COALESCE(:message, message), heartbeat_at = NOW()
+ WHERE id = :id AND worker = :worker;
+"""
+
+HEARTBEAT = "UPDATE jobs SET heartbeat_at = NOW() WHERE id = :id AND worker = :worker AND status = 'running';"
+
+FINISH = """
+UPDATE jobs SET status = :status, result = :result, error = :error,
+       progress = CASE WHEN :status = 'done' THEN 1 ELSE progress END,
+       finished_at = NOW(), heartbeat_at = NOW()
+ WHERE id = :id AND worker = :worker;
+"""
+
+def ensure_table():
+    execute_one(DDL)
+    execute_one(INDEX_DDL)
+
+
+def enqueue(kind: str, params: Optional[Dict[str, Any]] = None) -> int:
+    """Yeni iş ekler; iş kimliğini döner."""
+    with engine.begin() as conn:
+        return conn.execute(
+            text("INSERT INTO jobs(kind, params) VALUES (:kind, :params) RETURNING id"),
+            {"kind": kind, "params": json.dumps(params or {}, ensure_ascii=False, default=str)},
+        ).scalar_one()
+
+
+def claim(worker: str, stale_after: int = 600, max_attempts: int = MAX_ATTEMPTS) -> Optional[dict]:
+    """Sıradaki işi `worker` adına alır; iş yoksa None."""
+    params = {"worker": worker, "stale_after": stale_after, "max_attempts": max_attempts}
+    with engine.begin() as conn:
+        conn.execute(text(EXPIRE), params)
+        row = conn.execute(text(CLAIM), params).mappings().fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    job["params"] = json.loads(job["params"] or "{}")
+    return job
+
+
+def report_progress(job_id: int, worker: str, progress: Optional[float] = None,
+                    message: Optional[str] = None) -> None:
+    """İlerleme / mesaj günceller (None olan alan korunur) ve kalp atışını yeniler."""
+    if progress is not None:
+        progress = max(0.0, min(1.0, float(progress)))
+    execute_one(PROGRESS, {"id": job_id, "worker": worker, "progress": progress, "message": message})
+
+
+def heartbeat(job_id: int, worker: str) -> bool:
+    """Kalp atışını yeniler; iş artık bu işçide değilse False."""
+    return execute_one(HEARTBEAT, {"id": job_id, "worker": worker}) != 0
+
+
+def finish(job_id: int, worker: str, result: Any = None) -> bool:
+    """İşi 'done' yapar; iş başka işçiye geçmişse (satır eşleşmez) False."""
+    return execute_one(FINISH, {"id": job_id, "worker": worker, "status": "done",
+                                "result": json.dumps(result, ensure_ascii=False, default=str),
+                                "error": None}) != 0
+
+
+def fail(job_id: int, worker: str, error: str) -> bool:
+    return execute_one(FINISH, {"id": job_id, "worker": worker, "status": "failed",
+                                "result": None, "error": error}) != 0
+
+
+def load_jobs(limit: int = 20, kind: Optional[str] = None) -> pd.DataFrame:
+    """Son işler (yeniden eskiye)."""
+    sql = ("SELECT id, kind, status, progress, message, error, result, worker, attempts, "
+           "created_at, started_at, finished_at FROM jobs")
+    params: Dict[str, Any] = {"limit": limit}
+    if kind is not None:
+        sql += " WHERE kind = :kind"
+        params["kind"] = kind
+    return read_df(sql + " ORDER BY id DESC LIMIT :limit", params)
+
+
+def active_job(kind: str) -> Optional[int]:
+    """Aynı türde bekleyen / çalışan iş varsa kimliği (çift tıklamaya karşı)."""
+    df = read_df("SELECT id FROM jobs WHERE kind = :kind AND status IN ('queued', 'running') "
+                 "ORDER BY id LIMIT 1", {"kind": kind})
+    return None if df.empty else int(df["id"].iat[0])
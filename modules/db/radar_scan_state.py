@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from modules.db.core import execute_many, execute_one, read_df
+from modules.finance.data_loader import workbook_fingerprint, workbook_path
+from modules.finance.data_service import financial_data_service
+from modules.logger import logger
+from modules.scoring import registry
+from modules.scoring.result_cache import content_hash, radar_row_hash
+
+DDL = """
+CREATE TABLE IF NOT EXISTS radar_scan_state (
+  hisse TEXT PRIMARY KEY,
+  workbook_mtime BIGINT,
+  workbook_size BIGINT,
+  workbook_hash TEXT,
+  radar_hash TEXT NOT NULL,
+  scorer_versions TEXT,
+  scanned_at TIMESTAMP DEFAULT NOW()
+);
+"""
+
+UPSERT = """
+INSERT INTO radar_scan_state(hisse, workbook_mtime, workbook_size, workbook_hash, radar_hash, scorer_versions, scanned_at)
+VALUES (:hisse, :workbook_mtime, :workbook_size, :workbook_hash, :radar_hash, :scorer_versions, NOW())
+ON CONFLICT (hisse)
+DO UPDATE SET
+  workbook_mtime  = EXCLUDED.workbook_mtime,
+  workbook_size   = EXCLUDED.workbook_size,
+  workbook_hash   = EXCLUDED.workbook_hash,
+  radar_hash      = EXCLUDED.radar_hash,
+  scorer_versions = EXCLUDED.scorer_versions,
+  scanned_at      = NOW();
+"""
+
+STATE_COLUMNS = ["workbook_mtime", "workbook_size", "workbook_hash", "radar_hash", "scorer_versions"]
+
+
+def ensure_table():
+    execute_one(DDL)
+
+
+def load_scan_state() -> pd.DataFrame:
+    """Son başarılı radar_scores kaydındaki şirket durumları (index: hisse)."""
+    df = read_df(f"SELECT hisse, {', '.join(STATE_COLUMNS)} FROM radar_scan_state")
+    return df.set_index("hisse")
+
+
+def scorer_versions(params: Optional[dict] = None) -> str:
+    """Taramadaki skorlayıcıların sürümleri; bir skorlayıcı değişince tüm şirketler bayatlar."""
+    params = params or {"forecast_years": 5, "n_sims": 1000}
+    versions = {s.name: s.version for s in registry.plan(None, params).scorers}
+    return json.dumps(versions, sort_keys=True)
+
+
+def _fingerprint(symbol: str, row: pd.Series, base_dir: Path, known: Optional[pd.Series],
+                 versions: str) -> dict:
+    state = {"hisse": symbol, "workbook_mtime": None, "workbook_size": None, "workbook_hash": None,
+             "radar_hash": radar_row_hash(row), "scorer_versions": versions}
+    path = workbook_path(symbol, base_dir)
+    if path.exists():
+        fp = workbook_fingerprint(path)
+        state["workbook_mtime"], state["workbook_size"] = fp["mtime_ns"], fp["size"]
+        same_stat = (known is not None and known["workbook_mtime"] == fp["mtime_ns"]
+                     and known["workbook_size"] == fp["size"])
+        # mtime/boyut aynıysa içerik özeti yeniden hesaplanmaz
+        state["workbook_hash"] = known["workbook_hash"] if same_stat else content_hash(path)
+    return state
+
+
+def split_stale(radar: pd.DataFrame, state: Optional[pd.DataFrame] = None,
+                base_dir: Optional[Path] = None, full: bool = False) -> Tuple[pd.DataFrame, Dict[str, dict], int]:
+    """
+    Radar'ı bayat şirketlere indirger.
+
+    Bir şirket; çalışma kitabının içeriği, radar satırı ve skorlayıcı sürümleri son
+    kayıttakiyle aynıysa günceldir. Dönüş: bayat şirketlerin radar satırları,
+    bunların güncel parmak izleri (kayıttan sonra `save_scan_state`'e verilir)
+    ve atlanan güncel şirket sayısı. `full=True` tüm şirketleri bayat sayar (tam
+    tarama yine de parmak izlerini kaydeder).
+    """
+    if full:
+        state = pd.DataFrame(columns=STATE_COLUMNS)
+    elif state is None:
+        state = load_scan_state()
+    base_dir = Path(base_dir or financial_data_service.base_dir)
+    versions = scorer_versions()
+
+    firsts = radar.dropna(subset=["Şirket"]).drop_duplicates("Şirket")
+    stale, fingerprints = [], {}
+    for _, row in firsts.iterrows():
+        symbol = row["Şirket"]
+        known = state.loc[symbol] if symbol in state.index else None
+        fp = _fingerprint(symbol, row, base_dir, known, versions)
+        fresh = (known is not None and fp["workbook_hash"] is not None
+                 and all(known[col] == fp[col] for col in ("workbook_hash", "radar_hash", "scorer_versions")))
+        if not fresh:
+            stale.append(symbol)
+            fingerprints[symbol] = fp
+
+    n_fresh = len(firsts) - len(stale)
+    if not full:
+        logger.info(f"Artımlı tarama: {len(stale)} şirket taranacak, {n_fresh} şirket güncel (atlandı)")
+    return radar[radar["Şirket"].isin(stale)], fingerprints, n_fresh
+
+
+def save_scan_state(fingerprints: Dict[str, dict], symbols) -> int:
+    """Kaydı başarılı olan şirketlerin parmak izlerini yazar."""
+    rows = [fingerprints[s] for s in symbols if s in fingerprints]
+    return execute_many(UPSERT, rows)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import SCAN_CHUNK_SIZE
+from modules.db.core import execute_many, execute_one, fetch_value, read_df
+from modules.logger import logger
+from modules.scanner import ScanEvent, iter_scan
+
+DDL = """
+CREATE TABLE IF NOT EXISTS scan_runs (
+  run_id TEXT PRIMARY KEY,
+  params TEXT,
+  total INTEGER,
+  status TEXT NOT NULL DEFAULT 'running',
+  started_at TIMESTAMP DEFAULT NOW(),
+  finished_at TIMESTAMP
+);
+"""
+
+CHECKPOINT_DDL = """
+CREATE TABLE IF NOT EXISTS scan_checkpoints (
+  run_id TEXT NOT NULL REFERENCES scan_runs(run_id) ON DELETE CASCADE,
+  hisse TEXT NOT NULL,
+  seq INTEGER,
+  record TEXT,
+  error TEXT,
+  category TEXT,
+  finished_at TIMESTAMP DEFAULT NOW(),
+  UNIQUE(run_id, hisse)
+);
+"""
+
+UPSERT_RUN = """
+INSERT INTO scan_runs(run_id, params, total, status, started_at)
+VALUES (:run_id, :params, :total, 'running', NOW())
+ON CONFLICT (run_id)
+DO UPDATE SET
+  total  = EXCLUDED.total,
+  status = 'running';
+"""
+
+UPSERT_CHECKPOINT = """
+INSERT INTO scan_checkpoints(run_id, hisse, seq, record, error, category, finished_at)
+VALUES (:run_id, :hisse, :seq, :record, :error, :category, NOW())
+ON CONFLICT (run_id, hisse)
+DO UPDATE SET
+  seq         = EXCLUDED.seq,
+  record      = EXCLUDED.record,
+  error       = EXCLUDED.error,
+  category    = EXCLUDED.category,
+  finished_at = NOW();
+"""
+
+FINISH_RUN = "UPDATE scan_runs SET status = 'done', finished_at = NOW() WHERE run_id = :run_id"
+
+
+def ensure_table():
+    execute_one(DDL)
+    execute_one(CHECKPOINT_DDL)
+
+
+def new_run_id() -> str:
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+def latest_open_run() -> Optional[str]:
+    """Bitmemiş en son tarama (devam ettirilebilir), yoksa None."""
+    return fetch_value(
+        "SELECT run_id FROM scan_runs WHERE status = 'running' ORDER BY started_at DESC LIMIT 1"
+    )
+
+
+def load_checkpoints(run_id: str) -> pd.DataFrame:
+    return read_df(
+        "SELECT hisse, seq, record, error, category FROM scan_checkpoints WHERE run_id = :run_id ORDER BY seq",
+        {"run_id": run_id},
+    )
+
+
+def _to_json(record: dict) -> str:
+    def plain(v):
+        if isinstance(v, np.generic):
+            return v.item()
+        if isinstance(v, (pd.Timestamp, datetime)):
+            return v.isoformat()
+        return v
+    return json.dumps({k: plain(v) for k, v in record.items()}, ensure_ascii=False)
+
+
+def _start_run(run_id: str, params: dict, total: int) -> None:
+    stored = fetch_value("SELECT params FROM scan_runs WHERE run_id = :run_id", {"run_id": run_id})
+    encoded = json.dumps(params, sort_keys=True)
+    if stored is not None and stored != encoded:
+        raise ValueError(f"{run_id}: tarama farklı parametrelerle başlatılmış ({stored})")
+    execute_many(UPSERT_RUN, [{"run_id": run_id, "params": encoded, "total": total}])
+
+
+def iter_checkpointed_scan(
+        radar: pd.DataFrame,
+        run_id: Optional[str] = None,
+        *,
+        flush_every: int = SCAN_CHUNK_SIZE,
+        forecast_years: int = 5,
+        n_sims: int = 1000,
+        scorers: Optional[Sequence[str]] = None,
+        **scan_kwargs,
+) -> Iterator[ScanEvent]:
+    """
+    `iter_scan` + kalıcı kontrol noktaları.
+
+    Biten her şirketin sonucu (kayıt ya da hata) `scan_checkpoints`'e en geç
+    `flush_every` şirkette bir yazılır. Aynı `run_id` ile yeniden çağrıldığında
+    tamamlanan şirketler taranmaz; kayıtlı sonuçları önce, kalan şirketlerin
+    sonuçları ardından verilir. Tüm şirketler bitince koşu 'done' olarak işaretlenir.
+    """
+    ensure_table()
+    run_id = run_id or new_run_id()
+    params = {"forecast_years": forecast_years, "n_sims": n_sims,
+              "scorers": list(scorers) if scorers is not None else None}
+    companies = set(radar["Şirket"].dropna())
+    total = len(companies)
+    _start_run(run_id, params, total)
+
+    done_df = load_checkpoints(run_id)
+    completed = set(done_df["hisse"])
+    done = 0
+    for row in done_df.itertuples(index=False):
+        if row.hisse not in companies:
+            continue
+        done += 1
+        record = json.loads(row.record) if row.record else None
+        yield ScanEvent(row.hisse, record, row.error, row.category, done, total)
+    if completed:
+        logger.info(f"{run_id}: {done} şirket kontrol noktasından alındı, {total - done} şirket taranacak")
+
+    pending: List[Dict] = []
+
+    def flush():
+        if pending:
+            execute_many(UPSERT_CHECKPOINT, pending)
+            pending.clear()
+
+    remaining = radar[~radar["Şirket"].isin(completed)]
+    try:
+        for event in iter_scan(remaining, forecast_years=forecast_years, n_sims=n_sims,
+                               scorers=scorers, **scan_kwargs):
+            done += 1
+            pending.append({
+                "run_id": run_id, "hisse": event.hisse, "seq": done,
+                "record": _to_json(event.record) if event.ok else None,
+                "error": event.error, "category": event.category,
+            })
+            if len(pending) >= flush_every:
+                flush()
+            yield ScanEvent(event.hisse, event.record, event.error, event.category, done, total,
+                            timings=event.timings)
+    finally:
+        # Kesintide (hata, durdurma, üreticinin kapanması) bitenler kaybolmaz
+        flush()
+
+    execute_one(FINISH_RUN, {"run_id": run_id})
+    logger.info(f"{run_id}: tarama tamamlandı ({total} şirket)")
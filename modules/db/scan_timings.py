@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from modules.db.core import execute_many, execute_one, read_df
+from modules.scoring.timing import summarize_timings
+
+DDL = """
+CREATE TABLE IF NOT EXISTS scan_timings (
+  run_id TEXT NOT NULL,
+  hisse TEXT NOT NULL,
+  stage TEXT NOT NULL,
+  wall_s DOUBLE PRECISION,
+  cpu_s DOUBLE PRECISION,
+  created_at TIMESTAMP DEFAULT NOW()
+);
+"""
+
+INSERT = """
+INSERT INTO scan_timings(run_id, hisse, stage, wall_s, cpu_s, created_at)
+VALUES (:run_id, :hisse, :stage, :wall_s, :cpu_s, NOW());
+"""
+
+
+def ensure_table():
+    execute_one(DDL)
+
+
+def save_scan_timings(timings: pd.DataFrame, run_id: Optional[str] = None) -> str:
+    """run_scan'in aşama sürelerini ekler; run_id verilmezse zaman damgası kullanılır."""
+    ensure_table()
+    run_id = run_id or f"{datetime.now():%Y%m%d-%H%M%S}"
+    if not timings.empty:
+        rows = timings.assign(run_id=run_id).to_dict("records")
+        for r in rows:
+            r["wall_s"], r["cpu_s"] = float(r["wall_s"]), float(r["cpu_s"])
+        execute_many(INSERT, rows)
+    return run_id
+
+
+def load_scan_timings(run_id: str) -> pd.DataFrame:
+    return read_df("SELECT hisse, stage, wall_s, cpu_s FROM scan_timings WHERE run_id = :run_id",
+                   {"run_id": run_id})
+
+
+def compare_runs(*run_ids: str) -> pd.DataFrame:
+    """Koşuların aşama özetleri yan yana (sütunlar: run_id, değerler: toplam duvar süresi)."""
+    totals = {r: summarize_timings(load_scan_timings(r))["wall_total"] for r in run_ids}
+    return pd.DataFrame(totals)
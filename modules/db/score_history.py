@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import COMPANIES_DIR
+from modules.db.core import execute_many, execute_one, read_df
+from modules.finance.ttm import get_ttm_engine
+from modules.finance.universe import get_universe
+from modules.logger import logger
+from modules.scoring.history import HISTORY_COLUMNS, score_history_frame
+
+DDL = """
+CREATE TABLE IF NOT EXISTS score_history (
+  hisse TEXT NOT NULL,
+  period TEXT NOT NULL,
+  prev_period TEXT,
+  f_skor INTEGER,
+  m_skor NUMERIC,
+  updated_at TIMESTAMP DEFAULT NOW(),
+  UNIQUE(hisse, period)
+);
+"""
+
+UPSERT = """
+INSERT INTO score_history(hisse, period, prev_period, f_skor, m_skor, updated_at)
+VALUES (:hisse, :period, :prev_period, :f_skor, :m_skor, NOW())
+ON CONFLICT (hisse, period)
+DO UPDATE SET
+  prev_period = EXCLUDED.prev_period,
+  f_skor      = EXCLUDED.f_skor,
+  m_skor      = EXCLUDED.m_skor,
+  updated_at  = NOW();
+"""
+
+
+def ensure_table():
+    execute_one(DDL)
+
+
+def load_score_history(symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Kayıtlı skor geçmişi (hisse, dönem); `symbols` verilirse yalnızca o hisseler."""
+    sql = "SELECT hisse, period, prev_period, f_skor, m_skor FROM score_history"
+    params = None
+    if symbols is not None:
+        sql += " WHERE hisse = ANY(:syms)"
+        params = {"syms": list(symbols)}
+    return read_df(sql, params)
+
+
+def existing_periods() -> set:
+    """Tabloda zaten olan (hisse, period) çiftleri."""
+    df = read_df("SELECT hisse, period FROM score_history")
+    return set(zip(df["hisse"], df["period"]))
+
+
+def save_score_history(df: pd.DataFrame) -> int:
+    if df is None or df.empty:
+        return 0
+    rows = df[HISTORY_COLUMNS].replace({np.nan: None}).to_dict("records")
+    for r in rows:
+        if r["f_skor"] is not None:
+            r["f_skor"] = int(r["f_skor"])
+    return execute_many(UPSERT, rows)
+
+
+def backfill_score_history(base_dir: Path = Path(COMPANIES_DIR), full: bool = False) -> pd.DataFrame:
+    """
+    Tüm şirketlerin geçmiş F/M skorlarını hesaplayıp score_history'ye yazar.
+
+    Varsayılan olarak yalnızca tabloda olmayan (hisse, dönem) çiftleri hesaplanır;
+    `full=True` tüm geçmişi yeniden hesaplar. Dönüş: yazılan satırlar.
+    """
+    ensure_table()
+    known = set() if full else existing_periods()
+    universe = get_universe(base_dir)
+    df = score_history_frame(universe, known, engine=get_ttm_engine(base_dir))
+    save_score_history(df)
+    logger.info(f"Skor geçmişi: {len(df)} yeni satır, {len(known)} kayıt atlandı")
+    return df
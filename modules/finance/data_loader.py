@@ -1,18 +1,138 @@
 
-import pandas as pd
+"""Fintables workbook loading with a columnar (Parquet) statement cache."""
+from __future__ import annotations
+
+import json
+import os
 from pathlib import Path
-from config import COMPANIES_DIR
+from typing import List, Optional
+
+import pandas as pd
+
+from config import COMPANIES_DIR, STATEMENT_CACHE_DIR
+from modules.finance.fintables_reader import (
+    BALANCE_SHEET, INCOME_SHEET, CASHFLOW_SHEET,
+    read_fintables_workbook, read_period_header,
+)
+from modules.logger import logger
+
+# Cache dosya adı -> Excel sayfa adı (dönüş sırası: bilanço, gelir, nakit akış)
+SHEETS = {
+    "bilanco":  BALANCE_SHEET,
+    "gelir":    INCOME_SHEET,
+    "cashflow": CASHFLOW_SHEET,
+}
+
+META_FILE = "meta.json"
+
+
+def workbook_path(symbol: str, base_dir: Path = Path(COMPANIES_DIR)) -> Path:
+    """Return the expected `<TICKER> (TRY).xlsx` path for a ticker."""
+    return Path(base_dir) / symbol / f"{symbol} (TRY).xlsx"
+
+
+def workbook_fingerprint(path: Path) -> dict:
+    """Cache key of a workbook: resolved path, mtime (ns) and size."""
+    stat = path.stat()
+    return {
+        "path": str(path.resolve()),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    # Parquet yalnızca str kolon adı kabul eder; dönem etiketleri zaten str.
+    df.columns = [str(c) for c in df.columns]
+    df["Kalem"] = df["Kalem"].astype(str).str.strip()
+    return df
 
-def load_financial_data(symbol: str, base_dir: Path = Path(COMPANIES_DIR)):
-    """Load Bilanço, Gelir Tablosu (Çeyreklik) and Nakit Akış (Çeyreklik) sheets for a ticker."""
-    path = base_dir / symbol / f"{symbol} (TRY).xlsx"
+
+def _read_meta(symbol: str, fingerprint: dict, cache_dir: Path) -> Optional[dict]:
+    meta_path = Path(cache_dir) / symbol / META_FILE
+    if not meta_path.exists():
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    return meta if meta.get("source") == fingerprint else None
+
+
+def _read_cache(symbol: str, fingerprint: dict, cache_dir: Path) -> Optional[tuple]:
+    folder = Path(cache_dir) / symbol
+    try:
+        if _read_meta(symbol, fingerprint, cache_dir) is None:
+            return None
+        return tuple(pd.read_parquet(folder / f"{key}.parquet") for key in SHEETS)
+    except Exception as e:
+        logger.warning(f"{symbol}: tablo önbelleği okunamadı, Excel'den yüklenecek → {e}")
+        return None
+
+
+def _write_cache(symbol: str, fingerprint: dict, frames: tuple, periods: list,
+                 cache_dir: Path) -> None:
+    folder = Path(cache_dir) / symbol
+    try:
+        folder.mkdir(parents=True, exist_ok=True)
+        # Önce geçici dosyalara yaz, sonra atomik olarak yer değiştir;
+        # meta.json en son yazıldığı için yarım kalan cache hiçbir zaman geçerli sayılmaz.
+        for key, df in zip(SHEETS, frames):
+            tmp = folder / f"{key}.parquet.{os.getpid()}.tmp"
+            df.to_parquet(tmp)
+            os.replace(tmp, folder / f"{key}.parquet")
+        tmp = folder / f"{META_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"source": fingerprint, "periods": periods}, f, ensure_ascii=False)
+        os.replace(tmp, folder / META_FILE)
+    except Exception as e:
+        # Cache en iyi çaba esaslı: yazılamazsa sadece Excel'den okumaya devam ederiz.
+        logger.warning(f"{symbol}: tablo önbelleği yazılamadı → {e}")
+
+
+def load_financial_data(
+    symbol: str,
+    base_dir: Path = Path(COMPANIES_DIR),
+    *,
+    use_cache: bool = True,
+    cache_dir: Path = Path(STATEMENT_CACHE_DIR),
+    engine: str = "openpyxl",
+):
+    """Load Bilanço, Gelir Tablosu (Çeyreklik) and Nakit Akış (Çeyreklik) sheets for a ticker.
+
+    The first read of a workbook is persisted as one Parquet file per sheet under
+    `cache_dir/<TICKER>/`; later calls read those files as long as the workbook's
+    path, mtime and size are unchanged. Cache misses open the workbook once via
+    `read_fintables_workbook` (`engine="calamine"` for the faster Rust reader).
+    """
+    path = workbook_path(symbol, base_dir)
     if not path.exists():
         raise FileNotFoundError(f"{path} not found")
-    bilanco  = pd.read_excel(path, sheet_name="Bilanço")
-    gelir    = pd.read_excel(path, sheet_name="Gelir Tablosu (Çeyreklik)")
-    cashflow = pd.read_excel(path, sheet_name="Nakit Akış (Çeyreklik)")
 
-    for df in (bilanco, gelir, cashflow):
-        df['Kalem'] = df['Kalem'].astype(str).str.strip()
+    fingerprint = workbook_fingerprint(path)
+    if use_cache:
+        cached = _read_cache(symbol, fingerprint, cache_dir)
+        if cached is not None:
+            return cached
+
+    wb = read_fintables_workbook(path, engine=engine)
+    frames = tuple(_normalize(df) for df in (wb.balance, wb.income, wb.cashflow))
+    if use_cache:
+        _write_cache(symbol, fingerprint, frames, wb.periods, cache_dir)
 
+    bilanco, gelir, cashflow = frames
     return bilanco, gelir, cashflow
+
+
+def read_workbook_periods(path: Path, cache_dir: Path = Path(STATEMENT_CACHE_DIR)) -> List[str]:
+    """Return the Bilanço period header of a workbook, newest first.
+
+    Uses the statement cache when it matches the file; otherwise only the
+    header row is streamed from the workbook.
+    """
+    path = Path(path)
+    try:
+        meta = _read_meta(path.parent.name, workbook_fingerprint(path), cache_dir)
+        if meta is not None and "periods" in meta:
+            return list(meta["periods"])
+    except Exception:
+        pass
+    return read_period_header(path)
@@ -0,0 +1,144 @@
+
+"""Process-wide, thread-safe memo of Fintables statements (bounded LRU, mtime invalidated)."""
+from __future__ import annotations
+
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from config import COMPANIES_DIR
+from modules.finance.data_loader import load_financial_data, workbook_fingerprint, workbook_path
+from modules.finance.line_items import CanonicalStatements, resolve_statements
+
+Statements = Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]
+
+DEFAULT_MAXSIZE = 128
+
+
+class FinancialDataService:
+    """Serve `(bilanco, gelir, cashflow)` per ticker, parsing each workbook once.
+
+    Entries are keyed by ticker and validated against the workbook's mtime/size
+    on every access, so a re-downloaded file is reloaded transparently. Callers
+    get copies and may mutate them freely.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE,
+                 base_dir: Path = Path(COMPANIES_DIR),
+                 loader: Callable[..., Statements] = load_financial_data):
+        self.maxsize = maxsize
+        self.base_dir = Path(base_dir)
+        self._loader = loader
+        self._entries: "OrderedDict[str, Tuple[dict, Statements]]" = OrderedDict()
+        self._canonical: Dict[str, Tuple[dict, CanonicalStatements]] = {}
+        self._lock = threading.RLock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loads: Counter = Counter()
+
+    # ------------------------------------------------------------------
+    def get(self, symbol: str) -> Statements:
+        _, frames = self._frames(symbol)
+        return tuple(df.copy() for df in frames)
+
+    def get_canonical(self, symbol: str) -> CanonicalStatements:
+        """Statements resolved to canonical line items; shared, treat as read-only."""
+        fingerprint, frames = self._frames(symbol)
+        with self._lock:
+            entry = self._canonical.get(symbol)
+            if entry is not None and entry[0] == fingerprint:
+                return entry[1]
+        canon = resolve_statements(*frames)
+        with self._lock:
+            if symbol in self._entries:
+                self._canonical[symbol] = (fingerprint, canon)
+        return canon
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                self._canonical.clear()
+            else:
+                self._entries.pop(symbol, None)
+                self._canonical.pop(symbol, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "loads": dict(self.loads),
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+            self.loads.clear()
+
+    # ------------------------------------------------------------------
+    def _frames(self, symbol: str) -> Tuple[dict, Statements]:
+        path = workbook_path(symbol, self.base_dir)
+        if not path.exists():
+            self.invalidate(symbol)
+            raise FileNotFoundError(f"{path} not found")
+
+        fingerprint = workbook_fingerprint(path)
+        frames = self._lookup(symbol, fingerprint)
+        if frames is None:
+            # Aynı hisse için eşzamanlı istekler tek bir parse'ı bekler
+            with self._key_lock(symbol):
+                fingerprint = workbook_fingerprint(path)
+                frames = self._lookup(symbol, fingerprint, count=False)
+                if frames is None:
+                    frames = self._loader(symbol, self.base_dir)
+                    self._store(symbol, fingerprint, frames)
+        return fingerprint, frames
+
+    def _key_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(symbol, threading.Lock())
+
+    def _lookup(self, symbol: str, fingerprint: dict, count: bool = True) -> Optional[Statements]:
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(symbol)
+                if count:
+                    self.hits += 1
+                return entry[1]
+            if count:
+                self.misses += 1
+            return None
+
+    def _store(self, symbol: str, fingerprint: dict, frames: Statements) -> None:
+        with self._lock:
+            self.loads[symbol] += 1
+            self._entries[symbol] = (fingerprint, tuple(frames))
+            self._entries.move_to_end(symbol)
+            self._canonical.pop(symbol, None)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._canonical.pop(evicted, None)
+                self.evictions += 1
+
+
+financial_data_service = FinancialDataService()
+
+
+def get_financial_data(symbol: str) -> Statements:
+    """Memoized drop-in for `load_financial_data(symbol)` shared by the whole process."""
+    return financial_data_service.get(symbol)
+
+
+def get_canonical_data(symbol: str) -> CanonicalStatements:
+    """Memoized `resolve_statements(*get_financial_data(symbol))`."""
+    return financial_data_service.get_canonical(symbol)
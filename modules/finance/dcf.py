@@ -1,9 +1,17 @@
 
 """Discounted Cash Flow (DCF) simulations (vectorized & jump-diffusion)."""
 from __future__ import annotations
-from typing import Optional
+from typing import NamedTuple, Optional, Sequence, Union
 import numpy as np
 
+# 2: tarama MOS'u monte_carlo_dcf_batch (np.random.default_rng) ile hesaplanır
+SCORER_VERSION = "2"
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+# Toplu simülasyonda bir parçadaki en fazla (şirket × simülasyon) hücre sayısı
+MAX_BATCH_CELLS = 2_000_000
+
 def monte_carlo_dcf_simple(
     last_fcf: float,
     forecast_years: int = 5,
@@ -43,6 +51,91 @@ def monte_carlo_dcf_simple(
 
     return pv_fcfs + pv_tv
 
+class DCFSummary(NamedTuple):
+    """Per-company summary of `monte_carlo_dcf_batch` (rows follow the input order)."""
+    median: np.ndarray      # (n,)
+    quantiles: np.ndarray   # (n, len(levels))
+    levels: tuple
+
+
+def _draw_rates(rng: np.random.Generator, wacc_mu, wacc_sigma, g_mu, g_sigma, n_sims: int):
+    """(rows × n_sims) WACC / g draws with the same validity rule as `monte_carlo_dcf_simple`.
+
+    Every round draws one shared standard-normal pair per simulation, and each
+    row keeps the first valid pair of its slot. A company's draws therefore
+    depend only on the seed and its own parameters, not on the other rows of
+    the batch or the chunk it falls into.
+    """
+    rows = np.broadcast(wacc_mu, wacc_sigma, g_mu, g_sigma).shape[0]
+    waccs = np.empty((rows, n_sims))
+    gs = np.empty((rows, n_sims))
+    pending = np.ones((rows, n_sims), dtype=bool)
+    while pending.any():
+        z_wacc, z_g = rng.standard_normal((2, n_sims))
+        w = np.clip(wacc_mu + wacc_sigma * z_wacc, 0.01, None)
+        g = g_mu + g_sigma * z_g
+        w, g = np.broadcast_arrays(w, g)
+        ok = pending & ~((g >= w - 0.01) | (g < -0.05) | (g > 0.15))
+        waccs[ok], gs[ok] = w[ok], g[ok]
+        pending &= ~ok
+    return waccs, gs
+
+
+def monte_carlo_dcf_batch(
+    last_fcfs: ArrayLike,
+    forecast_years: int = 5,
+    n_sims: int = 10_000,
+    wacc_mu: ArrayLike = 0.15, wacc_sigma: ArrayLike = 0.03,
+    g_mu: ArrayLike = 0.04, g_sigma: ArrayLike = 0.01,
+    seed: Optional[int] = 42,
+    quantiles: Sequence[float] = (0.05, 0.25, 0.75, 0.95),
+    max_cells: int = MAX_BATCH_CELLS,
+) -> DCFSummary:
+    """Monte-Carlo DCF of many companies at once (same model as `monte_carlo_dcf_simple`).
+
+    `last_fcfs` is a vector of TTM FCFs; the rate parameters are scalars or
+    per-company vectors. The (companies × n_sims) value matrix is simulated in
+    row chunks of at most `max_cells` cells, and only the median and the
+    requested `quantiles` of every row are kept. NaN FCF gives NaN.
+    """
+    fcfs = np.asarray(last_fcfs, dtype=float).reshape(-1)
+    n = len(fcfs)
+    levels = tuple(float(q) for q in quantiles)
+    median = np.full(n, np.nan)
+    summary = np.full((n, len(levels)), np.nan)
+    if n == 0:
+        return DCFSummary(median, summary, levels)
+
+    per_company = [np.ndim(p) > 0 for p in (wacc_mu, wacc_sigma, g_mu, g_sigma)]
+    params = [np.broadcast_to(np.asarray(p, dtype=float), (n,)) if vec else float(p)
+              for p, vec in zip((wacc_mu, wacc_sigma, g_mu, g_sigma), per_company)]
+
+    years = np.arange(1, forecast_years + 1)
+    seeds = np.random.SeedSequence(seed)
+    chunk = max(1, max_cells // max(1, n_sims))
+    shared = None
+    for start in range(0, n, chunk):
+        rows = slice(start, min(start + chunk, n))
+        # Tüm parametreler skaler ise çekilişler (ve birim FCF başına değer) paylaşılır
+        if any(per_company) or shared is None:
+            rng = np.random.default_rng(seeds)
+            args = [p[rows, None] if vec else np.full((1, 1), p) for p, vec in zip(params, per_company)]
+            waccs, gs = _draw_rates(rng, *args, n_sims)
+            ratio = (1 + gs[..., None]) / (1 + waccs[..., None])
+            pv_unit = (ratio ** years).sum(axis=-1)
+            tv_unit = (1 + gs) ** (forecast_years + 1) / (waccs - gs) / (1 + waccs) ** forecast_years
+            unit = pv_unit + tv_unit
+            if not any(per_company):
+                shared = unit
+        else:
+            unit = shared
+        values = fcfs[rows, None] * unit
+        stats = np.quantile(values, (0.5,) + levels, axis=1)
+        median[rows] = stats[0]
+        summary[rows] = stats[1:].T
+    return DCFSummary(median, summary, levels)
+
+
 def monte_carlo_dcf_jump_diffusion(
     last_fcf: float,
     forecast_years: int = 5,
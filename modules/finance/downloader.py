@@ -1,4 +1,3 @@
-import re
 import json
 import time
 from pathlib import Path
@@ -10,12 +9,10 @@ from selenium.webdriver.common.by import By # type: ignore
 from selenium.webdriver.support.ui import WebDriverWait # type: ignore
 from selenium.webdriver.support import expected_conditions as EC # type: ignore
 from modules.logger import logger 
+from modules.finance.data_loader import read_workbook_periods
 
 from config import COMPANIES_DIR, SON_BILANCOLAR_JSON, DOWNLOADS_DIR, TARGET_PERIOD
 
-
-PERIOD_RE = re.compile(r"^\d{4}/\d{1,2}$")     # 2025/3, 2024/12 vb.
-
 def is_bilanco_outdated(excel_path: Path, target: str = TARGET_PERIOD) -> bool:
     """
     Dosya yoksa - veya - içindeki son dönem TARGET_PERIOD değilse True döner.
@@ -24,14 +21,8 @@ def is_bilanco_outdated(excel_path: Path, target: str = TARGET_PERIOD) -> bool:
         return True
 
     try:
-        # Sadece başlık satırını oku – satırlara gerek yok
-        cols = pd.read_excel(excel_path, sheet_name="Bilanço", nrows=0).columns
-        # “Kalem”, “Unnamed: …”, boş hücreleri ve hedef regex’e uymayanları at
-        period_cols = [
-            str(c).strip()
-            for c in cols
-            if PERIOD_RE.match(str(c).strip())
-        ]
+        # Önbellek güncelse dönemler oradan gelir; değilse sadece başlık satırı okunur
+        period_cols = read_workbook_periods(excel_path)
         if not period_cols:
             # Hiç dönem sütunu bulunamadıysa dosya bozuk say
             return True
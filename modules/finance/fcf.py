@@ -3,22 +3,22 @@
 from __future__ import annotations
 import pandas as pd
 
-from modules.finance.data_loader import load_financial_data
+from modules.finance.data_service import get_financial_data
+from modules.finance.line_items import ITEMS_BY_ID
 from modules.logger import logger
 from .utils import validate_market_cap, sort_period_index, ensure_unique_ordered
 
 def _load_income_cashflow(company: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Load income and cashflow dataframes with 'Kalem' as index."""
-    _, income_df, cashflow_df = load_financial_data(company)
+    _, income_df, cashflow_df = get_financial_data(company)
     income_df = income_df.set_index("Kalem")
     cashflow_df = cashflow_df.set_index("Kalem")
     return income_df, cashflow_df
 
 def _select_capex(cashflow_df: pd.DataFrame) -> pd.Series:
-    if "Maddi ve Maddi Olmayan Duran Varlık Alımları" in cashflow_df.index:
-        return cashflow_df.loc["Maddi ve Maddi Olmayan Duran Varlık Alımları"]
-    if "Yatırım Faaliyetlerinden Kaynaklanan Nakit Akışları" in cashflow_df.index:
-        return cashflow_df.loc["Yatırım Faaliyetlerinden Kaynaklanan Nakit Akışları"]
+    for label in ITEMS_BY_ID["capex"].aliases:
+        if label in cashflow_df.index:
+            return cashflow_df.loc[label]
     raise ValueError("CAPEX verisi bulunamadı.")
 
 def fcf_yield_series(company: str, row) -> pd.Series:
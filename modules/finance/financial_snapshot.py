@@ -1,11 +1,13 @@
 # financial_snapshot.py
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import Iterable, List, Optional
+import numpy as np
 import pandas as pd
-from modules.utils import get_value   # mevcut yardımcı işleviniz
+from modules.finance.line_items import (BALANCE, CASHFLOW, INCOME, ITEM_INDEX,
+                                        CanonicalStatements, resolve_statements)
 # ------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class FinancialSnapshot:
     # ---------- Balance‑sheet ----------
     short_term_liabilities:    Optional[float] = None   # Toplam Kısa Vadeli Yükümlülükler
@@ -31,53 +33,92 @@ class FinancialSnapshot:
     net_profit:                Optional[float] = None   # Dönem Karı (Zararı)
 
 
+# Alan -> canonical kalem (total_liabilities = kısa + uzun, ayrıca hesaplanır)
+FIELD_ITEMS = {
+    "short_term_liabilities": "short_term_liabilities",
+    "long_term_liabilities":  "long_term_liabilities",
+    "total_assets":           "total_assets",
+    "current_assets":         "current_assets",
+    "equity":                 "equity",
+    "pp_e":                   "pp_e",
+    "trade_receivables":      "trade_receivables",
+    "sales":                  "sales",
+    "cogs":                   "cogs",
+    "gross_profit":           "gross_profit",
+    "g_and_a_exp":            "g_and_a_exp",
+    "marketing_exp":          "marketing_exp",
+    "revenue":                "revenue",
+    "operating_cash_flow":    "operating_cash_flow",
+    "depreciation":           "depreciation",
+    "net_profit":             "net_profit",
+}
+SNAPSHOT_FIELDS: List[str] = [f.name for f in fields(FinancialSnapshot)]
+CASHFLOW_FIELDS = ("operating_cash_flow", "depreciation")
+
+_FIELD_ROWS = np.array([ITEM_INDEX[FIELD_ITEMS[f]] for f in FIELD_ITEMS], dtype=np.intp)
+_FIELD_NAMES = list(FIELD_ITEMS)
+
+
+def snapshot_periods(canon: CanonicalStatements) -> List[str]:
+    """Periods a snapshot can be built for: in balance and income (and cash‑flow, if given)."""
+    mask = canon.statement_periods[BALANCE] & canon.statement_periods[INCOME]
+    if canon.statement_periods[CASHFLOW].any():
+        mask = mask & canon.statement_periods[CASHFLOW]
+    return [p for p, m in zip(canon.periods, mask) if m]
+
+
+def _period_columns(canon: CanonicalStatements, periods: Iterable[str]) -> np.ndarray:
+    valid = set(snapshot_periods(canon))
+    cols = []
+    for p in periods:
+        if p not in valid:
+            raise KeyError(p)
+        cols.append(canon.period_index[p])
+    return np.asarray(cols, dtype=np.intp)
+
+
+def snapshot_frame(canon: CanonicalStatements, periods: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Tüm snapshot alanlarını istenen dönemler için tek vektörel geçişte döndürür.
+    Satırlar dönem (varsayılan: `snapshot_periods`, eskiden yeniye), sütunlar `SNAPSHOT_FIELDS`.
+    Nakit akış tablosu verilmemişse nakit akış sütunları NaN olur.
+    """
+    periods = snapshot_periods(canon) if periods is None else list(periods)
+    cols = _period_columns(canon, periods)
+    block = canon.values[np.ix_(_FIELD_ROWS, cols)].T
+    df = pd.DataFrame(block, index=pd.Index(periods, name="period"), columns=_FIELD_NAMES)
+    df["total_liabilities"] = df["short_term_liabilities"] + df["long_term_liabilities"]
+    if not canon.statement_periods[CASHFLOW].any():
+        df[list(CASHFLOW_FIELDS)] = np.nan
+    return df[SNAPSHOT_FIELDS]
+
+
+def build_snapshots(balance_df, income_df, cashflow_df: Optional[pd.DataFrame] = None, *,
+                    periods: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """`build_snapshot`'ın çok dönemli hâli: dönem × alan DataFrame (bkz. `snapshot_frame`)."""
+    return snapshot_frame(resolve_statements(balance_df, income_df, cashflow_df), periods)
+
+
+def snapshot_from_canonical(canon: CanonicalStatements, period: str) -> FinancialSnapshot:
+    """
+    Önceden çözülmüş kalemlerden (bkz. `line_items.resolve_statements`) FinancialSnapshot üretir.
+    Kalemler tamsayı indeksle okunur; dönem bilanço veya gelir tablosunda yoksa KeyError.
+    """
+    col = _period_columns(canon, [period])[0]
+    values = canon.values[_FIELD_ROWS, col]
+    kwargs = dict(zip(_FIELD_NAMES, values))
+    kwargs["total_liabilities"] = kwargs["short_term_liabilities"] + kwargs["long_term_liabilities"]
+    if not canon.statement_periods[CASHFLOW].any():
+        for f in CASHFLOW_FIELDS:
+            kwargs[f] = None
+    return FinancialSnapshot(**kwargs)
+
+
 def build_snapshot(balance_df, income_df, cashflow_df: Optional[pd.DataFrame] = None, *, period: str) -> FinancialSnapshot:
     """
     Tüm kalemleri tek seferde okuyup FinancialSnapshot döndürür.
     `period` => '2024/12' formatında dönem etiketi.
+    Birden fazla dönem okunacaksa `build_snapshots` ya da bir kez `resolve_statements`
+    ile çözüp `snapshot_from_canonical` / `snapshot_frame` kullanın.
     """
-
-    # -------- Balance ----------
-    short = get_value(balance_df, "Toplam Kısa Vadeli Yükümlülükler", period)
-    long  = get_value(balance_df, "Toplam Uzun Vadeli Yükümlülükler",  period)
-
-    snapshot = FinancialSnapshot(
-        # Balance
-        short_term_liabilities = short,
-        long_term_liabilities  = long,
-        total_liabilities      = (short or 0) + (long or 0) if None not in (short, long) else None,
-        total_assets           = get_value(balance_df, "Toplam Varlıklar",         period),
-        current_assets         = get_value(balance_df, "Toplam Dönen Varlıklar",   period),
-        equity                 = (lambda primary: primary if primary not in (None, 0)
-                                  else get_value(balance_df, "Toplam Özkaynaklar", period))(
-                                      get_value(balance_df, "Ana Ortaklığa Ait Özkaynaklar", period)
-                                  ),
-        pp_e                   = get_value(balance_df, "Maddi Duran Varlıklar",    period),
-        trade_receivables      = get_value(balance_df, "Ticari Alacaklar",         period),
-
-        # Income
-        sales                  = get_value(income_df, "Satış Gelirleri",           period),
-        cogs                   = get_value(income_df, "Satışların Maliyeti (-)",   period),
-        gross_profit           = get_value(income_df,
-                                           ["Brüt Kar (Zarar)",
-                                            "Ticari Faaliyetlerden Brüt Kar (Zarar)"], period),
-        g_and_a_exp            = get_value(income_df, "Genel Yönetim Giderleri (-)", period),
-        marketing_exp          = get_value(income_df, "Pazarlama, Satış ve Dağıtım Giderleri (-)", period),
-        revenue                = get_value(income_df, "Toplam Hasılat",            period),
-        net_profit   = (
-            get_value(income_df, "Dönem Karı (Zararı)", period)
-            if income_df is not None else None
-        ),
-        # Cash‑flow
-        operating_cash_flow = (
-            get_value(cashflow_df, "İşletme Faaliyetlerinden Nakit Akışları", period)
-            if cashflow_df is not None else None
-        ),
-        depreciation = (
-            get_value(cashflow_df, "Amortisman ve İtfa Gideri İle İlgili Düzeltmeler", period)
-            if cashflow_df is not None else None
-        ),
-        
-    )
-
-    return snapshot
+    return snapshot_from_canonical(resolve_statements(balance_df, income_df, cashflow_df), period)
@@ -0,0 +1,117 @@
+
+"""Single-pass reader for Fintables workbooks (three statements + period header)."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+BALANCE_SHEET  = "Bilanço"
+INCOME_SHEET   = "Gelir Tablosu (Çeyreklik)"
+CASHFLOW_SHEET = "Nakit Akış (Çeyreklik)"
+STATEMENT_SHEETS = (BALANCE_SHEET, INCOME_SHEET, CASHFLOW_SHEET)
+
+PERIOD_RE = re.compile(r"^\d{4}/\d{1,2}$")     # 2025/3, 2024/12 vb.
+
+ENGINES = ("openpyxl", "calamine")
+
+
+@dataclass
+class FintablesWorkbook:
+    balance: pd.DataFrame
+    income: pd.DataFrame
+    cashflow: pd.DataFrame
+    periods: List[str] = field(default_factory=list)   # Bilanço başlığı, en yeni solda
+
+    @property
+    def latest_period(self) -> Optional[str]:
+        return self.periods[0] if self.periods else None
+
+
+def header_periods(columns) -> List[str]:
+    """Return the `YYYY/M` labels of a header row in their sheet order."""
+    return [str(c).strip() for c in columns if PERIOD_RE.match(str(c).strip())]
+
+
+def _convert_cell(cell):
+    # pandas' openpyxl okuyucusuyla aynı dönüşümler: boş -> "", hata -> NaN, tam sayı float -> int
+    value = cell.value
+    if value is None:
+        return ""
+    if cell.data_type == "e":
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _sheet_rows(ws, max_rows: Optional[int] = None) -> list:
+    rows, last_filled = [], -1
+    for i, row in enumerate(ws.iter_rows()):
+        if max_rows is not None and i >= max_rows:
+            break
+        values = [_convert_cell(c) for c in row]
+        while values and values[-1] == "":
+            values.pop()
+        if values:
+            last_filled = i
+        rows.append(values)
+    rows = rows[: last_filled + 1]
+    width = max((len(r) for r in rows), default=0)
+    return [r + [""] * (width - len(r)) for r in rows]
+
+
+def _rows_to_frame(rows: list) -> pd.DataFrame:
+    if not rows:
+        return pd.DataFrame()
+    return TextParser(rows, header=0).read()
+
+
+def _read_openpyxl(path: Path) -> FintablesWorkbook:
+    from openpyxl import load_workbook  # type: ignore
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        frames = [_rows_to_frame(_sheet_rows(wb[name])) for name in STATEMENT_SHEETS]
+    finally:
+        wb.close()
+    balance, income, cashflow = frames
+    return FintablesWorkbook(balance, income, cashflow, header_periods(balance.columns))
+
+
+def _read_calamine(path: Path) -> FintablesWorkbook:
+    # pandas >= 2.2 + python-calamine; dosya tek ExcelFile üzerinden bir kez açılır
+    with pd.ExcelFile(path, engine="calamine") as xls:
+        balance, income, cashflow = (xls.parse(name) for name in STATEMENT_SHEETS)
+    return FintablesWorkbook(balance, income, cashflow, header_periods(balance.columns))
+
+
+def read_fintables_workbook(path: Path, engine: str = "openpyxl") -> FintablesWorkbook:
+    """Open a Fintables export once and return all three statements and the period header.
+
+    `openpyxl` streams the sheets in read-only mode; `calamine` uses the Rust based
+    reader (optional `python-calamine` dependency) and is usually several times faster.
+    """
+    path = Path(path)
+    if engine == "openpyxl":
+        return _read_openpyxl(path)
+    if engine == "calamine":
+        return _read_calamine(path)
+    raise ValueError(f"Bilinmeyen Excel motoru: {engine} (seçenekler: {', '.join(ENGINES)})")
+
+
+def read_period_header(path: Path) -> List[str]:
+    """Read only the Bilanço header row (streaming) and return its period labels."""
+    from openpyxl import load_workbook  # type: ignore
+
+    wb = load_workbook(Path(path), read_only=True, data_only=True)
+    try:
+        rows = _sheet_rows(wb[BALANCE_SHEET], max_rows=1)
+    finally:
+        wb.close()
+    return header_periods(rows[0]) if rows else []
@@ -0,0 +1,192 @@
+
+"""Canonical line-item registry: every Fintables label variant -> one canonical item id.
+
+Statements are resolved once into a `CanonicalStatements` matrix (canonical item ×
+period); snapshot and ratio code then reads values by integer position instead of
+scanning `Kalem` with alias lists on every call.
+
+Resolution rules (per item, evaluated per period):
+  * aliases        – first alias whose row exists wins (same as `get_value`)
+  * components     – summed first; used when the sum is > 0, else the aliases
+                     (the "Toplam Hasılat" = Yurt İçi + Yurt Dışı special case)
+  * zero_fallback  – a 0 value falls through to the next alias
+A canonical item with no matching row resolves to 0, like `get_value`.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from modules.finance.statement_frame import StatementFrame
+from modules.finance.utils import sort_period_index
+
+BALANCE, INCOME, CASHFLOW = "balance", "income", "cashflow"
+STATEMENTS = (BALANCE, INCOME, CASHFLOW)
+
+Frame = Union[StatementFrame, pd.DataFrame, None]
+
+
+@dataclass(frozen=True)
+class LineItem:
+    id: str
+    statement: str
+    aliases: Tuple[str, ...] = ()
+    components: Tuple[str, ...] = ()
+    zero_fallback: bool = False
+
+
+LINE_ITEMS: Tuple[LineItem, ...] = (
+    # ---------- Balance‑sheet ----------
+    LineItem("total_assets",           BALANCE, ("Toplam Varlıklar", "Varlıklar Toplamı")),
+    LineItem("current_assets",         BALANCE, ("Toplam Dönen Varlıklar",)),
+    LineItem("short_term_liabilities", BALANCE, ("Toplam Kısa Vadeli Yükümlülükler",)),
+    LineItem("long_term_liabilities",  BALANCE, ("Toplam Uzun Vadeli Yükümlülükler",)),
+    LineItem("equity",                 BALANCE, ("Ana Ortaklığa Ait Özkaynaklar",
+                                                 "Toplam Özkaynaklar",
+                                                 "Özkaynaklar",
+                                                 "Özkaynaklar Toplamı",
+                                                 "Özkaynaklar (Toplam)"), zero_fallback=True),
+    LineItem("pp_e",                   BALANCE, ("Maddi Duran Varlıklar",)),
+    LineItem("trade_receivables",      BALANCE, ("Ticari Alacaklar",)),
+
+    # ---------- Income‑statement ----------
+    LineItem("sales",                  INCOME, ("Satış Gelirleri", "Hasılat", "Net Satışlar")),
+    LineItem("revenue",                INCOME, ("Toplam Hasılat",),
+             components=("Yurt İçi Satışlar", "Yurt Dışı Satışlar")),
+    LineItem("cogs",                   INCOME, ("Satışların Maliyeti (-)",)),
+    LineItem("gross_profit",           INCOME, ("Brüt Kar (Zarar)", "Ticari Faaliyetlerden Brüt Kar (Zarar)")),
+    LineItem("g_and_a_exp",            INCOME, ("Genel Yönetim Giderleri (-)",)),
+    LineItem("marketing_exp",          INCOME, ("Pazarlama, Satış ve Dağıtım Giderleri (-)",)),
+    LineItem("operating_profit",       INCOME, ("Esas Faaliyet Karı (Zararı)",
+                                                "Faaliyet Karı (Zararı)",
+                                                "Faaliyetlerden Kar (Zarar)")),
+    LineItem("net_profit",             INCOME, ("Dönem Karı (Zararı)", "Net Dönem Karı (Zararı)")),
+
+    # ---------- Cash‑flow ----------
+    LineItem("operating_cash_flow",    CASHFLOW, ("İşletme Faaliyetlerinden Nakit Akışları",)),
+    LineItem("depreciation",           CASHFLOW, ("Amortisman ve İtfa Gideri İle İlgili Düzeltmeler",
+                                                  "Amortisman ve İtfa Düzeltmeleri")),
+    LineItem("capex",                  CASHFLOW, ("Maddi ve Maddi Olmayan Duran Varlık Alımları",
+                                                  "Yatırım Faaliyetlerinden Kaynaklanan Nakit Akışları")),
+    LineItem("cf_net_profit",          CASHFLOW, ("Dönem Karı (Zararı)",)),
+)
+
+ITEMS_BY_ID: Dict[str, LineItem] = {item.id: item for item in LINE_ITEMS}
+ITEM_INDEX: Dict[str, int] = {item.id: i for i, item in enumerate(LINE_ITEMS)}
+ITEM_IDS: List[str] = [item.id for item in LINE_ITEMS]
+
+# (statement, Fintables etiketi) -> canonical id (bileşenler hariç)
+ALIAS_INDEX: Dict[Tuple[str, str], str] = {}
+for _item in LINE_ITEMS:
+    for _alias in _item.aliases:
+        ALIAS_INDEX.setdefault((_item.statement, _alias), _item.id)
+
+
+def canonical_id(label: str, statement: Optional[str] = None) -> Optional[str]:
+    """Map a Fintables label (or a canonical id) to its canonical id."""
+    if label in ITEMS_BY_ID:
+        return label
+    label = str(label).strip()
+    statements = (statement,) if statement else STATEMENTS
+    for st in statements:
+        cid = ALIAS_INDEX.get((st, label))
+        if cid is not None:
+            return cid
+    return None
+
+
+# ----------------------------------------------------------------------
+# Resolution
+# ----------------------------------------------------------------------
+def _resolve_item(item: LineItem, rows: Dict[str, int], values: np.ndarray) -> Tuple[np.ndarray, bool]:
+    n = values.shape[1]
+    found_aliases = [rows[a] for a in item.aliases if a in rows]
+
+    if item.zero_fallback:
+        out = np.zeros(n)
+        pending = np.ones(n, dtype=bool)
+        for pos in found_aliases:
+            row = values[pos]
+            take = pending & (row != 0)          # NaN != 0 → NaN de kabul edilir
+            out[take] = row[take]
+            pending &= ~take
+    else:
+        out = values[found_aliases[0]].copy() if found_aliases else np.zeros(n)
+
+    found = bool(found_aliases)
+    if item.components:
+        comp_rows = [rows[c] for c in item.components if c in rows]
+        if comp_rows:
+            total = values[comp_rows].sum(axis=0)   # NaN yayılır, tıpkı get_value gibi
+            use = total > 0
+            out = np.where(use, total, out)
+            found = True
+    return out, found
+
+
+class CanonicalStatements:
+    """Canonical item × period values of one company, resolved once.
+
+    Rows follow `LINE_ITEMS`, columns are the union of the statements' periods in
+    chronological order. A period missing from an item's statement is NaN.
+    """
+
+    def __init__(self, values: np.ndarray, periods: List[str], found: np.ndarray,
+                 statement_periods: Dict[str, np.ndarray]):
+        self.values = values
+        self.periods = periods
+        self.found = found
+        self.statement_periods = statement_periods
+        self.period_index = {p: i for i, p in enumerate(periods)}
+
+    def get(self, item_id: str, period: str) -> float:
+        return self.values[ITEM_INDEX[item_id], self.period_index[period]]
+
+    def row(self, item_id: str) -> np.ndarray:
+        return self.values[ITEM_INDEX[item_id]]
+
+    def column(self, period: str) -> np.ndarray:
+        return self.values[:, self.period_index[period]]
+
+    def has(self, item_id: str) -> bool:
+        """True if at least one alias/component row of the item exists."""
+        return bool(self.found[ITEM_INDEX[item_id]])
+
+    def series(self, item_id: str) -> pd.Series:
+        """Chronological series over the item's own statement periods; KeyError if absent."""
+        if not self.has(item_id):
+            raise KeyError(f"'{item_id}' kalemi bulunamadı")
+        mask = self.statement_periods[ITEMS_BY_ID[item_id].statement]
+        periods = [p for p, m in zip(self.periods, mask) if m]
+        return pd.Series(self.row(item_id)[mask], index=pd.Index(periods), name=item_id)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.values, index=ITEM_IDS, columns=self.periods)
+
+
+def resolve_statements(balance: Frame, income: Frame, cashflow: Frame = None) -> CanonicalStatements:
+    """Resolve the three Fintables statements into canonical items in one pass."""
+    frames = dict(zip(STATEMENTS, (StatementFrame.of(df) for df in (balance, income, cashflow))))
+    periods = sort_period_index({p for sf in frames.values() for p in sf.periods})
+    period_index = {p: i for i, p in enumerate(periods)}
+
+    values = np.full((len(LINE_ITEMS), len(periods)), np.nan)
+    found = np.zeros(len(LINE_ITEMS), dtype=bool)
+    statement_periods = {}
+    for statement, sf in frames.items():
+        rows, stmt_periods, matrix = sf.item_index, sf.periods, sf.values
+        cols = np.array([period_index[p] for p in stmt_periods], dtype=np.intp)
+        mask = np.zeros(len(periods), dtype=bool)
+        mask[cols] = True
+        statement_periods[statement] = mask
+        if not stmt_periods:
+            continue
+        for i, item in enumerate(LINE_ITEMS):
+            if item.statement != statement:
+                continue
+            resolved, found[i] = _resolve_item(item, rows, matrix)
+            values[i, cols] = resolved
+    return CanonicalStatements(values, periods, found, statement_periods)
@@ -0,0 +1,178 @@
+
+"""Universe-wide long-format statement panel: (company, statement, item, period) -> float."""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from config import COMPANIES_DIR
+from modules.finance.data_loader import load_financial_data, workbook_fingerprint, workbook_path
+from modules.finance.utils import sort_period_index
+from modules.logger import logger
+
+# import_financials_to_postgres ile aynı tablo adları
+STATEMENTS = ("balance", "income", "cashflow")
+INDEX_NAMES = ["company", "statement", "item", "period"]
+
+
+def list_companies(base_dir: Path = Path(COMPANIES_DIR)) -> List[str]:
+    """Tickers under `base_dir` that have a `<TICKER>/<TICKER> (TRY).xlsx` workbook."""
+    base_dir = Path(base_dir)
+    if not base_dir.exists():
+        return []
+    return sorted(d.name for d in base_dir.iterdir()
+                  if d.is_dir() and workbook_path(d.name, base_dir).is_file())
+
+
+def statements_to_long(company: str, balance: pd.DataFrame, income: pd.DataFrame,
+                       cashflow: pd.DataFrame) -> pd.DataFrame:
+    """Melt the three wide statements of one company into long rows.
+
+    Only period columns (`YYYY/M`) are kept. A label repeated within a statement
+    (e.g. `Ticari Alacaklar` under both current and non-current assets) keeps its
+    first row, the same row `get_value` would pick.
+    """
+    parts = []
+    for statement, df in zip(STATEMENTS, (balance, income, cashflow)):
+        if df is None or df.empty:
+            continue
+        periods = [c for c in df.columns if isinstance(c, str) and "/" in c]
+        wide = df.drop_duplicates(subset="Kalem", keep="first").set_index("Kalem")[periods]
+        long = wide.melt(ignore_index=False, var_name="period", value_name="value").reset_index()
+        long = long.rename(columns={"Kalem": "item"})
+        long["statement"] = statement
+        parts.append(long)
+    if not parts:
+        return pd.DataFrame(columns=INDEX_NAMES + ["value"])
+    out = pd.concat(parts, ignore_index=True)
+    out["company"] = company
+    out["value"] = pd.to_numeric(out["value"], errors="coerce").astype(float)
+    return out[INDEX_NAMES + ["value"]]
+
+
+class StatementPanel:
+    """All statements of all companies as one float Series with a sorted MultiIndex."""
+
+    def __init__(self, values: pd.Series, fingerprints: Optional[Dict[str, dict]] = None):
+        self.values = values.sort_index()
+        self.fingerprints = fingerprints or {}
+        self._by_item: Optional[pd.Series] = None
+        self._items: Optional[Dict[str, List[str]]] = None
+
+    @classmethod
+    def from_long(cls, long: pd.DataFrame, fingerprints: Optional[Dict[str, dict]] = None) -> "StatementPanel":
+        values = long.set_index(INDEX_NAMES)["value"].astype(float)
+        return cls(values, fingerprints)
+
+    @classmethod
+    def build(cls, companies: Optional[Iterable[str]] = None,
+              base_dir: Path = Path(COMPANIES_DIR),
+              loader: Callable = load_financial_data) -> "StatementPanel":
+        """Load every workbook (through the Parquet statement cache) into one panel."""
+        base_dir = Path(base_dir)
+        companies = list(companies) if companies is not None else list_companies(base_dir)
+        parts, fingerprints = [], {}
+        for c in companies:
+            try:
+                fingerprints[c] = workbook_fingerprint(workbook_path(c, base_dir))
+                parts.append(statements_to_long(c, *loader(c, base_dir)))
+            except Exception as e:
+                logger.warning(f"{c}: panele eklenemedi → {e}")
+        long = pd.concat(parts, ignore_index=True) if parts else statements_to_long("", None, None, None)
+        return cls.from_long(long, fingerprints)
+
+    # ------------------------------------------------------------------
+    @property
+    def companies(self) -> List[str]:
+        return list(self.values.index.get_level_values("company").unique())
+
+    @property
+    def periods(self) -> List[str]:
+        return sort_period_index(self.values.index.get_level_values("period").unique())
+
+    def items(self, statement: str) -> List[str]:
+        return self._statement_items().get(statement, [])
+
+    def _statement_items(self) -> Dict[str, List[str]]:
+        if self._items is None:
+            pairs = self.by_item.index.droplevel(["period", "company"]).unique()
+            self._items = {}
+            for statement, item in pairs:
+                self._items.setdefault(statement, []).append(item)
+        return self._items
+
+    @property
+    def by_item(self) -> pd.Series:
+        """Same values re-sorted as (statement, item, period, company) for cross-sections."""
+        if self._by_item is None:
+            self._by_item = (self.values
+                             .reorder_levels(["statement", "item", "period", "company"])
+                             .sort_index())
+        return self._by_item
+
+    def _statement_of(self, item: str) -> str:
+        items = self._statement_items()
+        for statement in STATEMENTS:
+            if item in items.get(statement, ()):
+                return statement
+        raise KeyError(f"'{item}' kalemi panelde bulunamadı")
+
+    # ------------------------------------------------------------------
+    def cross_section(self, item: str, period: str, statement: Optional[str] = None) -> pd.Series:
+        """One value per company, e.g. `Toplam Varlıklar` for `2025/6` (NaN if missing)."""
+        statement = statement or self._statement_of(item)
+        try:
+            s = self.by_item.loc[(statement, item, period)]
+        except KeyError:
+            s = pd.Series(dtype=float)
+        return s.reindex(self.companies).rename(item)
+
+    def item_frame(self, item: str, statement: Optional[str] = None) -> pd.DataFrame:
+        """Company × period matrix of one item, periods in chronological order."""
+        statement = statement or self._statement_of(item)
+        s = self.by_item.loc[(statement, item)]
+        wide = s.unstack("company").T
+        return wide.reindex(index=self.companies, columns=sort_period_index(wide.columns))
+
+    def company(self, company: str) -> Dict[str, pd.DataFrame]:
+        """Wide item × period frames of one company keyed by statement name."""
+        sub = self.values.loc[company]
+        out = {}
+        for statement in STATEMENTS:
+            if statement in sub.index.get_level_values("statement"):
+                wide = sub.loc[statement].unstack("period")
+                out[statement] = wide[sort_period_index(wide.columns)]
+        return out
+
+
+# ----------------------------------------------------------------------
+# Süreç içinde tek panel: evrendeki dosyalardan biri değişince yeniden kurulur
+# ----------------------------------------------------------------------
+_panel_lock = threading.Lock()
+_panel_cache: Dict[Path, Tuple[tuple, StatementPanel]] = {}
+
+
+def universe_version(base_dir: Path = Path(COMPANIES_DIR)) -> tuple:
+    """Hashable fingerprint of every workbook under `base_dir` (ticker, mtime, size)."""
+    base_dir = Path(base_dir)
+    out = []
+    for c in list_companies(base_dir):
+        fp = workbook_fingerprint(workbook_path(c, base_dir))
+        out.append((c, fp["mtime_ns"], fp["size"]))
+    return tuple(out)
+
+
+def get_panel(base_dir: Path = Path(COMPANIES_DIR)) -> StatementPanel:
+    """Return the memoized universe panel, rebuilding it if any workbook changed."""
+    base_dir = Path(base_dir)
+    version = universe_version(base_dir)
+    with _panel_lock:
+        cached = _panel_cache.get(base_dir)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        panel = StatementPanel.build([c for c, *_ in version], base_dir)
+        _panel_cache[base_dir] = (version, panel)
+        return panel
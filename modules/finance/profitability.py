@@ -5,42 +5,10 @@ import math
 import pandas as pd
 from typing import Dict, List, Optional
 
-from modules.finance.data_loader import load_financial_data
+from modules.finance.data_service import get_canonical_data
 from modules.utils import period_order
 
 
-def _ensure_index(df: pd.DataFrame) -> pd.DataFrame:
-    if df.index.name != "Kalem":
-        return df.set_index("Kalem")
-    return df
-
-
-def _series_from(df: pd.DataFrame, item: str) -> pd.Series:
-    if item not in df.index:
-        raise KeyError(f"'{item}' satırı bulunamadı")
-    s = df.loc[item]
-    # Keep only period-like columns
-    s = s[[c for c in s.index if isinstance(c, str) and "/" in c]].copy()
-    s = pd.to_numeric(s, errors="coerce")
-    # Sort by period chronologically
-    s = s[pd.Index(sorted(s.index, key=period_order))]
-    return s
-
-
-def _series_from_any(df: pd.DataFrame, items) -> pd.Series:
-    """Try multiple possible row names and return the first found series."""
-    if isinstance(items, str):
-        items = [items]
-    last_err = None
-    for name in items:
-        try:
-            return _series_from(df, name)
-        except Exception as e:
-            last_err = e
-            continue
-    raise last_err if last_err else KeyError("No matching row name found")
-
-
 def _yearly_sum(flow_q: pd.Series) -> pd.Series:
     # Sum quarterly values per calendar year
     groups: Dict[str, List[str]] = {}
@@ -84,38 +52,14 @@ def build_profitability_table(symbol: str, last_n_years: int = 7) -> pd.DataFram
       - ROE (%)
       - ROA (%)
     """
-    balance, income, _ = load_financial_data(symbol)
-    balance = _ensure_index(balance)
-    income = _ensure_index(income)
+    canon = get_canonical_data(symbol)
 
-    sales_q = _series_from_any(income, ["Satış Gelirleri", "Hasılat", "Net Satışlar"])  # satış alternatifleri
+    sales_q = canon.series("sales")
     # Net profit may exist in income; if not, it's typically present in cashflow too,
     # but for profitability ratios we use the income statement definition when available.
-    net_items = [
-        "Dönem Karı (Zararı)",
-        "Net Dönem Karı (Zararı)",
-    ]
-    for name in net_items:
-        if name in income.index:
-            net_q = _series_from(income, name)
-            break
-    else:
-        # Fallback: try a common cashflow label if income one is missing
-        _, _, cash = load_financial_data(symbol)
-        cash = _ensure_index(cash)
-        net_q = _series_from(cash, "Dönem Karı (Zararı)")
-
-    equity_q = _series_from_any(balance, [
-        "Ana Ortaklığa Ait Özkaynaklar",
-        "Toplam Özkaynaklar",
-        "Özkaynaklar",
-        "Özkaynaklar Toplamı",
-        "Özkaynaklar (Toplam)",
-    ])
-    assets_q = _series_from_any(balance, [
-        "Toplam Varlıklar",
-        "Varlıklar Toplamı",
-    ])
+    net_q = canon.series("net_profit" if canon.has("net_profit") else "cf_net_profit")
+    equity_q = canon.series("equity")
+    assets_q = canon.series("total_assets")
 
     sales_y = _yearly_sum(sales_q)
     net_y = _yearly_sum(net_q)
@@ -162,37 +106,20 @@ def build_profitability_ratios(symbol: str, last_n_years: int = 7) -> pd.DataFra
     Uses income, balance, and cashflow tables. EBITDA approximated as
     Esas/Faaliyet Kârı + Amortisman (nakit akışındaki düzeltmeler).
     """
-    balance, income, cashflow = load_financial_data(symbol)
-    balance = _ensure_index(balance)
-    income = _ensure_index(income)
-    cashflow = _ensure_index(cashflow)
+    canon = get_canonical_data(symbol)
 
     # Akış kalemleri (yıllık toplanır)
-    sales_q = _series_from_any(income, ["Satış Gelirleri", "Hasılat", "Net Satışlar"])  
-    net_q = _series_from_any(income, ["Dönem Karı (Zararı)", "Net Dönem Karı (Zararı)"])
-    gross_q = _series_from_any(income, ["Brüt Kar (Zarar)", "Ticari Faaliyetlerden Brüt Kar (Zarar)"])
+    sales_q = canon.series("sales")
+    net_q = canon.series("net_profit")
+    gross_q = canon.series("gross_profit")
 
     # Stok kalemleri (yıl sonu seviye)
-    equity_q = _series_from_any(balance, [
-        "Ana Ortaklığa Ait Özkaynaklar",
-        "Toplam Özkaynaklar",
-    ])
-    assets_q = _series_from_any(balance, ["Toplam Varlıklar", "Varlıklar Toplamı"])
+    equity_q = canon.series("equity")
+    assets_q = canon.series("total_assets")
 
     # EBITDA ≈ Esas/ Faaliyet Kârı + Amortisman
-    op_profit_q = None
-    for cand in ["Esas Faaliyet Karı (Zararı)", "Faaliyet Karı (Zararı)", "Faaliyetlerden Kar (Zarar)"]:
-        if cand in income.index:
-            op_profit_q = _series_from(income, cand)
-            break
-    dep_q = None
-    for cand in [
-        "Amortisman ve İtfa Gideri İle İlgili Düzeltmeler",
-        "Amortisman ve İtfa Düzeltmeleri",
-    ]:
-        if cand in cashflow.index:
-            dep_q = _series_from(cashflow, cand)
-            break
+    op_profit_q = canon.series("operating_profit") if canon.has("operating_profit") else None
+    dep_q = canon.series("depreciation") if canon.has("depreciation") else None
 
     # Yıllıklaştırma
     sales_y = _yearly_sum(sales_q)
@@ -0,0 +1,91 @@
+
+"""Indexed, read-only view over one Fintables statement (`Kalem` + `YYYY/M` columns)."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from modules.finance.utils import sort_period_index
+
+Items = Union[str, Sequence[str]]
+
+
+class StatementFrame:
+    """Wrap a statement with hash indexes on item labels and period columns.
+
+    Labels are stripped once at construction (the wrapped DataFrame is left
+    untouched); a repeated label resolves to its first row, like `get_value`.
+    Every lookup is a dict hit plus an array read.
+    """
+
+    __slots__ = ("periods", "item_index", "period_index", "values")
+
+    def __init__(self, df: Optional[pd.DataFrame]):
+        if df is None or df.empty or "Kalem" not in df.columns:
+            self.periods: List[str] = []
+            self.item_index: Dict[str, int] = {}
+            self.values = np.empty((0, 0))
+        else:
+            self.periods = [c for c in df.columns if isinstance(c, str) and "/" in c]
+            self.item_index = {}
+            for pos, label in enumerate(df["Kalem"].astype(str).str.strip()):
+                self.item_index.setdefault(label, pos)
+            self.values = df[self.periods].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        self.period_index: Dict[str, int] = {p: i for i, p in enumerate(self.periods)}
+
+    @classmethod
+    def of(cls, obj: Union["StatementFrame", pd.DataFrame, None]) -> "StatementFrame":
+        """Return `obj` unchanged if it is already a StatementFrame, else wrap it."""
+        return obj if isinstance(obj, cls) else cls(obj)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.item_index
+
+    @property
+    def empty(self) -> bool:
+        return not self.item_index
+
+    # ------------------------------------------------------------------
+    def position(self, items: Items) -> Optional[int]:
+        """Row position of the first label in `items` that exists, else None."""
+        if isinstance(items, str):
+            return self.item_index.get(items)
+        for item in items:
+            pos = self.item_index.get(item)
+            if pos is not None:
+                return pos
+        return None
+
+    def get(self, items: Items, period: str, default: float = 0.0) -> float:
+        """Value of the first existing label at `period`; `default` if no label exists.
+
+        A period that is not a column raises KeyError, as `df[period]` would.
+        """
+        col = self.period_index[period]
+        pos = self.position(items)
+        return default if pos is None else self.values[pos, col]
+
+    def get_many(self, items: Iterable[Items], periods: Iterable[str], default: float = 0.0) -> np.ndarray:
+        """len(items) × len(periods) matrix; each entry of `items` may be an alias list."""
+        cols = np.fromiter((self.period_index[p] for p in periods), dtype=np.intp)
+        items = list(items)
+        out = np.full((len(items), len(cols)), default, dtype=float)
+        for i, it in enumerate(items):
+            pos = self.position(it)
+            if pos is not None:
+                out[i] = self.values[pos, cols]
+        return out
+
+    def row(self, items: Items) -> np.ndarray:
+        """Values of one item in column order (newest first, as in the workbook)."""
+        pos = self.position(items)
+        if pos is None:
+            raise KeyError(f"'{items}' satırı bulunamadı")
+        return self.values[pos]
+
+    def series(self, items: Items) -> pd.Series:
+        """Chronologically ordered period series of one item (KeyError if absent)."""
+        s = pd.Series(self.row(items), index=pd.Index(self.periods))
+        return s[sort_period_index(s.index)]
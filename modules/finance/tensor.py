@@ -0,0 +1,272 @@
+"""Memory-mapped canonical universe: company × canonical item × period on disk.
+
+Layout under `tensor_dir(base_dir)` (one generation of data files per write):
+  values.<gen>.f8   float64 C-order buffer, shape (companies, items, periods), NaN = missing
+  masks.<gen>.u1    bool (companies, statements, periods): statement reports the period
+  found.<gen>.u1    bool (companies, items): an alias row of the item exists
+  labels.json       axis labels, the current generation's file names and each
+                    company's workbook fingerprint for incremental updates
+
+`get_universe` opens the files read-only (`np.memmap`), so scanner workers and
+Streamlit sessions share the same OS pages instead of each stacking its own
+copy. Data files are never modified after they are written: an update writes a
+new generation (copying unchanged companies, re-resolving changed ones) and then
+swaps `labels.json` with `os.replace`. A reader therefore always sees one
+complete generation, and a process that already mapped an older one keeps it.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from config import COMPANIES_DIR, TENSOR_DIR
+from modules.finance.data_loader import load_financial_data, workbook_fingerprint, workbook_path
+from modules.finance.line_items import ITEM_IDS, STATEMENTS, CanonicalStatements, resolve_statements
+from modules.finance.panel import list_companies
+from modules.finance.universe import CanonicalUniverse
+from modules.finance.utils import sort_period_index
+from modules.logger import logger
+
+LABELS_FILE = "labels.json"
+DTYPE = np.float64
+# Değiştirilen nesil dosyaları bu kadar saniye sonra silinir (eski etiketleri okumuş süreçlere pay)
+STALE_GENERATION_SECONDS = 300
+
+
+def _data_files(gen: str) -> Dict[str, str]:
+    return {"values": f"values.{gen}.f8", "masks": f"masks.{gen}.u1", "found": f"found.{gen}.u1"}
+
+
+def _read_labels(directory: Path) -> Optional[dict]:
+    try:
+        with open(Path(directory) / LABELS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _map(path: Path, dtype, shape, mode: str = "r") -> np.ndarray:
+    if not all(shape):
+        return np.zeros(shape, dtype=dtype)   # boş dosya haritalanamaz
+    return np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+
+
+def open_tensor(directory: Path = Path(TENSOR_DIR)) -> CanonicalUniverse:
+    """The current generation as a read-only, memory-mapped `CanonicalUniverse`."""
+    directory = Path(directory)
+    for attempt in range(2):
+        labels = _read_labels(directory)
+        if labels is None:
+            raise FileNotFoundError(f"{directory / LABELS_FILE} bulunamadı")
+        n_c, n_i, n_p = labels["shape"]
+        files = labels["files"]
+        try:
+            values = _map(directory / files["values"], DTYPE, (n_c, n_i, n_p))
+            masks = _map(directory / files["masks"], np.bool_, (n_c, len(STATEMENTS), n_p))
+            found = _map(directory / files["found"], np.bool_, (n_c, n_i))
+        except FileNotFoundError:
+            if attempt:
+                raise
+            continue   # nesil arada değişti; güncel etiketlerle yeniden dene
+        statement_masks = {s: masks[:, k, :] for k, s in enumerate(STATEMENTS)}
+        return CanonicalUniverse(labels["companies"], labels["periods"], values, statement_masks, found)
+
+
+def _load(companies: Iterable[str], base_dir: Path, loader: Callable):
+    """company -> (fingerprint, CanonicalStatements); unreadable workbooks are skipped."""
+    out = {}
+    for c in companies:
+        try:
+            fp = workbook_fingerprint(workbook_path(c, base_dir))
+            out[c] = (fp, resolve_statements(*loader(c, base_dir)))
+        except Exception as e:
+            logger.warning(f"{c}: tensöre eklenemedi → {e}")
+    return out
+
+
+def _write_generation(directory: Path, base_dir: Path, old: Optional[CanonicalUniverse],
+                      keep: list, loaded: Dict[str, tuple], fingerprints: Dict[str, dict]) -> dict:
+    """Writes a new generation from `keep` (rows copied from `old`) and `loaded`, then swaps labels."""
+    canon: Dict[str, CanonicalStatements] = {c: entry[1] for c, entry in loaded.items()}
+    companies = keep + [c for c in loaded if c not in keep]
+
+    periods = set()
+    if keep:
+        rows = np.array([old.company_index[c] for c in keep], dtype=np.intp)
+        reported = np.logical_or.reduce([old.statement_masks[s][rows] for s in STATEMENTS]).any(axis=0)
+        periods.update(p for p, r in zip(old.periods, reported) if r)
+    for statements in canon.values():
+        periods.update(statements.periods)
+    periods = sort_period_index(periods)
+    period_index = {p: i for i, p in enumerate(periods)}
+
+    gen = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+    files = _data_files(gen)
+    shape = (len(companies), len(ITEM_IDS), len(periods))
+    tmp = {k: directory / f"{name}.{os.getpid()}.tmp" for k, name in files.items()}
+    values = _map(tmp["values"], DTYPE, shape, mode="w+")
+    masks = _map(tmp["masks"], np.bool_, (shape[0], len(STATEMENTS), shape[2]), mode="w+")
+    found = _map(tmp["found"], np.bool_, shape[:2], mode="w+")
+    values[:] = np.nan
+    masks[:] = False
+
+    if keep:
+        # Değişmeyen şirketler eski nesilden, dönem sütunları yeni eksene taşınarak kopyalanır
+        cols = np.array([period_index.get(p, -1) for p in old.periods], dtype=np.intp)
+        used = cols >= 0
+        n_keep = len(keep)
+        block = np.full((n_keep, shape[1], shape[2]), np.nan)
+        block[:, :, cols[used]] = np.asarray(old.values[rows])[:, :, used]
+        values[:n_keep] = block
+        for k, s in enumerate(STATEMENTS):
+            mask = np.zeros((n_keep, shape[2]), dtype=bool)
+            mask[:, cols[used]] = np.asarray(old.statement_masks[s][rows])[:, used]
+            masks[:n_keep, k] = mask
+        found[:n_keep] = np.asarray(old.found[rows])
+    for ci, c in enumerate(companies[len(keep):], start=len(keep)):
+        statements = canon[c]
+        cols = np.array([period_index[p] for p in statements.periods], dtype=np.intp)
+        values[ci][:, cols] = statements.values
+        for k, s in enumerate(STATEMENTS):
+            masks[ci, k, cols] = statements.statement_periods[s]
+        found[ci] = statements.found
+
+    for arr in (values, masks, found):
+        if isinstance(arr, np.memmap):
+            arr.flush()
+    del values, masks, found
+    for k, name in files.items():
+        if tmp[k].exists():
+            os.replace(tmp[k], directory / name)
+        else:
+            open(directory / name, "wb").close()
+
+    labels = {
+        "base_dir": str(base_dir.resolve()),
+        "items": ITEM_IDS,
+        "shape": list(shape),
+        "companies": companies,
+        "periods": periods,
+        "files": files,
+        "fingerprints": {c: fingerprints[c] for c in companies},
+    }
+    labels_tmp = directory / f"{LABELS_FILE}.{os.getpid()}.tmp"
+    with open(labels_tmp, "w", encoding="utf-8") as f:
+        json.dump(labels, f, ensure_ascii=False)
+    previous = _read_labels(directory)
+    # Etiketler en son değişir: okuyucu ya eski ya yeni neslin tamamını görür
+    os.replace(labels_tmp, directory / LABELS_FILE)
+    if previous is not None:
+        _retire(directory, previous["files"].values())
+    _remove_stale_generations(directory, set(files.values()))
+    return labels
+
+
+def _retire(directory: Path, names: Iterable[str]) -> None:
+    # Değiştirilen neslin dosyalarının mtime'ı değiştirilme anına çekilir; bekleme süresi buradan sayılır
+    for name in names:
+        try:
+            os.utime(directory / name)
+        except OSError:
+            pass
+
+
+def _remove_stale_generations(directory: Path, current: set) -> None:
+    """Deletes data files of generations replaced more than `STALE_GENERATION_SECONDS` ago.
+
+    A replaced generation's mtime is its replacement time (`_retire`), so a
+    reader that read the previous labels still has the grace period to map it.
+    Deleting a mapped file does not affect its reader on POSIX; on Windows the
+    file stays until a later update.
+    """
+    cutoff = time.time() - STALE_GENERATION_SECONDS
+    for path in directory.iterdir():
+        if path.name in current or not path.name.startswith(("values.", "masks.", "found.")):
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def build_tensor(directory: Path = Path(TENSOR_DIR),
+                 base_dir: Path = Path(COMPANIES_DIR),
+                 companies: Optional[Iterable[str]] = None,
+                 loader: Callable = load_financial_data) -> CanonicalUniverse:
+    """Writes the tensor for the whole universe from scratch and opens it."""
+    directory, base_dir = Path(directory), Path(base_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    companies = list(companies) if companies is not None else list_companies(base_dir)
+    loaded = _load(companies, base_dir, loader)
+    labels = _write_generation(directory, base_dir, None, [], loaded,
+                               {c: fp for c, (fp, _) in loaded.items()})
+    n_c, n_i, n_p = labels["shape"]
+    logger.info(f"Tensör oluşturuldu: {n_c} şirket × {n_i} kalem × {n_p} dönem")
+    return open_tensor(directory)
+
+
+def update_tensor(directory: Path = Path(TENSOR_DIR),
+                  base_dir: Path = Path(COMPANIES_DIR),
+                  loader: Callable = load_financial_data) -> dict:
+    """Brings the tensor in line with the workbooks, re-reading only what changed.
+
+    Changed and new companies are resolved again; unchanged companies are copied
+    from the current generation and removed ones are dropped. Everything lands in
+    a new generation (see the module docstring). A different companies directory
+    or canonical item list means a full rebuild.
+    """
+    directory, base_dir = Path(directory), Path(base_dir)
+    labels = _read_labels(directory)
+    if (labels is None or labels.get("items") != ITEM_IDS
+            or labels.get("base_dir") != str(base_dir.resolve())):
+        build_tensor(directory, base_dir, loader=loader)
+        return {"rebuilt": True, "updated": [], "added": [], "removed": []}
+
+    companies = list_companies(base_dir)
+    known = labels["fingerprints"]
+    removed = sorted(set(known) - set(companies))
+    fingerprints, stale = {}, []
+    for c in companies:
+        try:
+            fingerprints[c] = workbook_fingerprint(workbook_path(c, base_dir))
+        except OSError:
+            continue
+        if known.get(c) != fingerprints[c]:
+            stale.append(c)
+    if not stale and not removed:
+        return {"rebuilt": False, "updated": [], "added": [], "removed": []}
+
+    old = open_tensor(directory)
+    loaded = _load(stale, base_dir, loader)
+    keep = [c for c in old.companies if c in fingerprints and c not in stale]
+    fingerprints.update({c: fp for c, (fp, _) in loaded.items()})
+    _write_generation(directory, base_dir, old, keep, loaded, fingerprints)
+    return {"rebuilt": False,
+            "updated": [c for c in loaded if c in known],
+            "added": [c for c in loaded if c not in known],
+            "removed": removed}
+
+
+def tensor_dir(base_dir: Path = Path(COMPANIES_DIR)) -> Path:
+    """Tensor directory of a companies directory (one per `base_dir`, so they never overwrite each other)."""
+    key = hashlib.sha1(str(Path(base_dir).resolve()).encode("utf-8")).hexdigest()[:12]
+    return Path(TENSOR_DIR) / key
+
+
+def has_tensor(base_dir: Path = Path(COMPANIES_DIR)) -> bool:
+    return (tensor_dir(base_dir) / LABELS_FILE).exists()
+
+
+def load_tensor(base_dir: Path = Path(COMPANIES_DIR)) -> CanonicalUniverse:
+    """Updates the tensor of `base_dir` from its workbooks and opens the current generation."""
+    directory = tensor_dir(base_dir)
+    update_tensor(directory, base_dir)
+    return open_tensor(directory)
@@ -0,0 +1,201 @@
+
+"""Trailing-twelve-month flows and trailing average balances over the period axis.
+
+Windows roll over each company's *own* reported quarters (the periods present in
+the item's statement), so a company whose latest filing is older than the
+universe's newest period still gets its TTM at its latest period. Results are
+company × period arrays aligned with `CanonicalUniverse.periods`; a period without
+a full window is NaN.
+"""
+from __future__ import annotations
+
+import threading
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import COMPANIES_DIR
+from modules.finance.data_service import get_canonical_data
+from modules.finance.line_items import CanonicalStatements
+from modules.finance.universe import CanonicalUniverse, get_universe
+
+TTM_WINDOW = 4   # çeyreklik tablolar → 4 çeyrek = 12 ay
+
+# Türetilmiş akış kalemleri: (canonical kalem, katsayı) toplamı
+DERIVED_ITEMS: Dict[str, Tuple[Tuple[str, float], ...]] = {
+    # fcf.build_fcf_dataframe ile aynı tanım: İşletme Nakit Akışı - CAPEX
+    "free_cash_flow": (("operating_cash_flow", 1.0), ("capex", -1.0)),
+}
+
+_REDUCERS = {
+    # (NaN yayan, NaN atlayan)
+    "sum":  (np.sum,  np.nansum),
+    "mean": (np.mean, np.nanmean),
+    "min":  (np.min,  np.nanmin),
+}
+
+
+def rolling(values: np.ndarray, mask: np.ndarray, window: int = TTM_WINDOW,
+            how: str = "sum", skipna: bool = False) -> np.ndarray:
+    """Rolling `how` over the last `window` *reported* periods of every row.
+
+    `values` and `mask` are company × period; entries where `mask` is False are
+    ignored (skipped, not treated as gaps). With `skipna` NaN values inside a
+    window are skipped like `pd.Series.sum()` (an all-NaN sum is 0); otherwise
+    they propagate.
+    """
+    n_rows, n_periods = values.shape
+    out = np.full((n_rows, n_periods), np.nan)
+    if n_periods < window or window < 1:
+        return out
+
+    # Raporlanan dönemleri sola topla (sıra korunur), pencereyi sıkıştırılmış eksende kaydır
+    order = np.argsort(~mask, axis=1, kind="stable")
+    compact = np.take_along_axis(values, order, axis=1)
+    counts = mask.sum(axis=1)
+
+    reducer = _REDUCERS[how][1 if skipna else 0]
+    with warnings.catch_warnings(), np.errstate(invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)   # tamamen NaN pencereler
+        reduced = reducer(sliding_window_view(compact, window, axis=1), axis=-1)
+
+    rolled = np.full((n_rows, n_periods), np.nan)
+    rolled[:, window - 1:] = reduced
+    rolled[np.arange(n_periods)[None, :] >= counts[:, None]] = np.nan
+    np.put_along_axis(out, order, rolled, axis=1)
+    out[~mask] = np.nan
+    return out
+
+
+def latest(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Value of every row at its latest reported period (NaN if none)."""
+    n_periods = mask.shape[1]
+    last = n_periods - 1 - np.argmax(mask[:, ::-1], axis=1)
+    out = values[np.arange(len(values)), last] if n_periods else np.full(len(values), np.nan)
+    return np.where(mask.any(axis=1), out, np.nan)
+
+
+class TTMEngine:
+    """Memoized TTM / trailing-average views over a `CanonicalUniverse`."""
+
+    def __init__(self, universe: CanonicalUniverse, window: int = TTM_WINDOW):
+        self.universe = universe
+        self.window = window
+        self._cache: Dict[tuple, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_company(cls, symbol: str, canon: CanonicalStatements, window: int = TTM_WINDOW) -> "TTMEngine":
+        return cls(CanonicalUniverse.from_canonical({symbol: canon}), window)
+
+    # ------------------------------------------------------------------
+    def mask(self, item_id: str) -> np.ndarray:
+        if item_id in DERIVED_ITEMS:
+            masks = [self.universe.mask(i) for i, _ in DERIVED_ITEMS[item_id]]
+            return np.logical_and.reduce(masks)
+        return self.universe.mask(item_id)
+
+    def flow(self, item_id: str) -> np.ndarray:
+        """Quarterly values of a canonical or derived item (company × period)."""
+        if item_id not in DERIVED_ITEMS:
+            return self.universe.item(item_id)
+
+        def compute():
+            parts = DERIVED_ITEMS[item_id]
+            out = sum(coef * self.universe.item(i) for i, coef in parts)
+            # Bileşenlerden biri hiç yoksa (ör. CAPEX satırı) türetilmiş kalem de yoktur
+            has_all = np.logical_and.reduce([self.universe.has(i) for i, _ in parts])
+            out[~has_all] = np.nan
+            return out
+        return self._memo(("flow", item_id), compute)
+
+    def rolling(self, item_id: str, how: str = "sum", window: int | None = None,
+                skipna: bool = False) -> np.ndarray:
+        window = window or self.window
+        return self._memo(("rolling", item_id, how, window, skipna),
+                          lambda: rolling(self.flow(item_id), self.mask(item_id), window, how, skipna))
+
+    def ttm(self, item_id: str, window: int | None = None, skipna: bool = False) -> np.ndarray:
+        """Trailing sum of a flow item (net profit, OCF, FCF…) at every period."""
+        return self.rolling(item_id, "sum", window, skipna)
+
+    def average(self, item_id: str, window: int | None = None, skipna: bool = False) -> np.ndarray:
+        """Trailing average of a stock item (assets, equity…) at every period."""
+        return self.rolling(item_id, "mean", window, skipna)
+
+    def ratio(self, numerator: str, denominator: str, average_denominator: bool = False) -> np.ndarray:
+        """TTM numerator over TTM (or trailing-average) denominator, in percent."""
+        den = self.average(denominator) if average_denominator else self.ttm(denominator)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = self.ttm(numerator) / den * 100
+        out[~np.isfinite(out)] = np.nan
+        return out
+
+    def latest(self, values: np.ndarray, item_id: str) -> np.ndarray:
+        """Per-company value at the company's latest period of `item_id`'s statement."""
+        return latest(values, self.mask(item_id))
+
+    def frame(self, values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=self.universe.companies, columns=self.universe.periods)
+
+    def _memo(self, key: tuple, compute) -> np.ndarray:
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            cached = compute()
+            cached.setflags(write=False)
+            with self._lock:
+                self._cache[key] = cached
+        return cached
+
+
+def ttm_free_cash_flow(engine: TTMEngine) -> np.ndarray:
+    """Latest TTM FCF per company; the latest quarter if fewer than a window exists.
+
+    Same rule as the former `df_fcf["FCF"].iloc[-4:].sum()` / `.iloc[-1]` code
+    in the scanner and the valuation tab (NaN quarters are skipped).
+    """
+    ttm = engine.latest(engine.ttm("free_cash_flow", skipna=True), "free_cash_flow")
+    last = engine.latest(engine.flow("free_cash_flow"), "free_cash_flow")
+    return np.where(np.isnan(ttm), last, ttm)
+
+
+# ----------------------------------------------------------------------
+# Veri sürümüne göre önbellek
+# ----------------------------------------------------------------------
+_engine_lock = threading.Lock()
+_universe_engines: Dict[Path, TTMEngine] = {}
+_company_engines: "OrderedDict[str, Tuple[CanonicalStatements, TTMEngine]]" = OrderedDict()
+_COMPANY_ENGINES_MAX = 128
+
+
+def get_ttm_engine(base_dir: Path = Path(COMPANIES_DIR)) -> TTMEngine:
+    """Universe-wide engine; rebuilt (with empty memo) whenever a workbook changes."""
+    base_dir = Path(base_dir)
+    universe = get_universe(base_dir)
+    with _engine_lock:
+        engine = _universe_engines.get(base_dir)
+        if engine is None or engine.universe is not universe:
+            engine = TTMEngine(universe)
+            _universe_engines[base_dir] = engine
+        return engine
+
+
+def get_company_ttm_engine(symbol: str) -> TTMEngine:
+    """Single-company engine, reused while the data service serves the same statements."""
+    canon = get_canonical_data(symbol)
+    with _engine_lock:
+        cached = _company_engines.get(symbol)
+        if cached is not None and cached[0] is canon:
+            _company_engines.move_to_end(symbol)
+            return cached[1]
+        engine = TTMEngine.for_company(symbol, canon)
+        _company_engines[symbol] = (canon, engine)
+        while len(_company_engines) > _COMPANY_ENGINES_MAX:
+            _company_engines.popitem(last=False)
+        return engine
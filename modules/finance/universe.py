@@ -0,0 +1,208 @@
+
+"""Canonical line items of many companies as one company × item × period array."""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import COMPANIES_DIR
+from modules.finance.data_loader import load_financial_data
+from modules.finance.line_items import (ITEM_INDEX, ITEMS_BY_ID, LINE_ITEMS, STATEMENTS,
+                                        CanonicalStatements, resolve_statements)
+from modules.finance.panel import list_companies, universe_version
+from modules.finance.utils import sort_period_index
+from modules.logger import logger
+
+
+class CanonicalUniverse:
+    """Stacked `CanonicalStatements` aligned on the union of all periods.
+
+    `values[c, i, p]` is canonical item `i` of company `c` at period `p` (NaN where
+    the company's statement has no such period). `statement_masks[s][c, p]` tells
+    whether statement `s` of company `c` reports period `p`; `found[c, i]` whether
+    any alias row of item `i` exists for the company.
+    """
+
+    def __init__(self, companies: List[str], periods: List[str], values: np.ndarray,
+                 statement_masks: Dict[str, np.ndarray], found: np.ndarray):
+        self.companies = companies
+        self.periods = periods
+        self.values = values
+        self.statement_masks = statement_masks
+        self.found = found
+        self.company_index = {c: i for i, c in enumerate(companies)}
+        self.period_index = {p: i for i, p in enumerate(periods)}
+
+    @classmethod
+    def from_canonical(cls, canon_by_company: Dict[str, CanonicalStatements]) -> "CanonicalUniverse":
+        companies = list(canon_by_company)
+        periods = sort_period_index({p for canon in canon_by_company.values() for p in canon.periods})
+        period_index = {p: i for i, p in enumerate(periods)}
+
+        shape = (len(companies), len(LINE_ITEMS), len(periods))
+        values = np.full(shape, np.nan)
+        masks = {s: np.zeros((len(companies), len(periods)), dtype=bool) for s in STATEMENTS}
+        found = np.zeros((len(companies), len(LINE_ITEMS)), dtype=bool)
+        for ci, c in enumerate(companies):
+            canon = canon_by_company[c]
+            cols = np.array([period_index[p] for p in canon.periods], dtype=np.intp)
+            values[ci][:, cols] = canon.values
+            for s in STATEMENTS:
+                masks[s][ci, cols] = canon.statement_periods[s]
+            found[ci] = canon.found
+        return cls(companies, periods, values, masks, found)
+
+    @classmethod
+    def build(cls, companies: Optional[Iterable[str]] = None,
+              base_dir: Path = Path(COMPANIES_DIR),
+              loader: Callable = load_financial_data) -> "CanonicalUniverse":
+        base_dir = Path(base_dir)
+        companies = list(companies) if companies is not None else list_companies(base_dir)
+        canon = {}
+        for c in companies:
+            try:
+                canon[c] = resolve_statements(*loader(c, base_dir))
+            except Exception as e:
+                logger.warning(f"{c}: canonical evrene eklenemedi → {e}")
+        return cls.from_canonical(canon)
+
+    def subset(self, companies: Iterable[str]) -> "CanonicalUniverse":
+        """In-memory universe of `companies` (all present here), as `from_canonical` would build it.
+
+        Periods no selected company reports are dropped, so the result does not
+        depend on which other companies share the universe.
+        """
+        rows = np.array([self.company_index[c] for c in companies], dtype=np.intp)
+        masks = {s: np.asarray(self.statement_masks[s][rows]) for s in STATEMENTS}
+        cols = np.flatnonzero(np.logical_or.reduce(list(masks.values())).any(axis=0))
+        return CanonicalUniverse(
+            [self.companies[r] for r in rows],
+            [self.periods[p] for p in cols],
+            np.asarray(self.values[rows])[:, :, cols],
+            {s: m[:, cols] for s, m in masks.items()},
+            np.asarray(self.found[rows]),
+        )
+
+    # ------------------------------------------------------------------
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.values.shape
+
+    def item(self, item_id: str) -> np.ndarray:
+        """Company × period matrix of one canonical item (a view)."""
+        return self.values[:, ITEM_INDEX[item_id], :]
+
+    def mask(self, item_id: str) -> np.ndarray:
+        """Company × period mask of the periods reported by the item's statement."""
+        return self.statement_masks[ITEMS_BY_ID[item_id].statement]
+
+    def has(self, item_id: str) -> np.ndarray:
+        return self.found[:, ITEM_INDEX[item_id]]
+
+    # ------------------------------------------------------------------
+    # Şirket başına dönem seçimi (sütun konumu, -1 = yok)
+    # ------------------------------------------------------------------
+    def period_columns(self, periods, default: Optional[np.ndarray] = None) -> np.ndarray:
+        """Column per company from one period, a company -> period mapping, an array of
+        columns (returned as is) or `default`."""
+        if periods is None:
+            return default
+        if isinstance(periods, np.ndarray):
+            return periods.astype(np.intp, copy=False)
+        if isinstance(periods, str):
+            return np.full(len(self.companies), self.period_index.get(periods, -1), dtype=np.intp)
+        mapping = dict(periods.items()) if hasattr(periods, "items") else dict(periods)
+        return np.array([self.period_index.get(mapping.get(c), -1) for c in self.companies], dtype=np.intp)
+
+    def common_mask(self, *statements: str) -> np.ndarray:
+        """Company × period mask of periods reported by all given statements."""
+        return np.logical_and.reduce([self.statement_masks[s] for s in statements])
+
+    @staticmethod
+    def latest_two(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Last and second-to-last True column of every row (-1 if missing)."""
+        n_periods = mask.shape[1]
+        rank = np.cumsum(mask, axis=1)
+        total = rank[:, -1] if n_periods else np.zeros(len(mask), dtype=int)
+        cols = np.arange(n_periods)
+        curr = np.where(mask & (rank == total[:, None]), cols, -1).max(axis=1, initial=-1)
+        prev = np.where(mask & (rank == (total - 1)[:, None]), cols, -1).max(axis=1, initial=-1)
+        return curr.astype(np.intp), prev.astype(np.intp)
+
+    @staticmethod
+    def nth(mask: np.ndarray, n: int) -> np.ndarray:
+        """Column of the `n`-th (0-based, oldest first) True entry of every row (-1 if missing)."""
+        rank = np.cumsum(mask, axis=1)
+        cols = np.arange(mask.shape[1])
+        return np.where(mask & (rank == n + 1), cols, -1).max(axis=1, initial=-1).astype(np.intp)
+
+    def take(self, item_id: str, cols: np.ndarray) -> np.ndarray:
+        """Value of `item_id` at each company's column; NaN where the column is -1."""
+        return take_columns(self.item(item_id), cols)
+
+    def covers(self, mask: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """True where the company's column is valid and set in `mask`."""
+        return (cols >= 0) & take_columns(mask, cols, fill=False).astype(bool)
+
+    def labels(self, cols: np.ndarray) -> np.ndarray:
+        """Period label per company column (None for -1)."""
+        return np.asarray(self.periods + [None], dtype=object)[cols]
+
+
+def take_columns(values: np.ndarray, cols: np.ndarray, fill=np.nan) -> np.ndarray:
+    """values[c, cols[c]] for every row; `fill` where cols is -1."""
+    if not values.shape[1]:
+        return np.full(len(values), fill)
+    out = values[np.arange(len(values)), np.clip(cols, 0, None)]
+    return np.where(cols >= 0, out, fill)
+
+
+# ----------------------------------------------------------------------
+# Süreç içinde tek evren: dosyalardan biri değişince yeniden kurulur
+# ----------------------------------------------------------------------
+_universe_lock = threading.Lock()
+_universe_cache: Dict[Path, Tuple[tuple, CanonicalUniverse]] = {}
+
+
+def get_universe(base_dir: Path = Path(COMPANIES_DIR)) -> CanonicalUniverse:
+    """Return the memoized universe, refreshing it if any workbook changed.
+
+    The universe is the memory-mapped tensor (`modules.finance.tensor`), updated
+    for the changed workbooks only; if the tensor directory cannot be written or
+    read it is built in memory as before.
+    """
+    from modules.finance.tensor import load_tensor
+    base_dir = Path(base_dir)
+    version = universe_version(base_dir)
+    with _universe_lock:
+        cached = _universe_cache.get(base_dir)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        try:
+            universe = load_tensor(base_dir)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Tensör kullanılamadı, evren bellekte kuruluyor → {e}")
+            universe = CanonicalUniverse.build([c for c, *_ in version], base_dir)
+        _universe_cache[base_dir] = (version, universe)
+        return universe
+
+
+def shared_universe(base_dir: Path = Path(COMPANIES_DIR)) -> Optional[CanonicalUniverse]:
+    """The universe if it is available without a full build, else None.
+
+    That is a tensor that already exists for `base_dir` (brought up to date for
+    changed workbooks only) or a current in-memory universe. Callers scoring a
+    few companies then build just those; the tensor itself is built by the
+    headless scan (`modules.radar_pipeline`) via `get_universe`.
+    """
+    from modules.finance.tensor import has_tensor
+    base_dir = Path(base_dir)
+    if has_tensor(base_dir):
+        return get_universe(base_dir)
+    version = universe_version(base_dir)
+    with _universe_lock:
+        cached = _universe_cache.get(base_dir)
+        return cached[1] if cached is not None and cached[0] == version else None
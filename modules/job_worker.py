@@ -0,0 +1,185 @@
+
+"""Background worker for Action Center jobs (`jobs` table, `modules.db.jobs`).
+
+Run one or more workers next to the Streamlit app:
+
+    python -m modules.job_worker            # poll forever
+    python -m modules.job_worker --once     # drain the queue and exit
+
+Each worker claims the oldest queued job with `SELECT ... FOR UPDATE SKIP
+LOCKED`, so several workers never take the same job. Handlers report progress
+through the job row, which the page polls. While a handler runs, a background
+thread refreshes the job's heartbeat, so a long silent step (a slow download,
+hashing every workbook) is not mistaken for a dead worker. A job whose worker
+died (no heartbeat for `--stale-after` seconds) is picked up again, at most
+`--max-attempts` times in total, after which it is marked failed; radar scans
+carry a run id, so the retry resumes from their checkpoint.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+from modules.db import jobs
+from modules.logger import logger
+
+Progress = Callable[[Optional[float], Optional[str]], None]
+Handler = Callable[[dict, Progress], Any]
+
+RADAR_ANALYSIS = "radar_analysis"
+PERFORMANCE_LOG = "performance_log"
+BALANCE_DOWNLOAD = "balance_download"
+
+HEARTBEAT_SECONDS = 30
+
+
+def _radar_analysis(params: dict, progress: Progress) -> dict:
+    from modules.radar_pipeline import load_radar, run_fundamental_pipeline
+
+    def on_start(to_scan, skipped_fresh):
+        progress(0.0, f"{to_scan} şirket taranacak, {skipped_fresh} güncel şirket atlandı")
+
+    def on_batch(df_batch, done, total, saved):
+        progress(done / total if total else 1.0, f"{done}/{total} şirket tarandı, {saved} satır kaydedildi")
+
+    result = run_fundamental_pipeline(
+        load_radar(),
+        incremental=bool(params.get("incremental")),
+        run_id=params.get("run_id"),
+        workers=params.get("workers"),
+        on_start=on_start,
+        on_batch=on_batch,
+    )
+    return {"rows": len(result.frame), "saved": result.saved, "skipped_fresh": result.skipped_fresh,
+            "errors": len(result.logs), "logs": result.logs[:100], "run_id": result.run_id}
+
+
+def _performance_log(params: dict, progress: Progress) -> dict:
+    from modules.page_actions.performance_log import update_performance_log
+    warnings = []
+
+    def on_warning(msg):
+        warnings.append(msg)
+        progress(None, msg)
+
+    result = update_performance_log(on_progress=progress, on_warning=on_warning)
+    result["warnings"] = warnings
+    return result
+
+
+def _balance_download(params: dict, progress: Progress) -> dict:
+    from modules.finance.downloader import update_companies_if_needed
+    lines = []
+
+    def log(msg: str):
+        lines.append(msg)
+        progress(None, msg)
+
+    update_companies_if_needed(log=log)
+    return {"log": lines[-200:]}
+
+
+HANDLERS: Dict[str, Handler] = {
+    RADAR_ANALYSIS: _radar_analysis,
+    PERFORMANCE_LOG: _performance_log,
+    BALANCE_DOWNLOAD: _balance_download,
+}
+
+
+def _heartbeat_loop(job_id: int, worker: str, stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        try:
+            if not jobs.heartbeat(job_id, worker):
+                logger.warning(f"İş #{job_id}: iş artık bu işçide değil (yeniden alınmış olabilir)")
+                return
+        except Exception as exc:
+            logger.warning(f"İş #{job_id}: kalp atışı yazılamadı → {exc}")
+
+
+def run_job(job: dict, worker: str, heartbeat_every: float = HEARTBEAT_SECONDS) -> None:
+    job_id, kind = job["id"], job["kind"]
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        jobs.fail(job_id, worker, f"Bilinmeyen iş türü: {kind}")
+        return
+
+    def progress(fraction: Optional[float] = None, message: Optional[str] = None) -> None:
+        try:
+            jobs.report_progress(job_id, worker, fraction, message)
+        except Exception as exc:
+            # İlerleme yazılamaması işi durdurmaz
+            logger.warning(f"İş #{job_id}: ilerleme yazılamadı → {exc}")
+
+    logger.info(f"İş #{job_id} ({kind}) başladı, deneme {job.get('attempts')}")
+    # İşleyici ilerleme bildirmese de iş canlı görünür
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat_loop, args=(job_id, worker, stop, heartbeat_every),
+                            name=f"job-{job_id}-heartbeat", daemon=True)
+    beat.start()
+    error = None
+    try:
+        result = handler(job["params"], progress)
+    except Exception as exc:
+        logger.exception(f"İş #{job_id} ({kind}) başarısız")
+        error = f"{exc}\n\n{traceback.format_exc()}"
+    finally:
+        stop.set()
+        beat.join()
+
+    if error is not None:
+        stored = jobs.fail(job_id, worker, error)
+    else:
+        stored = jobs.finish(job_id, worker, result)
+        if stored:
+            logger.info(f"İş #{job_id} ({kind}) tamamlandı")
+    if not stored:
+        logger.warning(f"İş #{job_id} ({kind}): sonuç yazılamadı, iş başka bir işçiye geçmiş")
+
+
+def run_worker(poll_interval: float = 2.0, once: bool = False, stale_after: int = 600,
+               name: Optional[str] = None, max_attempts: int = jobs.MAX_ATTEMPTS,
+               scan_workers: Optional[int] = None) -> None:
+    """
+    Kuyruktaki işleri sırayla çalıştırır; `once` ise kuyruk boşalınca döner.
+    `scan_workers`, kendi `workers` parametresi olmayan taramaların süreç sayısıdır.
+    """
+    worker = name or f"{socket.gethostname()}:{os.getpid()}"
+    jobs.ensure_table()
+    logger.info(f"İş işçisi başladı: {worker}")
+    while True:
+        job = jobs.claim(worker, stale_after=stale_after, max_attempts=max_attempts)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        if scan_workers is not None:
+            job["params"].setdefault("workers", scan_workers)
+        run_job(job, worker, heartbeat_every=min(HEARTBEAT_SECONDS, stale_after / 3))
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m modules.job_worker",
+                                     description="Action Center arka plan işçisi.")
+    parser.add_argument("--once", action="store_true", help="kuyruğu boşalt ve çık")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="boş kuyrukta bekleme (s)")
+    parser.add_argument("--stale-after", type=int, default=600,
+                        help="kalp atışı bu kadar saniye gelmeyen 'running' iş yeniden alınır")
+    parser.add_argument("--max-attempts", type=int, default=jobs.MAX_ATTEMPTS,
+                        help="yanıtsız kalan iş en fazla bu kadar kez denenir, sonra başarısız sayılır")
+    parser.add_argument("--workers", type=int, dest="scan_workers",
+                        help="radar taramasının işçi süreç sayısı (varsayılan config.SCAN_WORKERS)")
+    parser.add_argument("--name", help="işçi adı (varsayılan host:pid)")
+    args = parser.parse_args(argv)
+    run_worker(args.poll_interval, args.once, args.stale_after, args.name, args.max_attempts,
+               args.scan_workers)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,73 @@
+# modules/page_actions/jobs_panel.py
+import json
+
+import streamlit as st  # type: ignore
+import pandas as pd
+
+from modules.db import jobs
+
+POLL_SECONDS = 3
+STATUS_LABELS = {
+    "queued": "⏳ Sırada",
+    "running": "⚙️ Çalışıyor",
+    "done": "✅ Tamamlandı",
+    "failed": "❌ Başarısız",
+}
+QUEUED_HINT_SECONDS = 30
+
+# Streamlit >= 1.37: st.fragment(run_every=...) yalnızca durum kutusunu yeniler
+_fragment = getattr(st, "fragment", None)
+
+
+def enqueue_job(kind: str, params: dict = None) -> int:
+    """
+    İşi kuyruğa ekler ve kimliğini döner. Aynı türde bekleyen / çalışan bir iş
+    varsa yeni iş eklenmez, onun kimliği döner (çift tıklama koruması).
+    """
+    jobs.ensure_table()
+    existing = jobs.active_job(kind)
+    if existing is not None:
+        st.info(f"Bu işlem zaten kuyrukta / çalışıyor (iş #{existing}).")
+        return existing
+    job_id = jobs.enqueue(kind, params)
+    st.toast(f"İş #{job_id} kuyruğa eklendi.", icon="📨")
+    return job_id
+
+
+def _latest_job(kind: str):
+    try:
+        df = jobs.load_jobs(limit=1, kind=kind)
+    except Exception:
+        return None  # jobs tablosu henüz yok
+    return None if df.empty else df.iloc[0]
+
+
+def _show_job(kind: str) -> None:
+    job = _latest_job(kind)
+    if job is None:
+        st.caption("Henüz çalıştırılmış bir iş yok.")
+        return
+
+    st.markdown(f"**İş #{job['id']}** — {STATUS_LABELS.get(job['status'], job['status'])}")
+    if job["status"] in ("queued", "running"):
+        st.progress(float(job["progress"] or 0.0), text=job["message"] or "")
+        waited = (pd.Timestamp.now() - pd.Timestamp(job["created_at"])).total_seconds()
+        if job["status"] == "queued" and waited > QUEUED_HINT_SECONDS:
+            st.info("İş bekliyor. Arka plan işçisi çalışıyor mu? `python -m modules.job_worker`")
+    elif job["status"] == "done":
+        if job["message"]:
+            st.caption(job["message"])
+        with st.expander("Sonuç", expanded=False):
+            st.json(json.loads(job["result"]) if job["result"] else {})
+    else:
+        with st.expander("Hata Detayı", expanded=False):
+            st.code(job["error"] or "")
+
+
+def render_job_status(kind: str) -> None:
+    """Son işin durumu / ilerlemesi; sayfa yalnızca tabloyu okur, işi işçi yürütür."""
+    if _fragment is not None:
+        _fragment(run_every=POLL_SECONDS)(_show_job)(kind)
+    else:
+        _show_job(kind)
+        st.button("🔄 Durumu yenile", key=f"refresh_{kind}")
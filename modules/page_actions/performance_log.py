@@ -1,28 +1,36 @@
-import streamlit as st #type: ignore
 import pandas as pd
 from datetime import datetime, timedelta
 from modules.technical_analysis.data_fetcher import fetch_and_process_stock_data
-from modules.db.performance_log import upsert_performance_log
+from modules.db.performance_log import load_performance_log, upsert_performance_log
+from modules.db.portfolio import load_portfolio_df
 
-def run_performance_log_update(acik_pozisyonlar: pd.DataFrame, df_log: pd.DataFrame):
+def prepare_log_inputs(df_portfoy: pd.DataFrame, df_log: pd.DataFrame):
+    """Portföy ve log tablolarını tarama için hazırlar; (açık pozisyonlar, log) döner."""
+    if not df_portfoy.empty:
+        df_portfoy["alis_tarihi"] = pd.to_datetime(df_portfoy["alis_tarihi"])
+        df_portfoy["Hisse"] = df_portfoy["hisse"].str.upper().str.strip()
+    if not df_log.empty:
+        df_log["tarih"] = pd.to_datetime(df_log["tarih"])
+
+    acik_pozisyonlar = df_portfoy[df_portfoy["satis_fiyat"].isna()] if not df_portfoy.empty else pd.DataFrame()
+    return acik_pozisyonlar, df_log
+
+
+def collect_weekly_closes(acik_pozisyonlar: pd.DataFrame, df_log: pd.DataFrame,
+                          on_progress=lambda frac, msg: None, on_warning=lambda msg: None,
+                          on_error=None):
     """
-    Açık pozisyonlar için eksik haftalık kapanışları bulur ve veritabanına ekler.
-    Streamlit arayüz elemanları ile ilerlemeyi gösterir.
+    Açık pozisyonlar için log'da olmayan haftalık (Cuma) kapanışları toplar (UI'sız).
+    Dönüş: (yeni kayıtlar listesi, hisse -> eklenen kayıt sayısı).
     """
-    if acik_pozisyonlar.empty:
-        st.info("⚪ Log’a eklenecek **açık** pozisyon bulunmadı.")
-        return
-
+    on_error = on_error or on_warning
     yeni_kayitlar = []
     log_summary = {}
-    
-    st.write(f"Toplam {len(acik_pozisyonlar)} adet açık pozisyon için eksik veriler taranıyor...")
-    progress_bar = st.progress(0, text="Başlatılıyor...")
 
     for i, (_, prt) in enumerate(acik_pozisyonlar.iterrows()):
         hisse = prt["Hisse"]
         lot_now = prt["lot"]
-        progress_bar.progress((i) / len(acik_pozisyonlar), text=f"🔎 {hisse} taranıyor...")
+        on_progress(i / len(acik_pozisyonlar), f"🔎 {hisse} taranıyor...")
 
         # Başlangıç tarihini belirle
         log_for_hisse = df_log[df_log["hisse"] == hisse]
@@ -35,9 +43,9 @@ def run_performance_log_update(acik_pozisyonlar: pd.DataFrame, df_log: pd.DataFr
             days_to_fetch = (datetime.today() - start_date).days + 2
             price_df = fetch_and_process_stock_data(symbol=hisse, days=days_to_fetch)
             if price_df.empty:
-                st.warning(f"⚠️ **{hisse}** için fiyat verisi bulunamadı.")
+                on_warning(f"⚠️ **{hisse}** için fiyat verisi bulunamadı.")
                 continue
-            
+
             weekly_closes = price_df['close'].resample('W-FRI').last().dropna()
             weekly_closes = weekly_closes[weekly_closes.index >= start_date]
 
@@ -47,19 +55,17 @@ def run_performance_log_update(acik_pozisyonlar: pd.DataFrame, df_log: pd.DataFr
                 log_summary[hisse] = len(weekly_closes)
 
         except Exception as e:
-            st.error(f"❌ **{hisse}** için veri çekilirken hata oluştu: {e}")
+            on_error(f"❌ **{hisse}** için veri çekilirken hata oluştu: {e}")
 
-    progress_bar.progress(1.0, text="Tamamlandı!")
+    return yeni_kayitlar, log_summary
 
+
+def update_performance_log(on_progress=lambda frac, msg: None, on_warning=lambda msg: None) -> dict:
+    """Arka plan işi: portföyü ve log'u yükler, eksik haftalık kapanışları yazar."""
+    acik_pozisyonlar, df_log = prepare_log_inputs(load_portfolio_df(), load_performance_log())
+    if acik_pozisyonlar.empty:
+        return {"positions": 0, "records": 0, "summary": {}}
+    yeni_kayitlar, log_summary = collect_weekly_closes(acik_pozisyonlar, df_log, on_progress, on_warning)
     if yeni_kayitlar:
-        df_yeni = pd.DataFrame(yeni_kayitlar)
-        upsert_performance_log(df_yeni)
-        st.cache_data.clear() # Cache'i temizle
-        
-        st.success(f"✅ Toplam {len(yeni_kayitlar)} adet eksik haftalık kayıt başarıyla log'landı!")
-        with st.expander("Detayları Gör"):
-            for hisse, count in log_summary.items():
-                st.markdown(f"- **{hisse}:** `{count}` adet yeni kayıt eklendi.")
-        st.balloons()
-    else:
-        st.info("💡 Tüm hisseleriniz güncel. Log'a eklenecek yeni haftalık veri bulunamadı.")
\ No newline at end of file
+        upsert_performance_log(pd.DataFrame(yeni_kayitlar))
+    return {"positions": len(acik_pozisyonlar), "records": len(yeni_kayitlar), "summary": log_summary}
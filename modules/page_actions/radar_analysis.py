@@ -4,37 +4,16 @@ import pandas as pd
 import inspect
 
 # Domain functions
-from modules.scanner import run_scan
 from modules.db.trend_scores import get_or_compute_today  # computes today's technicals
 from modules.db.core import save_dataframe  # generic upsert/insert helper
+from modules.db.scan_checkpoints import latest_open_run, new_run_id
+from modules.job_worker import RADAR_ANALYSIS
+from modules.page_actions.jobs_panel import enqueue_job, render_job_status
 
-FUNDAMENTAL_TARGET_TABLE = "radar_scores"
 TECHNICAL_TARGET_TABLE = "trend_scores"
-
-# These are dropped from fundamentals before writing to radar_scores
-FUNDAMENTAL_TECH_COLS = {"rsi", "sma20", "sma50", "trend", "last_price", "date", "tarih"}
 TECH_COLS_PREFERRED_ORDER = ["symbol", "hisse", "date", "tarih", "last_price", "fiyat", "rsi", "sma20", "sma50", "trend"]
 
 
-def _strip_technical_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Remove any technical columns that should no longer live in radar_scores."""
-    drop_cols = [c for c in df.columns if c in FUNDAMENTAL_TECH_COLS]
-    if drop_cols:
-        df = df.drop(columns=drop_cols, errors="ignore")
-    return df
-
-
-def _rename_fundamental_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Normalize fundamental dataframe columns to match `radar_scores` schema.
-    - Expect 'Şirket' to be used as the join key in many places; rename to 'hisse' for DB.
-    """
-    renames = {}
-    if "Şirket" in df.columns and "hisse" not in df.columns:
-        renames["Şirket"] = "hisse"
-    return df.rename(columns=renames)
-
-
 def _ensure_tech_column_order(df: pd.DataFrame) -> pd.DataFrame:
     cols = []
     for c in TECH_COLS_PREFERRED_ORDER:
@@ -45,38 +24,6 @@ def _ensure_tech_column_order(df: pd.DataFrame) -> pd.DataFrame:
     return df[cols + extra] if cols else df
 
 
-def run_fundamental_analysis(df_radar: pd.DataFrame) -> pd.DataFrame:
-    """
-    Runs fundamental analysis pipeline and returns a DB-ready dataframe.
-    """
-    df_fundamental, _, _ = run_scan(df_radar)
-
-    df_fundamental = _rename_fundamental_columns(df_fundamental)
-    df_fundamental = _strip_technical_columns(df_fundamental)
-
-    return df_fundamental
-
-
-def persist_fundamentals(df_fundamental: pd.DataFrame) -> None:
-    st.info(f"💾 Temel analiz sonuçları `{FUNDAMENTAL_TARGET_TABLE}` tablosuna kaydediliyor...")
-    
-    unique_columns = ['hisse', 'period']
-
-    # DataFrame'in bu sütunları içerdiğinden emin olalım.
-    if not all(col in df_fundamental.columns for col in unique_columns):
-        missing = [col for col in unique_columns if col not in df_fundamental.columns]
-        st.error(
-            f"`{FUNDAMENTAL_TARGET_TABLE}` tablosuna kayıt için gerekli olan "
-            f"`{', '.join(missing)}` sütun(ları) bulunamadı."
-        )
-        return
-
-    # `save_dataframe` fonksiyonunu upsert modunda çağırıyoruz.
-    save_dataframe(df_fundamental, table=FUNDAMENTAL_TARGET_TABLE, index_elements=unique_columns)
-    
-    st.success("✅ Temel analiz verileri başarıyla kaydedildi.")
-
-
 def run_technical_analysis(companies: list, force_refresh: bool = False) -> pd.DataFrame:
     """
     Computes/retrieves today's technical metrics for the given companies.
@@ -204,25 +151,33 @@ def render_analysis_controls(df_radar: pd.DataFrame, companies: list):
     """
     Streamlit UI:
       - Separate buttons for triggering fundamental vs technical analysis.
-      - Shows small previews and persists to their respective tables.
+      - Fundamentals are queued as a background job (see `modules.job_worker`);
+        technicals are computed in-session, previewed and persisted.
     """
     st.subheader("⚙️ Analiz İşlemleri")
 
     col1, col2 = st.columns(2)
 
     with col1:
+        incremental = st.checkbox("Yalnızca değişen şirketleri tara", value=True,
+                                  help="Çalışma kitabı ve radar satırı son kayıttan beri değişmeyen şirketler atlanır.")
+        try:
+            open_run = latest_open_run()
+        except Exception:
+            open_run = None  # kontrol noktası tablosu henüz yok
+        resume = open_run is not None and st.checkbox(
+            f"Yarım kalan taramaya devam et (`{open_run}`)", value=True,
+            help="Bu taramada tamamlanan şirketler yeniden taranmaz.")
         if st.button("Temel Analizi Güncelle", type="primary", use_container_width=True):
             try:
-                with st.spinner("📊 Temel analiz skorları hesaplanıyor..."):
-                    df_fund = run_fundamental_analysis(df_radar)
-                    with st.expander("Temel Analiz (ilk 10 satır)"):
-                        st.dataframe(df_fund.head(10))
-                persist_fundamentals(df_fund)
-                st.balloons()
+                # Tarama arka plan işçisinde koşar; sayfa yalnızca işi ekler ve durumunu izler
+                run_id = open_run if resume else new_run_id()
+                enqueue_job(RADAR_ANALYSIS, {"incremental": incremental, "run_id": run_id})
             except Exception as e:
                 with st.expander("Hata Detayı", expanded=False):
                     st.exception(e)
-                st.error("Temel analiz güncelleme sırasında bir hata oluştu.")
+                st.error("Temel analiz işi kuyruğa eklenemedi.")
+        render_job_status(RADAR_ANALYSIS)
 
     with col2:
         if st.button("Teknik Metrikleri Güncelle", use_container_width=True):
@@ -0,0 +1,186 @@
+
+"""Fundamental radar pipeline without any UI: scan the radar and upsert `radar_scores`.
+
+Used by the background job queued from the Action Center page
+(`modules.job_worker`) and by the headless CLI (`python -m modules.scanner`). Database modules are imported
+lazily, so a run that does not persist never opens a connection.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from config import RADAR_XLSX
+from modules.logger import logger
+from modules.scanner import iter_scan, run_scan, scan_columns, scan_frame
+
+FUNDAMENTAL_TARGET_TABLE = "radar_scores"
+FUNDAMENTAL_KEY_COLUMNS = ["hisse", "period"]
+# Akışlı taramada radar_scores'a tek upsert ile yazılan satır sayısı
+FUNDAMENTAL_BATCH_SIZE = 50
+
+# These are dropped from fundamentals before writing to radar_scores
+FUNDAMENTAL_TECH_COLS = {"rsi", "sma20", "sma50", "trend", "last_price", "date", "tarih"}
+
+Batch = Tuple[pd.DataFrame, int, int, List[str]]
+
+
+@dataclass
+class PipelineResult:
+    frame: pd.DataFrame
+    logs: List[str] = field(default_factory=list)
+    saved: int = 0
+    skipped_fresh: int = 0
+    run_id: Optional[str] = None
+
+
+def load_radar(path: Path = Path(RADAR_XLSX)) -> pd.DataFrame:
+    """Fintables radar tablosu; şirket kodları boşluklardan arındırılır."""
+    df_radar = pd.read_excel(path)
+    df_radar["Şirket"] = df_radar["Şirket"].str.strip()
+    return df_radar
+
+
+def _strip_technical_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove any technical columns that should no longer live in radar_scores."""
+    drop_cols = [c for c in df.columns if c in FUNDAMENTAL_TECH_COLS]
+    if drop_cols:
+        df = df.drop(columns=drop_cols, errors="ignore")
+    return df
+
+
+def _rename_fundamental_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize fundamental dataframe columns to match `radar_scores` schema.
+    - Expect 'Şirket' to be used as the join key in many places; rename to 'hisse' for DB.
+    """
+    renames = {}
+    if "Şirket" in df.columns and "hisse" not in df.columns:
+        renames["Şirket"] = "hisse"
+    return df.rename(columns=renames)
+
+
+def _prepare_fundamentals(df: pd.DataFrame) -> pd.DataFrame:
+    df = _rename_fundamental_columns(df)
+    return _strip_technical_columns(df)
+
+
+def run_fundamental_analysis(df_radar: pd.DataFrame) -> pd.DataFrame:
+    """
+    Runs fundamental analysis pipeline and returns a DB-ready dataframe.
+    """
+    df_fundamental, _, _, _ = run_scan(df_radar)
+    return _prepare_fundamentals(df_fundamental)
+
+
+def iter_fundamental_batches(df_radar: pd.DataFrame, batch_size: int = FUNDAMENTAL_BATCH_SIZE,
+                             run_id: str = None, **scan_kwargs) -> Iterator[Batch]:
+    """
+    Streams the fundamental scan: yields `(df_batch, done, total, logs)` every
+    `batch_size` scanned companies (and once at the end). `df_batch` is
+    DB-ready and only holds the successful rows of that batch.
+
+    With `run_id` the scan is checkpointed; re-running the same id replays the
+    finished companies first and only scans the rest. `scan_kwargs` go to
+    `iter_scan` (e.g. `workers`, `chunk_size`).
+    """
+    columns = scan_columns()
+    if run_id:
+        from modules.db.scan_checkpoints import iter_checkpointed_scan
+        events = iter_checkpointed_scan(df_radar, run_id, **scan_kwargs)
+    else:
+        events = iter_scan(df_radar, **scan_kwargs)
+
+    records, logs, done, total = [], [], 0, 0
+    for event in events:
+        done, total = event.done, event.total
+        if event.ok:
+            records.append(event.record)
+        else:
+            logs.append(f"{event.hisse}: {event.error}")
+        if done % batch_size == 0:
+            yield _prepare_fundamentals(scan_frame(records, columns)), done, total, logs
+            records, logs = [], []
+    if records or logs or done % batch_size:
+        yield _prepare_fundamentals(scan_frame(records, columns)), done, total, logs
+
+
+def save_fundamentals(df_fundamental: pd.DataFrame) -> int:
+    """Upserts rows into `radar_scores` on (hisse, period); returns the row count."""
+    if df_fundamental.empty:
+        return 0
+    missing = [col for col in FUNDAMENTAL_KEY_COLUMNS if col not in df_fundamental.columns]
+    if missing:
+        raise KeyError(
+            f"`{FUNDAMENTAL_TARGET_TABLE}` tablosuna kayıt için gerekli olan "
+            f"`{', '.join(missing)}` sütun(ları) bulunamadı."
+        )
+    from modules.db.core import save_dataframe
+    save_dataframe(df_fundamental, table=FUNDAMENTAL_TARGET_TABLE, index_elements=FUNDAMENTAL_KEY_COLUMNS)
+    return len(df_fundamental)
+
+
+def _prepare_universe() -> None:
+    """Builds or updates the universe tensor that the scan's batch scorers slice."""
+    from modules.finance.data_service import financial_data_service
+    from modules.finance.universe import get_universe
+    try:
+        get_universe(financial_data_service.base_dir)
+    except Exception:
+        logger.exception("Evren tensörü hazırlanamadı; skorlar şirket tablolarından hesaplanacak")
+
+
+def run_fundamental_pipeline(
+        df_radar: pd.DataFrame,
+        *,
+        persist: bool = True,
+        incremental: bool = False,
+        run_id: Optional[str] = None,
+        batch_size: int = FUNDAMENTAL_BATCH_SIZE,
+        on_start: Optional[Callable[[int, int], None]] = None,
+        on_batch: Optional[Callable[[pd.DataFrame, int, int, int], None]] = None,
+        **scan_kwargs,
+) -> PipelineResult:
+    """
+    Scans the radar in batches and (with `persist`) upserts every batch into
+    `radar_scores` as soon as it is scored, recording each company's scan state.
+
+    With `incremental`, only companies whose workbook, radar row or scorer
+    versions changed since their last successful upsert are scanned
+    (see `modules.db.radar_scan_state`); requires `persist`. `run_id` makes
+    the run resumable (see `modules.db.scan_checkpoints`).
+
+    Callbacks (for progress UIs): `on_start(to_scan, skipped_fresh)` once,
+    `on_batch(df_batch, done, total, saved)` after every batch.
+    """
+    if incremental and not persist:
+        raise ValueError("Artımlı tarama kayıt durumunu veritabanından okur; persist=False ile kullanılamaz.")
+
+    fingerprints, n_fresh = {}, 0
+    if persist:
+        from modules.db.radar_scan_state import ensure_table, save_scan_state, split_stale
+        ensure_table()
+        df_radar, fingerprints, n_fresh = split_stale(df_radar, full=not incremental)
+    if on_start is not None:
+        on_start(df_radar["Şirket"].nunique(), n_fresh)
+    if not df_radar.empty:
+        _prepare_universe()
+
+    frames, logs, saved = [], [], 0
+    for df_batch, done, total, batch_logs in iter_fundamental_batches(df_radar, batch_size, run_id, **scan_kwargs):
+        if persist and not df_batch.empty:
+            saved += save_fundamentals(df_batch)
+            save_scan_state(fingerprints, df_batch["hisse"])
+        logs.extend(batch_logs)
+        if not df_batch.empty:
+            frames.append(df_batch)
+        if on_batch is not None:
+            on_batch(df_batch, done, total, saved)
+
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    logger.info(f"Temel analiz: {len(frame)} satır, {saved} kayıt, {n_fresh} güncel şirket atlandı, "
+                f"{len(logs)} şirket hatalı")
+    return PipelineResult(frame, logs, saved, n_fresh, run_id)
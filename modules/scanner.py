@@ -2,151 +2,431 @@
 Generic scan utilities shared by Financial Radar and Trap Radar.
 """
 
+import atexit
+import multiprocessing as mp
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
+from itertools import islice
+from pathlib import Path
 import numpy as np
 import pandas as pd
-from typing import Tuple, List, Dict
-from modules.finance.data_loader import load_financial_data
-from modules.scoring import (
-    beneish, graham, lynch, piotroski
-)
-from modules.scores import (
-    fcf_detailed_analysis
-)
-from modules.finance.dcf import monte_carlo_dcf_simple
-from modules.utils import period_order
+from typing import Iterator, Tuple, List, Dict, Optional, Sequence, Union
+from config import SCAN_CHUNK_SIZE, SCAN_WORKERS
+from modules.finance.data_loader import workbook_path
+from modules.finance.data_service import financial_data_service
+from modules.finance.statement_frame import StatementFrame
+from modules.finance.universe import shared_universe
+from modules.scoring import registry, timing
+from modules.scoring.timing import StageTimer, TIMING_COLUMNS, summarize_timings
+from modules.scoring.aggregator import ScoreAggregator, latest_common_periods
+from modules.scoring.result_cache import ScoreCache
 from modules.logger import logger 
 
+Statement = Union[pd.DataFrame, StatementFrame]
+
+_MISS = object()
+
 # ────────────────────────────────────────────────
 # Helpers
 # ────────────────────────────────────────────────
-def latest_common_period(balance: pd.DataFrame,
-                         income: pd.DataFrame,
-                         cash: pd.DataFrame) -> list[str]:
-    bal = {c for c in balance.columns if "/" in c}
-    inc = {c for c in income.columns  if "/" in c}
-    cf  = {c for c in cash.columns    if "/" in c}
-    return sorted(bal & inc & cf, key=period_order, reverse=True)
+def latest_common_period(balance: Statement,
+                         income: Statement,
+                         cash: Statement) -> list[str]:
+    return latest_common_periods(balance, income, cash)
+
 
 # ────────────────────────────────────────────────
-# Generic scanner
+# Process pool (Streamlit yeniden çalıştırmalarında modülle birlikte yaşar)
 # ────────────────────────────────────────────────
-def run_scan(
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def get_scan_pool(workers: int) -> ProcessPoolExecutor:
+    """Kalıcı tarama havuzu; işçi sayısı değişirse ya da bozuk havuz atıldıysa yeniden kurulur."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            # spawn: Streamlit'in iş parçacıklı sürecinden fork almayız
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def _discard_scan_pool(pool: ProcessPoolExecutor) -> None:
+    """Bozulan havuzu bırakır; sonraki `get_scan_pool` yenisini kurar."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL, _POOL_WORKERS = None, 0
+
+
+def shutdown_scan_pool() -> None:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL, _POOL_WORKERS = None, 0
+
+
+atexit.register(shutdown_scan_pool)
+
+
+def _error_category(exc: Exception) -> str:
+    """run_scan sayaç anahtarı: ValueError mesajına göre dönem/fcf/piyasa, gerisi diğer."""
+    if not isinstance(exc, ValueError):
+        return "diğer"
+    msg = str(exc).lower()
+    for key in ("dönem", "fcf", "piyasa"):
+        if key in msg:
+            return key
+    return "diğer"
+
+
+def _scan_chunk(
         radar: pd.DataFrame,
-        *,
-        forecast_years: int = 5,   # default 5 yıl
-        n_sims: int = 1000         # default 1000 simülasyon
-) -> Tuple[pd.DataFrame, List[str], Dict]:
+        companies: Sequence[str],
+        params: dict,
+        scorers: Optional[Sequence[str]],
+        cache: Optional[ScoreCache],
+        base_dir: Optional[Path] = None,
+) -> Tuple[List[tuple], int, int, Dict[str, list]]:
     """
-    If `forecast_years`+`n_sims` are given, the scan also
-    calculates intrinsic value & MOS (Trap_Radar use-case).
-    Otherwise it only returns the core F/M/L/G scores
-    (Financial Radar use-case).
+    Bir şirket grubunu tarar (sıralı yol ve havuz işçileri aynı kodu çalıştırır).
+
+    Dönüş: `companies` sırasında `(şirket, kayıt | None, hata mesajı | None,
+    sayaç anahtarı | None)` listesi, önbellekten gelen ve hesaplanan şirket sayısı
+    ve şirket başına aşama süreleri (`modules.scoring.timing`).
     """
-    records, logs = [], []
-    counters = {"dönem": 0, "fcf": 0, "piyasa": 0, "diğer": 0}
+    if base_dir is not None:
+        financial_data_service.base_dir = Path(base_dir)
+    timer = StageTimer()
+    with timer.active():
+        outcomes, n_hits, n_computed = _scan_companies(radar, companies, params, scorers, cache)
+    return outcomes, n_hits, n_computed, timer.by_company()
+
+
+def _scan_companies(radar, companies, params, scorers, cache) -> Tuple[List[tuple], int, int]:
+    scan_plan = registry.plan(scorers, params)
 
-    companies = radar["Şirket"].dropna().unique()
+    # 1) Önbellek: şirket başına bulunan skorlar ve eksik kalanlar
+    entries, scores, needed = {}, {}, {}
+    for c in companies:
+        with timing.stage("cache", c):
+            try:
+                row               = radar[radar["Şirket"] == c]
+                entry             = cache.entry(c, workbook_path(c, financial_data_service.base_dir), row) if cache else None
+            except Exception as exc:
+                logger.warning(f"{c}: skor önbelleği okunamadı → {exc}")
+                entry             = None
+            entries[c], scores[c] = entry, {}
+            if entry is not None:
+                for spec in scan_plan.scorers:
+                    value = entry.get(spec.name, spec.run_params(params), default=_MISS)
+                    if value is not _MISS:
+                        scores[c][spec.name] = value
+        missing = {spec.name for spec in scan_plan.scorers if spec.name not in scores[c]}
+        if missing:
+            needed[c] = missing
+
+    # 2) Eksikler tek toplu çağrıda (vektörel skorlayıcılar tüm şirketler için bir kez)
+    aggregator = ScoreAggregator(radar, list(needed), scorers=scan_plan.names, params=params)
+    aggregator.run(needed)
+    n_hits, n_computed = len(companies) - len(needed), len(needed) - len(aggregator.errors)
 
+    outcomes = []
     for c in companies:
         try:
-            row               = radar[radar["Şirket"] == c]
-            bal, inc, cash    = load_financial_data(c)
-
-            if bal is None or inc is None or cash is None or bal.empty or inc.empty or cash.empty:
-                # Teknik loglama için
-                logger.warning(f"{c}: Finansal veri setlerinden biri (bilanço, gelir, nakit akış) boş veya eksik. Şirket atlanıyor.")
-                # UI'da göstermek için log listesine ekle
-                logs.append(f"{c}: Gerekli finansal veri (bilanço/gelir/nakit) bulunamadı, atlandı.")
-                counters["diğer"] += 1 # Atlanan şirketleri sayaca ekle
-                continue  # Bu şirketi işlemeyi bırak ve döngüde bir sonrakine geç
-            
-            periods           = latest_common_period(bal, inc, cash)
-            if len(periods) < 2:
-                raise ValueError("ortak dönem yok")
-            curr, prev        = periods[:2]
-
-            f_score, *_        = piotroski.PiotroskiScorer(row, bal, inc,
-                                                          curr, prev).calculate()
-            m_score, *_       = beneish.BeneishScorer(c, bal, inc, cash,
-                                                     curr, prev).calculate()
-            g_score, *_       = graham.GrahamScorer(row).calculate()
-            l_score, *_       = lynch.LynchScorer(row).calculate()
-
-            record = {
-                "hisse": c,
-                "period": curr,
-                "f_skor": f_score,
-                "m_skor": m_score,
-                "graham": g_score,
-                "lynch":  l_score,
-            }
-
-            # Optional MOS branch (Trap Radar view)
-            if forecast_years and n_sims:
-                try:
-                    df_fcf   = fcf_detailed_analysis(c, row)
-                    if df_fcf is None or df_fcf.empty:
-                        raise ValueError("FCF verileri eksik.")
-
-                    ttm_fcf  = (df_fcf["FCF"].iloc[-4:].sum()
-                                if len(df_fcf) >= 4 else df_fcf["FCF"].iloc[-1])
-                    if ttm_fcf <= 0:
-                        raise ValueError("Son FCF negatif.")
-
-                    intrinsic = np.median(
-                        monte_carlo_dcf_simple(ttm_fcf,
-                                            forecast_years=forecast_years,
-                                            n_sims=n_sims)
-                    )
-
-                    cur_price   = row.get("Son Fiyat").iat[0]
-                    market_cap  = row.get("Piyasa Değeri").iat[0]
-                    if cur_price and market_cap and market_cap > 0:
-                        shares_out = market_cap / cur_price
-                        intrinsic_ps = intrinsic / shares_out
-                        premium = (intrinsic_ps - cur_price) / cur_price
-
-                        record.update({
-                            "icsel_deger_medyan": intrinsic,    # Güncellendi
-                            "piyasa_degeri":      market_cap,   # Güncellendi
-                            "MOS":                premium,      # Zaten doğru
-                        })
-                except Exception as mos_error:
-                    logger.warning(f"{c}: MOS hesaplanamadı → {mos_error}")
-            
-            records.append(record)
-
-        except ValueError as exc:
-            msg = str(exc).lower()
-            if "dönem" in msg:
-                counters["dönem"] += 1
-            elif "fcf" in msg:
-                counters["fcf"] += 1
-            elif "piyasa" in msg:
-                counters["piyasa"] += 1
-            else:
-                counters["diğer"] += 1
-            
-            logger.warning(f"{c}: {exc}")
-            logs.append(f"{c}: {exc}")
+            if c in aggregator.errors:
+                raise aggregator.errors[c]
+            entry = entries[c]
+            if c in needed:
+                computed = aggregator.results.get(c, {})
+                if c in aggregator.periods and entry is not None:
+                    entry.set_periods(*aggregator.periods[c])
+                for name, value in computed.items():
+                    # Hata fırlatan skorlayıcının sonucu saklanmaz; sonraki taramada yeniden denenir
+                    if entry is not None and name not in aggregator.failed.get(c, ()):
+                        entry.put(name, value, registry.get_scorer(name).run_params(params))
+                scores[c].update(computed)
+            if entry is not None:
+                with timing.stage("cache", c):
+                    cache.save(entry)
+
+            curr = aggregator.periods.get(c, (entry.curr if entry is not None else None,))[0]
+            record = {"hisse": c}
+            if scan_plan.periods:
+                record["period"] = curr
+            for spec in scan_plan.scorers:
+                if spec.columns:
+                    record.update(scores[c][spec.name])
+                else:
+                    record[spec.name] = scores[c][spec.name]
+
+            outcomes.append((c, record, None, None))
+
         except Exception as exc:
-            counters["diğer"] += 1
             logger.warning(f"{c}: {exc}")
-            logs.append(f"{c}: {exc}")
+            outcomes.append((c, None, str(exc), _error_category(exc)))
+
+    return outcomes, n_hits, n_computed
+
+
+# ────────────────────────────────────────────────
+# Generic scanner
+# ────────────────────────────────────────────────
+@dataclass(frozen=True)
+class ScanEvent:
+    """Tek şirketin tarama sonucu; `done`/`total` ilerleme çubuğu içindir."""
+    hisse: str
+    record: Optional[dict]
+    error: Optional[str] = None
+    category: Optional[str] = None
+    done: int = 0
+    total: int = 0
+    timings: Tuple[Tuple[str, float, float], ...] = ()   # (aşama, duvar s, CPU s)
+
+    @property
+    def ok(self) -> bool:
+        return self.record is not None
+
+
+def scan_columns(scorers: Optional[Sequence[str]] = None, *,
+                 forecast_years: int = 5, n_sims: int = 1000) -> List[str]:
+    """Tarama tablosunun skor sütunları (kayıtlarda eksik olanlar NaN ile doldurulur)."""
+    return registry.plan(scorers, {"forecast_years": forecast_years, "n_sims": n_sims}).columns
 
+
+def scan_frame(records: Sequence[dict], columns: Sequence[str] = ()) -> pd.DataFrame:
+    """Kayıtlardan tarama tablosu: zaman damgası + eksik skor sütunları."""
     df = pd.DataFrame(records)
 
     if not df.empty:
         df["timestamp"] = datetime.now()
         # Yeni kolon adları ile güncellendi
-        for col in ["MOS", "icsel_deger_medyan", "piyasa_degeri"]:
+        for col in columns:
             if col not in df.columns:
                 df[col] = np.nan  # eksikse bile tüm satırlara NaN olarak ekle
+    return df
 
-    if not df.empty:
-        df["timestamp"] = datetime.now()
+
+def iter_scan(
+        radar: pd.DataFrame,
+        *,
+        forecast_years: int = 5,
+        n_sims: int = 1000,
+        scorers: Optional[Sequence[str]] = None,
+        use_cache: bool = True,
+        cache: Optional[ScoreCache] = None,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+) -> Iterator[ScanEvent]:
+    """
+    `run_scan`'in akış hâli: şirketleri `chunk_size`'lık gruplar hâlinde tarar ve
+    her grup bittikçe şirket başına bir `ScanEvent` verir (radar sırasında).
+
+    Bellekte aynı anda yalnızca işlenen grupların verisi tutulur; paralel modda
+    havuza en fazla `2 × workers` grup gönderilmiş olur.
+    """
+    params = {"forecast_years": forecast_years, "n_sims": n_sims}
+    cache = cache or (ScoreCache() if use_cache else None)
+    workers = SCAN_WORKERS if workers is None else max(1, int(workers))
+    chunk_size = max(1, int(chunk_size or SCAN_CHUNK_SIZE))
+
+    companies = list(radar["Şirket"].dropna().unique())
+    chunks = [companies[i:i + chunk_size] for i in range(0, len(companies), chunk_size)]
+
+    if workers > 1 and len(chunks) > 1:
+        results = _scan_parallel(radar, chunks, params, scorers, cache, workers)
+    else:
+        results = (_scan_chunk(radar, chunk, params, scorers, cache) for chunk in chunks)
+
+    done = n_hits = n_computed = 0
+    for outcomes, hits, computed, timings in results:
+        n_hits, n_computed = n_hits + hits, n_computed + computed
+        for c, record, error, category in outcomes:
+            done += 1
+            yield ScanEvent(c, record, error, category, done, len(companies), tuple(timings.get(c, ())))
+
+    if cache is not None:
+        logger.info(f"Skor önbelleği: {n_hits} şirket önbellekten, {n_computed} şirket hesaplandı")
+
+
+def run_scan(
+        radar: pd.DataFrame,
+        *,
+        forecast_years: int = 5,   # default 5 yıl
+        n_sims: int = 1000,        # default 1000 simülasyon
+        scorers: Optional[Sequence[str]] = None,
+        use_cache: bool = True,
+        cache: Optional[ScoreCache] = None,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        run_id: Optional[str] = None,
+        save_timings: bool = False,
+) -> Tuple[pd.DataFrame, List[str], Dict, pd.DataFrame]:
+    """
+    If `forecast_years`+`n_sims` are given, the scan also
+    calculates intrinsic value & MOS (Trap_Radar use-case).
+    Otherwise it only returns the core F/M/L/G scores
+    (Financial Radar use-case).
+
+    `scorers` selects registry entries by name (default: every enabled one).
+    The I/O is planned from their declared dependencies: when none of them
+    reads a statement, no workbook is opened.
+
+    With `use_cache` every score is first looked up in the persistent score
+    cache (`modules.scoring.result_cache`); only missing or stale scores are
+    computed, and a company whose scores all hit never opens its workbook.
+
+    `workers` (default `config.SCAN_WORKERS`) > 1 splits the companies into
+    chunks of `chunk_size` (default `config.SCAN_CHUNK_SIZE`) and scores them
+    on a persistent process pool. Records, logs and counters come back in
+    radar order, identical to a sequential scan.
+
+    See `iter_scan` for the streaming variant. With `run_id` the scan is
+    checkpointed to the database and resumable: re-running with the same id
+    skips companies that already finished (`modules.db.scan_checkpoints`).
+
+    Returns `(df, logs, counters, timings)`. `timings` is the diagnostics
+    frame: one row per company and stage (cache, load, periods, universe,
+    each scorer, mos.fcf / mos.dcf) with wall and CPU seconds; see
+    `summarize_timings` for totals and percentiles. `save_timings` also
+    appends it to the `scan_timings` table.
+    """
+    records, logs, timing_rows = [], [], []
+    counters = {"dönem": 0, "fcf": 0, "piyasa": 0, "diğer": 0}
+
+    scan = iter_scan
+    if run_id is not None:
+        from modules.db.scan_checkpoints import iter_checkpointed_scan
+        scan = partial(iter_checkpointed_scan, run_id=run_id)
+
+    for event in scan(radar, forecast_years=forecast_years, n_sims=n_sims, scorers=scorers,
+                      use_cache=use_cache, cache=cache, workers=workers, chunk_size=chunk_size):
+        timing_rows.extend((event.hisse, *t) for t in event.timings)
+        if event.ok:
+            records.append(event.record)
+        else:
+            counters[event.category] += 1
+            logs.append(f"{event.hisse}: {event.error}")
+
+    df = scan_frame(records, scan_columns(scorers, forecast_years=forecast_years, n_sims=n_sims))
     if "MOS" in df.columns:
         df.sort_values("MOS", ascending=False, inplace=True)
 
-    return df, logs, counters
+    timings = pd.DataFrame(timing_rows, columns=TIMING_COLUMNS)
+    if not timings.empty:
+        summary = summarize_timings(timings)
+        logger.info("Tarama süreleri (duvar s): " + ", ".join(
+            f"{stage} {row.wall_total:.2f}" for stage, row in summary.iterrows()))
+    if save_timings:
+        from modules.db.scan_timings import save_scan_timings
+        save_scan_timings(timings, run_id)
+
+    return df, logs, counters, timings
+
+
+def _scan_parallel(radar, chunks, params, scorers, cache, workers) -> Iterator[tuple]:
+    """Grupları havuza dağıtır; sonuçlar gönderim sırasında verilir."""
+    base_dir = financial_data_service.base_dir
+    # Var olan tensör işçilerden önce güncellenir; işçiler yalnızca hazır nesli haritalar
+    try:
+        shared_universe(base_dir)
+    except Exception:
+        logger.exception("Evren tensörü güncellenemedi")
+    pool = get_scan_pool(workers)
+    pending = deque()
+    queue = iter(chunks)
+
+    def submit(chunk):
+        # İşçiye yalnızca kendi şirketlerinin radar satırları gönderilir
+        part = radar[radar["Şirket"].isin(chunk)]
+        try:
+            future = pool.submit(_scan_chunk, part, chunk, params, scorers, cache, base_dir)
+        except Exception as exc:
+            # Bozuk havuz yeni iş kabul etmez; grup sıralı taranır
+            if isinstance(exc, BrokenProcessPool):
+                _discard_scan_pool(pool)
+            future = _failed_future()
+        pending.append((chunk, future))
+
+    for chunk in islice(queue, 2 * workers):
+        submit(chunk)
+    while pending:
+        chunk, future = pending.popleft()
+        try:
+            result = future.result()
+        except Exception as exc:
+            # Havuz çöktüyse (ör. işçi öldü) grup bu süreçte yeniden taranır
+            if isinstance(exc, BrokenProcessPool):
+                _discard_scan_pool(pool)
+            logger.warning(f"Paralel tarama grubu başarısız, sıralı taranıyor → {exc}")
+            result = _scan_chunk(radar, chunk, params, scorers, cache)
+        for nxt in islice(queue, 1):
+            submit(nxt)
+        yield result
+
+
+def _failed_future() -> Future:
+    future = Future()
+    future.set_exception(RuntimeError("tarama havuzu kullanılamıyor"))
+    return future
+
+
+# ────────────────────────────────────────────────
+# Headless CLI:  python -m modules.scanner --workers 4 --parquet out.parquet
+# ────────────────────────────────────────────────
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Radar'ı tarayıp radar_scores'a yazar (Streamlit'siz; cron / batch sunucuları için)."""
+    import argparse
+    from config import RADAR_XLSX
+    from modules.radar_pipeline import FUNDAMENTAL_BATCH_SIZE, load_radar, run_fundamental_pipeline
+
+    parser = argparse.ArgumentParser(prog="python -m modules.scanner",
+                                     description="Temel analiz taraması (radar_scores).")
+    parser.add_argument("--radar", type=Path, default=Path(RADAR_XLSX), help="Fintables radar dosyası")
+    parser.add_argument("--workers", type=int, default=SCAN_WORKERS,
+                        help="işçi süreç sayısı (varsayılan 1 = sıralı; ör. çekirdek sayısı - 1)")
+    parser.add_argument("--chunk-size", type=int, default=SCAN_CHUNK_SIZE, help="işçiye verilen şirket sayısı")
+    parser.add_argument("--batch-size", type=int, default=FUNDAMENTAL_BATCH_SIZE, help="upsert başına satır")
+    parser.add_argument("--incremental", action="store_true", help="yalnızca değişen şirketleri tara")
+    parser.add_argument("--run-id", help="kontrol noktalı koşu; aynı id ile yeniden çalıştırma kaldığı yerden devam eder")
+    parser.add_argument("--no-db", action="store_true", help="radar_scores'a yazma")
+    parser.add_argument("--parquet", type=Path, help="sonuçları Parquet olarak da yaz")
+    parser.add_argument("--json", type=Path, help="sonuçları JSON (records) olarak da yaz")
+    args = parser.parse_args(argv)
+
+    df_radar = load_radar(args.radar)
+    result = run_fundamental_pipeline(
+        df_radar,
+        persist=not args.no_db,
+        incremental=args.incremental,
+        run_id=args.run_id,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    if args.parquet:
+        result.frame.to_parquet(args.parquet, index=False)
+    if args.json:
+        result.frame.to_json(args.json, orient="records", date_format="iso", force_ascii=False, indent=1)
+
+    print(f"{len(result.frame)} şirket skorlandı, {result.saved} satır kaydedildi, "
+          f"{result.skipped_fresh} güncel şirket atlandı, {len(result.logs)} şirket atlandı (hata)")
+    for line in result.logs:
+        print(f"  - {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,42 +1,20 @@
-import streamlit as st  # type: ignore
-
-from modules.finance.data_loader import load_financial_data
-from modules.scoring.beneish import BeneishScorer
-from modules.scoring.graham import GrahamScorer
-from modules.scoring.lynch import LynchScorer
-from modules.scoring.piotroski import PiotroskiScorer
+# Streamlit ve matplotlib yalnızca kart/grafik gösterilirken yüklenir; böylece
+# `modules` paketi başsız (CLI, işçi süreçleri) ortamlarda hızlı ve UI'sız açılır.
+from modules.finance.data_service import get_financial_data
+from modules.scoring.aggregator import ScoreAggregator
 
 from modules.finance.fcf import (
     build_fcf_dataframe,
     fcf_yield_series,
 )
-from modules.finance.plots import (
-    plot_fcf_yield_time_series,
-    plot_fcf_detailed,
-)
 
 # ---------------- Scores ----------------
 
 def calculate_scores(company, row, balance, income, cashflow, current_period, previous_period):
-    f_score, f_karne, f_detail = PiotroskiScorer(row, balance, income, current_period, previous_period).calculate()
-    m_skor, m_karne, m_lines  = BeneishScorer(company, balance, income, cashflow, current_period, previous_period).calculate()
-    graham_skor, graham_karne, graham_lines = GrahamScorer(row).calculate()
-    lynch_skor, lynch_karne, lynch_lines = LynchScorer(row).calculate()
-
-    return {
-        "f_score": f_score,
-        "f_karne": f_karne,
-        "m_skor": m_skor,
-        "m_karne": m_karne,
-        "m_lines": m_lines,
-        "graham_skor": graham_skor,
-        "graham_karne": graham_karne,
-        "graham_lines": graham_lines,
-        "lynch_skor": lynch_skor,
-        "lynch_karne": lynch_karne,
-        "lynch_lines": lynch_lines,
-        "detail": f_detail
-    }
+    """Tek şirketin skor kartları; `ScoreAggregator.cards` üzerinden."""
+    scores = ScoreAggregator.cards(company, row, balance, income, cashflow, current_period, previous_period)
+    scores["detail"] = scores.pop("f_detail", {})
+    return scores
 
 def generate_report(company, scores, show_details=False):
     lines = [
@@ -62,8 +40,9 @@ def generate_report(company, scores, show_details=False):
     return lines
 
 def show_company_scorecard(company, row, current_period, previous_period):
+    import streamlit as st  # type: ignore
     try:
-        balance, income, cashflow = load_financial_data(company)
+        balance, income, cashflow = get_financial_data(company)
         scores = calculate_scores(
             company,
             row,
@@ -128,6 +107,7 @@ def fcf_detailed_analysis(company, row):
 
 def fcf_detailed_analysis_plot(company, row):
     """Build the FCF dataframe and return a matplotlib FIG (and show via Streamlit)."""
+    from modules.finance.plots import plot_fcf_detailed
     df = build_fcf_dataframe(company, row)
     fig = plot_fcf_detailed(company, df)
     try:
@@ -140,6 +120,7 @@ def fcf_detailed_analysis_plot(company, row):
 def fcf_yield_time_series(company, row):
     """Backward-compat wrapper: compute FCF yield series and show plot with Streamlit."""
     try:
+        from modules.finance.plots import plot_fcf_yield_time_series
         series = fcf_yield_series(company, row)
         fig = plot_fcf_yield_time_series(company, series)
         import streamlit as st  # type: ignore
@@ -1,41 +1,218 @@
-from modules.scoring.beneish import BeneishScorer
-from modules.scoring.graham import GrahamScorer
-from modules.scoring.lynch import LynchScorer
-from modules.scoring.piotroski import PiotroskiScorer
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+from modules.finance.data_service import financial_data_service, get_canonical_data, get_financial_data
+from modules.finance.line_items import STATEMENTS
+from modules.finance.statement_frame import StatementFrame
+from modules.finance.universe import CanonicalUniverse, shared_universe
+from modules.logger import logger
+from modules.scoring import registry, timing
+from modules.utils import period_order
+
+
+class MissingStatementsError(Exception):
+    """Bilanço / gelir / nakit akış tablolarından biri boş ya da eksik."""
+
+
+def latest_common_periods(*statements) -> List[str]:
+    """Verilen tabloların ortak dönemleri, yeniden eskiye."""
+    periods = set.intersection(*(set(StatementFrame.of(s).periods) for s in statements))
+    return sorted(periods, key=period_order, reverse=True)
 
 
 class ScoreAggregator:
-    def __init__(self, company, row, balance, income, cashflow, curr, prev):
-        self.company = company
-        self.row = row
-        self.balance = balance
-        self.income = income
-        self.cashflow = cashflow
-        self.curr = curr
-        self.prev = prev
-
-    def run_all(self):
-        piotroski = PiotroskiScorer(self.row, self.balance, self.income, self.curr, self.prev)
-        beneish = BeneishScorer(self.company, self.balance, self.income, self.cashflow, self.curr, self.prev)
-        graham = GrahamScorer(self.row)
-        lynch = LynchScorer(self.row)
-
-        f_score, f_summary, f_detail = piotroski.calculate()
-        m_score, m_summary, m_lines = beneish.calculate()
-        g_score, g_summary, g_lines = graham.calculate()
-        l_score, l_summary, l_lines = lynch.calculate()
-
-        return {
-            "f_score": f_score,
-            "f_karne": f_summary,
-            "f_detail": f_detail,
-            "m_skor": m_score,
-            "m_karne": m_summary,
-            "m_lines": m_lines,
-            "graham_skor": g_score,
-            "graham_karne": g_summary,
-            "graham_lines": g_lines,
-            "lynch_skor": l_score,
-            "lynch_karne": l_summary,
-            "lynch_lines": l_lines,
-        }
\ No newline at end of file
+    """
+    Toplu skor giriş noktası (tarayıcı ve hisse analizi sayfası).
+
+    Ticker listesi ya da radar'daki tüm şirketler için her şirketin verisini bir kez
+    yükler; registry'de vektörel (`batch`) yolu olan skorlayıcıları tüm şirketler için
+    tek geçişte, diğerlerini şirket başına çalıştırır ve tek tablo döndürür.
+    Kartlar (karne/detay metinleri) yalnızca `cards` ile istendiğinde üretilir.
+    """
+
+    def __init__(self, radar: Optional[pd.DataFrame] = None, tickers: Optional[Iterable[str]] = None, *,
+                 scorers: Optional[Iterable[str]] = None, params: Optional[dict] = None):
+        self.radar = radar if radar is not None else pd.DataFrame(columns=["Şirket"])
+        if tickers is None:
+            tickers = self.radar["Şirket"].dropna().unique()
+        self.tickers: List[str] = list(dict.fromkeys(tickers))
+        self.params = dict(params or {})
+        self.plan = registry.plan(scorers, self.params)
+        self.results: Dict[str, dict] = {}
+        self.periods: Dict[str, tuple] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.failed: Dict[str, Set[str]] = {}   # şirket -> hata fırlatan skorlayıcılar
+        self._batches: Dict[tuple, registry.BatchContext] = {}
+
+    # ------------------------------------------------------------------
+    def run(self, needed: Optional[Dict[str, Set[str]]] = None) -> pd.DataFrame:
+        """
+        Skorları hesaplar. `needed`: şirket -> hesaplanacak skor adları (varsayılan:
+        planın tamamı); önbellekte bulunan skorlar böylece yeniden hesaplanmaz.
+        Veri/dönem hatası olan şirketler `errors`'a yazılır ve atlanır; hata fırlatan
+        skorlayıcı boş sonuç verir ve `failed`'a yazılır.
+        """
+        specs = {s.name: s for s in self.plan.scorers}
+        if needed is None:
+            needed = {t: set(specs) for t in self.tickers}
+        rows = self._rows()
+
+        contexts: Dict[str, registry.ScoreContext] = {}
+        for t in self.tickers:
+            names = needed.get(t)
+            if not names:
+                continue
+            wanted = [specs[n] for n in names]
+            try:
+                contexts[t] = self._context(t, rows.get(t), wanted)
+            except Exception as exc:
+                self.errors[t] = exc
+
+        # Vektörel skorlayıcılar: gereken tüm şirketler için tek çağrı
+        for spec in self.plan.scorers:
+            companies = [t for t, ctx in contexts.items() if spec.name in needed[t]]
+            if not companies:
+                continue
+            if spec.batch is not None:
+                try:
+                    batch = self._batch_context(companies, spec, contexts)
+                    with timing.stage(spec.name, companies):
+                        values = spec.batch(batch)
+                    for t in companies:
+                        self.results.setdefault(t, {})[spec.name] = values[t]
+                    continue
+                except Exception:
+                    logger.exception(f"{spec.name}: toplu hesap başarısız, şirket başına hesaplanacak")
+            for t in companies:
+                with timing.stage(spec.name, t):
+                    try:
+                        value = spec.compute(contexts[t])
+                    except Exception as exc:
+                        logger.warning(f"{t}: {spec.name} hesaplanamadı → {exc}")
+                        value = {} if spec.columns else None
+                        self.failed.setdefault(t, set()).add(spec.name)
+                self.results.setdefault(t, {})[spec.name] = value
+        # Hata alan şirketlerin yarım sonuçları tutulmaz
+        for t in self.errors:
+            self.results.pop(t, None)
+        return self.frame()
+
+    def frame(self) -> pd.DataFrame:
+        """Şirket başına tek satır: period / prev, skor sütunları ve hata metni."""
+        records = []
+        for t in self.tickers:
+            record = {"hisse": t, "period": None, "prev": None}
+            if t in self.periods:
+                record["period"], record["prev"] = self.periods[t]
+            for spec in self.plan.scorers:
+                value = self.results.get(t, {}).get(spec.name)
+                if spec.columns:
+                    record.update({col: (value or {}).get(col) for col in spec.columns})
+                else:
+                    record[spec.name] = value
+            record["error"] = str(self.errors[t]) if t in self.errors else None
+            records.append(record)
+        if not records:
+            columns = ["period", "prev"] + [c for s in self.plan.scorers for c in (s.columns or [s.name])] + ["error"]
+            return pd.DataFrame(columns=columns, index=pd.Index([], name="hisse"))
+        return pd.DataFrame(records).set_index("hisse")
+
+    # ------------------------------------------------------------------
+    def _rows(self) -> Dict[str, pd.DataFrame]:
+        names = self.radar["Şirket"]
+        return {t: self.radar[names == t] for t in self.tickers}
+
+    def _context(self, ticker: str, row: Optional[pd.DataFrame], specs) -> registry.ScoreContext:
+        row = row if row is not None else self.radar.iloc[0:0]
+        ctx = registry.ScoreContext(ticker, row, params=self.params)
+        if any(s.needs_workbook for s in specs):
+            with timing.stage("load", ticker):
+                bal, inc, cash = get_financial_data(ticker)
+                if bal is None or inc is None or cash is None or bal.empty or inc.empty or cash.empty:
+                    logger.warning(f"{ticker}: Finansal veri setlerinden biri (bilanço, gelir, nakit akış) boş veya eksik. Şirket atlanıyor.")
+                    raise MissingStatementsError("Gerekli finansal veri (bilanço/gelir/nakit) bulunamadı, atlandı.")
+                # Yalnızca planlanan tablolar bir kez indekslenir; skorlayıcılar aynı görünümü paylaşır
+                frames = dict(zip(STATEMENTS, (bal, inc, cash)))
+                ctx.statements = {st: StatementFrame(frames[st]) for st in self.plan.statements}
+        if any(s.periods for s in specs):
+            with timing.stage("periods", ticker):
+                periods = latest_common_periods(*(ctx.statements[st] for st in registry.PERIOD_STATEMENTS))
+            if len(periods) < 2:
+                raise ValueError("ortak dönem yok")
+            ctx.curr, ctx.prev = periods[:2]
+            self.periods[ticker] = (ctx.curr, ctx.prev)
+        return ctx
+
+    def _batch_context(self, companies: List[str], spec, contexts) -> registry.BatchContext:
+        # Aynı şirket kümesini okuyan skorlayıcılar (F, M) tek evren + TTM motorunu paylaşır
+        key = (tuple(companies), spec.needs_workbook)
+        batch = self._batches.get(key)
+        if batch is None:
+            universe = None
+            if spec.needs_workbook:
+                with timing.stage("universe", companies):
+                    universe = self._universe(companies)
+            batch = registry.BatchContext(
+                companies, self.radar, universe,
+                curr={t: contexts[t].curr for t in companies if contexts[t].curr},
+                prev={t: contexts[t].prev for t in companies if contexts[t].prev},
+                params=self.params,
+            )
+            self._batches[key] = batch
+        return batch
+
+    @staticmethod
+    def _universe(companies: List[str]) -> CanonicalUniverse:
+        # Tensör varsa ondan kesit; yoksa (ya da içinde olmayan şirket varsa) tablolardan kurulur
+        try:
+            shared = shared_universe(financial_data_service.base_dir)
+            if shared is not None and all(t in shared.company_index for t in companies):
+                return shared.subset(companies)
+        except Exception:
+            logger.exception("Paylaşılan evren okunamadı, şirket tablolarından kurulacak")
+        return CanonicalUniverse.from_canonical({t: get_canonical_data(t) for t in companies})
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def context(company, row, balance, income, cashflow, curr, prev,
+                params: Optional[dict] = None) -> registry.ScoreContext:
+        """Önceden yüklenmiş tablolar ve seçilmiş dönemlerle tek şirketin bağlamı."""
+        return registry.ScoreContext(
+            company, row,
+            statements=dict(zip(STATEMENTS, (StatementFrame.of(df) for df in (balance, income, cashflow)))),
+            curr=curr, prev=prev, params=dict(params or {}),
+        )
+
+    @staticmethod
+    def score_context(ctx: registry.ScoreContext, scorers: Optional[Iterable[str]] = None) -> dict:
+        """
+        Hazır bağlamın (sayfanın yüklediği tablolar ve gösterdiği dönemler) skorları;
+        `frame` ile aynı alanlar. Hata veren skorlayıcının değeri None olur, diğerleri
+        hesaplanır ve hatalar `error` alanında toplanır.
+        """
+        record = {"period": ctx.curr, "prev": ctx.prev}
+        errors = []
+        for spec in registry.plan(scorers, ctx.params).scorers:
+            try:
+                value = spec.compute(ctx)
+            except Exception as exc:
+                logger.warning(f"{ctx.symbol}: {spec.name} hesaplanamadı → {exc}")
+                errors.append(f"{spec.name}: {exc}")
+                value = None
+            if spec.columns:
+                record.update({col: (value or {}).get(col) for col in spec.columns})
+            else:
+                record[spec.name] = value
+        record["error"] = "; ".join(errors) or None
+        return record
+
+    @staticmethod
+    def cards(company, row, balance, income, cashflow, curr, prev) -> dict:
+        """Tek şirketin kart alanları (f_score/f_karne/f_detail, m_skor/m_karne/m_lines, ...)."""
+        ctx = ScoreAggregator.context(company, row, balance, income, cashflow, curr, prev)
+        result = {}
+        for spec in registry.scorers():
+            if spec.explain is not None:
+                result.update(spec.explain(ctx))
+        return result
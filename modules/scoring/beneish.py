@@ -1,12 +1,20 @@
-from modules.utils import safe_divide
-from modules.finance.financial_snapshot import build_snapshot
+import numpy as np
+import pandas as pd
+
+from modules.utils import safe_divide, safe_divide_array
+from modules.finance.financial_snapshot import snapshot_from_canonical
+from modules.finance.line_items import BALANCE, CASHFLOW, INCOME, resolve_statements
+from modules.finance.universe import CanonicalUniverse
 from modules.logger import logger
 
+SCORER_VERSION = "1"
+
 def calculate_beneish_m_score(company, balance, income, cashflow, curr, prev):
     try:
         #Gerekli kalemleri al
-        snap_curr = build_snapshot(balance, income, cashflow, period=curr)
-        snap_prev = build_snapshot(balance, income, cashflow, period=prev)
+        canon = resolve_statements(balance, income, cashflow)
+        snap_curr = snapshot_from_canonical(canon, curr)
+        snap_prev = snapshot_from_canonical(canon, prev)
 
         # 1. DSRI
         DSRI = safe_divide(safe_divide(snap_curr.trade_receivables, snap_curr.sales), safe_divide(snap_prev.trade_receivables, snap_prev.sales))
@@ -69,6 +77,12 @@ class BeneishScorer:
         self.curr = curr
         self.prev = prev
 
+    def score(self):
+        """Kart/metin üretmeden yalnızca M-Skor."""
+        return calculate_beneish_m_score(
+            self.company, self.balance, self.income, self.cashflow, self.curr, self.prev
+        )
+
     def calculate(self):
         m_score = calculate_beneish_m_score(
             self.company, self.balance, self.income, self.cashflow, self.curr, self.prev
@@ -76,3 +90,74 @@ class BeneishScorer:
         karne, lines = m_skor_karne_yorum(m_score)
         
         return m_score, karne, lines
+
+
+# ----------------------------------------------------------------------
+# Evren çapında vektörel M-Skor
+# ----------------------------------------------------------------------
+BENEISH_COMPONENTS = ["DSRI", "GMI", "AQI", "SGI", "DEPI", "SGAI", "TATA", "LVGI"]
+BENEISH_WEIGHTS = np.array([0.92, 0.528, 0.404, 0.892, 0.115, -0.172, 4.679, -0.327])
+BENEISH_INTERCEPT = -4.84
+BENEISH_THRESHOLD = -2.22
+
+
+def beneish_frame(universe: CanonicalUniverse, curr=None, prev=None) -> pd.DataFrame:
+    """
+    Sekiz Beneish endeksini ve M-Skoru tüm şirketler için tek geçişte hesaplar.
+
+    `curr` / `prev`: tek dönem, şirket -> dönem eşlemesi ya da None (bilanço, gelir
+    ve nakit akışının ortak son iki dönemi). `calculate_beneish_m_score` ile aynı
+    kurallar: her oran `safe_divide` gibi NaN / sıfır paydada 0, LVGI'nin iç
+    bölümleri ham bölme, M-Skor 2 haneye yuvarlanır. Dönemi tablolarda olmayan
+    satırlarda `m_score` NaN. Bileşenler sütun olarak döner; `passed` = M < -2.22.
+    """
+    sd = safe_divide_array
+    common = universe.common_mask(BALANCE, INCOME, CASHFLOW)
+    default_curr, default_prev = universe.latest_two(common)
+    curr_cols = universe.period_columns(curr, default_curr)
+    prev_cols = universe.period_columns(prev, default_prev)
+
+    def pair(item):
+        return universe.take(item, curr_cols), universe.take(item, prev_cols)
+
+    tr_c, tr_p = pair("trade_receivables")
+    sales_c, sales_p = pair("sales")
+    cogs_c, cogs_p = pair("cogs")
+    ca_c, ca_p = pair("current_assets")
+    ppe_c, ppe_p = pair("pp_e")
+    ta_c, ta_p = pair("total_assets")
+    dep_c, dep_p = pair("depreciation")
+    ga_c, ga_p = pair("g_and_a_exp")
+    mk_c, mk_p = pair("marketing_exp")
+    np_c, _ = pair("net_profit")
+    ocf_c, _ = pair("operating_cash_flow")
+    tl_c = universe.take("short_term_liabilities", curr_cols) + universe.take("long_term_liabilities", curr_cols)
+    tl_p = universe.take("short_term_liabilities", prev_cols) + universe.take("long_term_liabilities", prev_cols)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        components = {
+            "DSRI": sd(sd(tr_c, sales_c), sd(tr_p, sales_p)),
+            "GMI":  sd(sd(sales_p - cogs_p, sales_p), sd(sales_c - cogs_c, sales_c)),
+            "AQI":  sd(1 - sd(ca_c + ppe_c, ta_c), 1 - sd(ca_p + ppe_p, ta_p)),
+            "SGI":  sd(sales_c, sales_p),
+            "DEPI": sd(sd(dep_p, dep_p + ppe_p), sd(dep_c, dep_c + ppe_c)),
+            "SGAI": sd(sd(ga_c + mk_c, sales_c), sd(ga_p + mk_p, sales_p)),
+            "TATA": sd(np_c - ocf_c, ta_c),
+            "LVGI": sd(tl_c / ta_c, tl_p / ta_p),
+        }
+        # Tekil formüldeki toplama sırası korunur (yuvarlama sınırında aynı sonuç)
+        m_score = np.full(len(curr_cols), BENEISH_INTERCEPT)
+        for weight, key in zip(BENEISH_WEIGHTS, BENEISH_COMPONENTS):
+            m_score = m_score + weight * components[key]
+        m_score = np.round(m_score, 2)
+
+    valid = universe.covers(common, curr_cols) & universe.covers(common, prev_cols)
+    m_score = np.where(valid, m_score, np.nan)
+
+    df = pd.DataFrame(components, index=pd.Index(universe.companies, name="hisse"))
+    df.insert(0, "curr", universe.labels(curr_cols))
+    df.insert(1, "prev", universe.labels(prev_cols))
+    df["m_score"] = m_score
+    df["passed"] = m_score < BENEISH_THRESHOLD
+    df["valid"] = valid
+    return df
@@ -1,5 +1,10 @@
+import numpy as np
 import pandas as pd
 
+from modules.utils import radar_columns
+
+SCORER_VERSION = "1"
+
 def graham_score(row):
     if not row.empty:
         row = row.iloc[0]
@@ -16,29 +21,48 @@ def graham_score(row):
         score += 1
     return score
 
-def graham_score_card(row):
+def _card_row(row) -> pd.Series:
     # Kabul edilen tipler: DataFrame (tek satır beklenir) veya Series
     if isinstance(row, pd.DataFrame):
-        if row.empty:
-            row = pd.Series(dtype=float)
-        else:
-            row = row.iloc[0]
-    elif not isinstance(row, pd.Series):
-        row = pd.Series(dtype=float)
+        return pd.Series(dtype=float) if row.empty else row.iloc[0]
+    if not isinstance(row, pd.Series):
+        return pd.Series(dtype=float)
+    return row
+
+
+GRAHAM_CHECKS = [
+    ("F/K", "F/K", lambda x: x < 15, "F/K < 15"),
+    ("PD/DD", "PD/DD", lambda x: x < 1.5, "PD/DD < 1.5"),
+    ("Cari Oran", "Cari Oran", lambda x: 2 < x < 100, "2 < Cari Oran < 100"),
+    ("Nakit Akışı", "İşletme Faaliyetlerinden Nakit Akışları", lambda x: x > 0, "İşletme Nakit Akışı > 0"),
+    ("Serbest Nakit Akışı", "Yıllıklandırılmış Serbest Nakit Akışı", lambda x: x > 0, "Yıllıklandırılmış FCF > 0"),
+]
+
+
+def _to_number(value):
+    # Sayılar doğrudan; diğer her şey (metin, None, bool…) eskisi gibi pd.to_numeric ile
+    if isinstance(value, (float, int, np.floating, np.integer)) and not isinstance(value, (bool, np.bool_)):
+        return float(value)
+    return pd.to_numeric(pd.Series([value]), errors="coerce").iloc[0]
+
+
+def _graham_values(row):
+    """(etiket, sayısal değer ya da NaN, koşul, açıklama) dörtlüleri."""
+    row = _card_row(row)
+    for label, column, condition, desc in GRAHAM_CHECKS:
+        yield label, _to_number(row.get(column)), condition, desc
+
 
+def graham_points(row) -> int:
+    """Yalnızca sayısal Graham skoru (graham_score_card ile aynı kurallar, metin yok)."""
+    return sum(int(bool(condition(float(v)))) for _, v, condition, _ in _graham_values(row) if pd.notna(v))
+
+
+def graham_score_card(row):
     score = 0
     lines = []
 
-    items = [
-        ("F/K", row.get("F/K") if hasattr(row, "get") else None, lambda x: x < 15, "F/K < 15"),
-        ("PD/DD", row.get("PD/DD") if hasattr(row, "get") else None, lambda x: x < 1.5, "PD/DD < 1.5"),
-        ("Cari Oran", row.get("Cari Oran") if hasattr(row, "get") else None, lambda x: 2 < x < 100, "2 < Cari Oran < 100"),
-        ("Nakit Akışı", row.get("İşletme Faaliyetlerinden Nakit Akışları") if hasattr(row, "get") else None, lambda x: x > 0, "İşletme Nakit Akışı > 0"),
-        ("Serbest Nakit Akışı", row.get("Yıllıklandırılmış Serbest Nakit Akışı") if hasattr(row, "get") else None, lambda x: x > 0, "Yıllıklandırılmış FCF > 0"),
-    ]
-
-    for label, value, condition, desc in items:
-        v = pd.to_numeric(pd.Series([value]), errors="coerce").iloc[0]
+    for label, v, condition, desc in _graham_values(row):
         if pd.notna(v):
             passed = bool(condition(float(v)))
             # Güvenli gösterim
@@ -56,7 +80,41 @@ class GrahamScorer:
     def __init__(self, row):
         self.row = row
 
+    def score(self):
+        return graham_points(self.row)
+
     def calculate(self):
 
         g_score, summary, lines = graham_score_card(self.row)
         return g_score, summary, lines
+
+
+# ----------------------------------------------------------------------
+# Radar tablosunun tamamı için sütun bazlı skor
+# ----------------------------------------------------------------------
+GRAHAM_FLAGS = ["graham_fk", "graham_pddd", "graham_cari", "graham_nakit", "graham_fcf"]
+RADAR_COLUMNS = ["F/K", "PD/DD", "Cari Oran",
+                 "İşletme Faaliyetlerinden Nakit Akışları", "Yıllıklandırılmış Serbest Nakit Akışı"]
+
+
+def graham_frame(radar: pd.DataFrame) -> pd.DataFrame:
+    """
+    Graham kriterlerini tüm radar için tek seferde değerlendirir (şirket başına ilk satır).
+    `graham_score_card` ile aynı kurallar; eksik/sayısal olmayan değer kriteri geçmez.
+    Sütunlar: kriter bayrakları (`GRAHAM_FLAGS`) ve `graham` skoru.
+    """
+    companies, v, _ = radar_columns(radar, RADAR_COLUMNS)
+    fk, pddd, cari = v["F/K"], v["PD/DD"], v["Cari Oran"]
+    ocf, fcf = v["İşletme Faaliyetlerinden Nakit Akışları"], v["Yıllıklandırılmış Serbest Nakit Akışı"]
+
+    with np.errstate(invalid="ignore"):
+        flags = np.column_stack([
+            fk < 15,
+            pddd < 1.5,
+            (cari > 2) & (cari < 100),
+            ocf > 0,
+            fcf > 0,
+        ])
+    data = dict(zip(GRAHAM_FLAGS, flags.T))
+    data["graham"] = flags.sum(axis=1)
+    return pd.DataFrame(data, index=companies)
@@ -0,0 +1,70 @@
+
+"""F-Score / M-Score for every consecutive period pair of every company (score trends)."""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.finance.line_items import BALANCE, CASHFLOW, INCOME
+from modules.finance.ttm import TTMEngine
+from modules.finance.universe import CanonicalUniverse
+from modules.scoring.beneish import beneish_frame
+from modules.scoring.piotroski import piotroski_frame
+
+HISTORY_COLUMNS = ["hisse", "period", "prev_period", "f_skor", "m_skor"]
+
+
+def score_history_frame(universe: CanonicalUniverse,
+                        existing: Optional[Iterable[Tuple[str, str]]] = None, *,
+                        engine: Optional[TTMEngine] = None) -> pd.DataFrame:
+    """
+    Her şirketin ardışık (prev, curr) dönem çiftleri için F-Skor ve M-Skor.
+
+    Çiftler tarayıcıdaki gibi bilanço, gelir ve nakit akışının ortak dönemlerinden
+    kurulur. Her adımda tüm şirketlerin k. çifti birlikte, vektörel skorlayıcılara
+    tek çağrıyla verilir. Radar yalnızca bugünü gösterdiğinden F-Skor'un net kar /
+    nakit akışı / ROA kriterleri `curr` dönemindeki TTM değerlerinden okunur.
+
+    `existing`: zaten kayıtlı (hisse, period) çiftleri; bunlar yeniden hesaplanmaz.
+    Dönüş: `HISTORY_COLUMNS` sütunlu, hisse + dönem sırasında düz tablo.
+    """
+    engine = engine or TTMEngine(universe)
+    common = universe.common_mask(BALANCE, INCOME, CASHFLOW)
+    known = set(existing or ())
+    if known:
+        # Kayıtlı dönemler yalnızca curr tarafında atlanır; prev olarak okunmaya devam eder
+        skip = np.array([[(c, p) in known for p in universe.periods] for c in universe.companies],
+                        dtype=bool)
+    else:
+        skip = np.zeros_like(common)
+
+    frames = []
+    n_pairs = int(common.sum(axis=1).max(initial=0)) - 1
+    for k in range(n_pairs):
+        prev_cols = universe.nth(common, k)
+        curr_cols = universe.nth(common, k + 1)
+        todo = (curr_cols >= 0) & ~np.take_along_axis(
+            skip, np.clip(curr_cols, 0, None)[:, None], axis=1)[:, 0]
+        if not todo.any():
+            continue
+        curr_cols = np.where(todo, curr_cols, -1)
+
+        f = piotroski_frame(universe, curr=curr_cols, prev=prev_cols, engine=engine, point_in_time=True)
+        m = beneish_frame(universe, curr=curr_cols, prev=prev_cols)
+        part = pd.DataFrame({
+            "hisse": universe.companies,
+            "period": f["curr"].to_numpy(),
+            "prev_period": f["prev"].to_numpy(),
+            "f_skor": f["f_score"].to_numpy(),
+            "m_skor": m["m_score"].to_numpy(),
+        })
+        frames.append(part[todo & f["valid"].to_numpy()])
+
+    if not frames:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    out = pd.concat(frames, ignore_index=True)
+    order = {p: i for i, p in enumerate(universe.periods)}
+    out["_order"] = out["period"].map(order)
+    return out.sort_values(["hisse", "_order"]).drop(columns="_order").reset_index(drop=True)
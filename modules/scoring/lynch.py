@@ -1,48 +1,62 @@
+import numpy as np
 import pandas as pd
-from modules.utils import safe_float
+from modules.utils import safe_float, radar_columns
 
-def peter_lynch_score_card(row):
+SCORER_VERSION = "1"
+
+FCF_YIELD_MIN = 0.05   # FCF / piyasa değeri
+PD_FCF_MAX = 15        # piyasa değeri / FCF
+
+
+def _card_row(row) -> pd.Series:
+    # Kabul edilen tipler: DataFrame (tek satır beklenir) veya Series
     if isinstance(row, pd.DataFrame):
-        if row.empty:
-            row = pd.Series(dtype=float)
-        else:
-            row = row.iloc[0]
-    elif not isinstance(row, pd.Series):
-        row = pd.Series(dtype=float)
+        return pd.Series(dtype=float) if row.empty else row.iloc[0]
+    if not isinstance(row, pd.Series):
+        return pd.Series(dtype=float)
+    return row
+
+
+def _lynch_criteria(row):
+    """
+    Kart ve sayısal skorun ortak kuralları: (ölçüt, değer, geçti mi) üçlüleri;
+    hesaplanamayan ölçütte değer ve sonuç None. Sayıya çevrilemeyen hücre hata verir.
+    """
+    row = _card_row(row)
+    market_cap = safe_float(row.get("Piyasa Değeri"))
+    operating_cf = safe_float(row.get("İşletme Faaliyetlerinden Nakit Akışları"))
+    fcf = safe_float(row.get("Yıllıklandırılmış Serbest Nakit Akışı"))
+
+    fcf_yield = fcf / market_cap if pd.notnull(fcf) and pd.notnull(market_cap) and market_cap > 0 else None
+    ocf = operating_cf if pd.notnull(operating_cf) else None
+    pd_fcf = market_cap / fcf if pd.notnull(market_cap) and pd.notnull(fcf) and fcf > 0 else None
+    return [
+        ("fcf_yield", fcf_yield, None if fcf_yield is None else fcf_yield >= FCF_YIELD_MIN),
+        ("operating_cf", ocf, None if ocf is None else ocf > 0),
+        ("pd_fcf", pd_fcf, None if pd_fcf is None else pd_fcf <= PD_FCF_MAX),
+    ]
+
+
+# ölçüt -> (satır biçimi, geçti, kaldı, eksik veri satırı)
+_CARD_LINES = {
+    "fcf_yield": ("- FCF Verimi: {:.2%} → {}", "✅ Güçlü", "❌ Zayıf", "- FCF veya piyasa değeri eksik"),
+    "operating_cf": ("- İşletme Nakit Akışı: {:.0f} → {}", "✅ Pozitif", "❌ Negatif", "- İşletme Nakit Akışı eksik"),
+    "pd_fcf": ("- PD/FCF = {:.1f} → {}", "✅ Ucuz", "❌ Pahalı", "- PD/FCF hesaplanamıyor"),
+}
+
+
+def peter_lynch_score_card(row):
     score = 0
     lines = []
 
     try:
-        market_cap = safe_float(row.get("Piyasa Değeri"))
-        operating_cf = safe_float(row.get("İşletme Faaliyetlerinden Nakit Akışları"))
-        fcf = safe_float(row.get("Yıllıklandırılmış Serbest Nakit Akışı"))
-
-        # FCF Verimi
-        if pd.notnull(fcf) and pd.notnull(market_cap) and market_cap > 0:
-            fcf_yield = fcf / market_cap
-            passed = fcf_yield >= 0.05
-            lines.append(f"- FCF Verimi: {fcf_yield:.2%} → {'✅ Güçlü' if passed else '❌ Zayıf'}")
+        for key, value, passed in _lynch_criteria(row):
+            fmt, good, bad, missing = _CARD_LINES[key]
+            if passed is None:
+                lines.append(missing)
+                continue
+            lines.append(fmt.format(value, good if passed else bad))
             score += int(passed)
-        else:
-            lines.append("- FCF veya piyasa değeri eksik")
-
-        # Nakit Akışı
-        if pd.notnull(operating_cf):
-            passed = operating_cf > 0
-            lines.append(f"- İşletme Nakit Akışı: {operating_cf:.0f} → {'✅ Pozitif' if passed else '❌ Negatif'}")
-            score += int(passed)
-        else:
-            lines.append("- İşletme Nakit Akışı eksik")
-
-        # PD/FCF
-        if pd.notnull(market_cap) and pd.notnull(fcf) and fcf > 0:
-            pd_fcf = market_cap / fcf
-            passed = pd_fcf <= 15
-            lines.append(f"- PD/FCF = {pd_fcf:.1f} → {'✅ Ucuz' if passed else '❌ Pahalı'}")
-            score += int(passed)
-        else:
-            lines.append("- PD/FCF hesaplanamıyor")
-
     except Exception as e:
         lines.append(f"⚠️ Hata: {e}")
 
@@ -50,12 +64,58 @@ def peter_lynch_score_card(row):
     return score, description, lines
 
 
+def peter_lynch_points(row) -> int:
+    """Yalnızca sayısal Lynch skoru (peter_lynch_score_card ile aynı kurallar, metin yok)."""
+    try:
+        criteria = _lynch_criteria(row)
+    except Exception:
+        return 0   # kartta da hata satırıyla 0 döner
+    return sum(int(passed) for _, _, passed in criteria if passed is not None)
+
 
 class LynchScorer:
     def __init__(self, row):
         self.row = row
 
+    def score(self):
+        return peter_lynch_points(self.row)
+
     def calculate(self):
 
         l_score, summary, lines = peter_lynch_score_card(self.row)
         return l_score, summary, lines
+
+
+# ----------------------------------------------------------------------
+# Radar tablosunun tamamı için sütun bazlı skor
+# ----------------------------------------------------------------------
+LYNCH_FLAGS = ["lynch_fcf_verimi", "lynch_nakit", "lynch_pd_fcf"]
+RADAR_COLUMNS = ["Piyasa Değeri", "İşletme Faaliyetlerinden Nakit Akışları",
+                 "Yıllıklandırılmış Serbest Nakit Akışı"]
+
+
+def lynch_frame(radar: pd.DataFrame) -> pd.DataFrame:
+    """
+    Peter Lynch kriterlerini tüm radar için tek seferde değerlendirir (şirket başına ilk satır).
+    `peter_lynch_score_card` ile aynı kurallar. Sütunlar: `fcf_yield`, `pd_fcf`
+    (hesaplanamıyorsa NaN), kriter bayrakları (`LYNCH_FLAGS`) ve `lynch` skoru.
+    """
+    companies, v, invalid = radar_columns(radar, RADAR_COLUMNS)
+    market_cap = v["Piyasa Değeri"]
+    operating_cf = v["İşletme Faaliyetlerinden Nakit Akışları"]
+    fcf = v["Yıllıklandırılmış Serbest Nakit Akışı"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fcf_yield = np.where(market_cap > 0, fcf / market_cap, np.nan)
+        pd_fcf = np.where(fcf > 0, market_cap / fcf, np.nan)
+        flags = np.column_stack([
+            fcf_yield >= FCF_YIELD_MIN,
+            operating_cf > 0,
+            pd_fcf <= PD_FCF_MAX,
+        ])
+    # Kartta sayıya çevrilemeyen bir hücre hata verip skoru 0'da bırakır
+    flags[np.logical_or.reduce(list(invalid.values()))] = False
+
+    data = {"fcf_yield": fcf_yield, "pd_fcf": pd_fcf, **dict(zip(LYNCH_FLAGS, flags.T))}
+    data["lynch"] = flags.sum(axis=1)
+    return pd.DataFrame(data, index=companies)
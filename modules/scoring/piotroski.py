@@ -1,82 +1,106 @@
 import traceback
-from modules.utils import scalar, period_order, safe_divide
-from modules.scoring.ratios import calculate_roa_ttm
-from modules.finance.financial_snapshot import build_snapshot
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from modules.utils import (safe_float, period_order, safe_divide, safe_divide_array,
+                           radar_columns)
+from modules.scoring.ratios import calculate_roa_ttm, roa_ttm_matrix
+from modules.finance.financial_snapshot import snapshot_from_canonical
+from modules.finance.line_items import BALANCE, CASHFLOW, INCOME, resolve_statements
+from modules.finance.ttm import TTMEngine, latest
+from modules.finance.universe import take_columns
 from modules.logger import logger
-import traceback
 
+SCORER_VERSION = "1"
 
-def calculate_piotroski_f_score(row, balance, income, curr, prev):
+
+# Kriterler (sıra = kart sırası) ve kart emojileri
+CRITERIA_EMOJIS = {
+    "Net Kar > 0": "🟢",
+    "ROA > 0": "📈",
+    "Nakit Akışı > 0": "💸",
+    "Nakit Akışı > Net Kar": "🔄",
+    "Borç Oranı Azalmış": "📉",
+    "Cari Oran Artmış": "💧",
+    "Öz Kaynak Artmış": "🏦",
+    "Brüt Kar Marjı Artmış": "📊",
+    "Varlık Devir Hızı Artmış": "🔁",
+}
+PIOTROSKI_CRITERIA = list(CRITERIA_EMOJIS)
+
+
+def format_piotroski_detail(detail) -> dict:
+    """{kriter: 0/1} → kartta gösterilen {"🟢 Net Kar > 0": "✅", ...} sözlüğü."""
+    return {f"{CRITERIA_EMOJIS.get(key, '')} {key}": "✅" if val else "❌" for key, val in detail.items()}
+
+
+def piotroski_criteria(row, balance, income, curr, prev) -> dict:
+    """Dokuz kriterin {kriter: 0/1} sözlüğü (metin üretmez; hata yukarı fırlatılır)."""
+    net_profit = safe_float(row["Net Dönem Karı"])
+    operating_cash_flow = safe_float(row["İşletme Faaliyetlerinden Nakit Akışları"])
+    detail = {}
+
+    detail["Net Kar > 0"] = int(net_profit > 0)
+    roa = calculate_roa_ttm(income, balance, period_order)
+    detail["ROA > 0"] = int(roa > 0)
+    detail["Nakit Akışı > 0"] = int(operating_cash_flow > 0)
+    detail["Nakit Akışı > Net Kar"] = int(operating_cash_flow > net_profit)
+
+    canon = resolve_statements(balance, income)
+    snap_curr = snapshot_from_canonical(canon, curr)
+    snap_prev = snapshot_from_canonical(canon, prev)
+
+    # Leverage Ratio
+    if None not in (snap_curr.short_term_liabilities, snap_curr.long_term_liabilities, snap_curr.total_assets,
+                    snap_prev.short_term_liabilities, snap_prev.long_term_liabilities, snap_prev.total_assets):
+        leverage_ratio_curr = safe_divide(
+            snap_curr.short_term_liabilities + snap_curr.long_term_liabilities,
+            snap_curr.total_assets
+        )
+        leverage_ratio_prev = safe_divide(
+            snap_prev.short_term_liabilities + snap_prev.long_term_liabilities,
+            snap_prev.total_assets
+        )
+        detail["Borç Oranı Azalmış"] = int(leverage_ratio_curr is not None and leverage_ratio_prev is not None and leverage_ratio_curr < leverage_ratio_prev)
+    else:
+        detail["Borç Oranı Azalmış"] = 0
+
+    # Current Ratio
+    curr_ratio = safe_divide(snap_curr.current_assets, snap_curr.short_term_liabilities)
+    prev_ratio = safe_divide(snap_prev.current_assets, snap_prev.short_term_liabilities)
+    detail["Cari Oran Artmış"] = int(curr_ratio is not None and prev_ratio is not None and curr_ratio > prev_ratio)
+
+    # Equity
+    detail["Öz Kaynak Artmış"] = int(snap_curr.equity and snap_prev.equity and snap_curr.equity >= snap_prev.equity)
+
+    # Margin & Turnover
+    gp_margin_curr = safe_divide(snap_curr.gross_profit, snap_curr.revenue)
+    gp_margin_prev = safe_divide(snap_prev.gross_profit, snap_prev.revenue)
+    turnover_curr = safe_divide(snap_curr.revenue, snap_curr.total_assets)
+    turnover_prev = safe_divide(snap_prev.revenue, snap_prev.total_assets)
+
+    detail["Brüt Kar Marjı Artmış"] = int(gp_margin_curr is not None and gp_margin_prev is not None and gp_margin_curr > gp_margin_prev)
+    detail["Varlık Devir Hızı Artmış"] = int(turnover_curr is not None and turnover_prev is not None and turnover_curr > turnover_prev)
+
+    return detail
+
+
+def piotroski_f_score(row, balance, income, curr, prev):
+    """Yalnızca sayısal F-Skor (toplu taramalar için); hesaplanamazsa None."""
     try:
-        net_profit = scalar(row["Net Dönem Karı"])
-        operating_cash_flow = scalar(row["İşletme Faaliyetlerinden Nakit Akışları"])
-        f_score = 0
-        detail = {}
-        detail_str = {}
-
-        detail["Net Kar > 0"] = int(net_profit > 0)
-        roa = calculate_roa_ttm(income, balance, period_order)
-        detail["ROA > 0"] = int(roa > 0)
-        detail["Nakit Akışı > 0"] = int(operating_cash_flow > 0)
-        detail["Nakit Akışı > Net Kar"] = int(operating_cash_flow > net_profit)
-        f_score += sum(detail.values())
-
-        snap_curr = build_snapshot(balance, income, None, period=curr)
-        snap_prev = build_snapshot(balance, income, None, period=prev)
-
-        # Leverage Ratio
-        if None not in (snap_curr.short_term_liabilities, snap_curr.long_term_liabilities, snap_curr.total_assets,
-                        snap_prev.short_term_liabilities, snap_prev.long_term_liabilities, snap_prev.total_assets):
-            leverage_ratio_curr = safe_divide(
-                snap_curr.short_term_liabilities + snap_curr.long_term_liabilities,
-                snap_curr.total_assets
-            )
-            leverage_ratio_prev = safe_divide(
-                snap_prev.short_term_liabilities + snap_prev.long_term_liabilities,
-                snap_prev.total_assets
-            )
-            detail["Borç Oranı Azalmış"] = int(leverage_ratio_curr is not None and leverage_ratio_prev is not None and leverage_ratio_curr < leverage_ratio_prev)
-        else:
-            detail["Borç Oranı Azalmış"] = 0
-
-        f_score += detail["Borç Oranı Azalmış"]
-
-        # Current Ratio
-        curr_ratio = safe_divide(snap_curr.current_assets, snap_curr.short_term_liabilities)
-        prev_ratio = safe_divide(snap_prev.current_assets, snap_prev.short_term_liabilities)
-        detail["Cari Oran Artmış"] = int(curr_ratio is not None and prev_ratio is not None and curr_ratio > prev_ratio)
-        f_score += detail["Cari Oran Artmış"]
-
-        # Equity
-        detail["Öz Kaynak Artmış"] = int(snap_curr.equity and snap_prev.equity and snap_curr.equity >= snap_prev.equity)
-        f_score += detail["Öz Kaynak Artmış"]
-
-        # Margin & Turnover
-        gp_margin_curr = safe_divide(snap_curr.gross_profit, snap_curr.revenue)
-        gp_margin_prev = safe_divide(snap_prev.gross_profit, snap_prev.revenue)
-        turnover_curr = safe_divide(snap_curr.revenue, snap_curr.total_assets)
-        turnover_prev = safe_divide(snap_prev.revenue, snap_prev.total_assets)
-
-        detail["Brüt Kar Marjı Artmış"] = int(gp_margin_curr is not None and gp_margin_prev is not None and gp_margin_curr > gp_margin_prev)
-        detail["Varlık Devir Hızı Artmış"] = int(turnover_curr is not None and turnover_prev is not None and turnover_curr > turnover_prev)
-
-        f_score += detail["Brüt Kar Marjı Artmış"] + detail["Varlık Devir Hızı Artmış"]
-
-        # Emojili gösterim (ayrı sözlükte)
-        emojis = {
-            "Net Kar > 0": "🟢",
-            "ROA > 0": "📈",
-            "Nakit Akışı > 0": "💸",
-            "Nakit Akışı > Net Kar": "🔄",
-            "Borç Oranı Azalmış": "📉",
-            "Cari Oran Artmış": "💧",
-            "Öz Kaynak Artmış": "🏦",
-            "Brüt Kar Marjı Artmış": "📊",
-            "Varlık Devir Hızı Artmış": "🔁",
-        }
+        return sum(piotroski_criteria(row, balance, income, curr, prev).values())
+    except Exception:
+        logger.exception("piotroski_f_score failed")
+        return None
 
-        for key, val in detail.items():
-            detail_str[f"{emojis.get(key, '')} {key}"] = "✅" if val else "❌"
+
+def calculate_piotroski_f_score(row, balance, income, curr, prev):
+    try:
+        detail = piotroski_criteria(row, balance, income, curr, prev)
+        f_score = sum(detail.values())
+        detail_str = format_piotroski_detail(detail)
 
         return f_score, detail_str
 
@@ -111,6 +135,10 @@ class PiotroskiScorer:
         self.curr = curr
         self.prev = prev
 
+    def score(self):
+        """Kart/metin üretmeden yalnızca F-Skor."""
+        return piotroski_f_score(self.row, self.balance, self.income, self.curr, self.prev)
+
     def calculate(self):
         try:
             f_score, detail = calculate_piotroski_f_score(
@@ -127,4 +155,116 @@ class PiotroskiScorer:
             detail = {"Hata": f"{type(e).__name__}: {str(e)}"}
             return None, summary, detail
 
-    
\ No newline at end of file
+    
+
+# ----------------------------------------------------------------------
+# Evren çapında vektörel F-Skor
+# ----------------------------------------------------------------------
+RADAR_NET_PROFIT = "Net Dönem Karı"
+RADAR_OPERATING_CF = "İşletme Faaliyetlerinden Nakit Akışları"
+
+
+def _radar_values(universe, radar, engine):
+    """Radar satırından (şirketin ilk satırı) net kar / işletme nakit akışı.
+
+    `radar` None ise tablolardan türetilir: son dönem TTM net kar ve TTM işletme
+    nakit akışı. Radar verilip şirket radar'da yoksa değerler NaN, skor hesaplanmaz.
+    """
+    if radar is None:
+        net = engine.latest(engine.ttm("net_profit"), "net_profit")
+        ocf = engine.latest(engine.ttm("operating_cash_flow"), "operating_cash_flow")
+        return net, ocf, np.ones(len(universe.companies), dtype=bool)
+    names, values, invalid = radar_columns(radar, [RADAR_NET_PROFIT, RADAR_OPERATING_CF])
+    rows = names.get_indexer(universe.companies)   # -1: radar'da yok → sona eklenen NaN / False
+    net, ocf = (np.append(values[col], np.nan)[rows] for col in (RADAR_NET_PROFIT, RADAR_OPERATING_CF))
+    present = rows >= 0
+    # Sayıya çevrilemeyen hücre tekil hesapta ValueError verir, skor hesaplanmaz
+    for col in (RADAR_NET_PROFIT, RADAR_OPERATING_CF):
+        present &= ~np.append(invalid[col], False)[rows]
+    if not {RADAR_NET_PROFIT, RADAR_OPERATING_CF}.issubset(radar.columns):
+        present[:] = False   # tekil hesap da KeyError ile skorsuz kalır
+    return net, ocf, present
+
+
+def piotroski_frame(universe, radar: Optional[pd.DataFrame] = None, curr=None, prev=None, *,
+                    engine: Optional[TTMEngine] = None, explain: bool = False,
+                    point_in_time: bool = False) -> pd.DataFrame:
+    """
+    Tüm şirketler için dokuz Piotroski kriterini boolean sütunlar olarak hesaplar.
+
+    `curr` / `prev`: tek dönem ("2025/6"), şirket -> dönem eşlemesi ya da None
+    (None: bilanço, gelir ve nakit akışının ortak son iki dönemi; tarayıcıyla aynı).
+    Sonuç şirket indeksli; `f_score` geçersiz satırlarda (dönem tabloda yok, şirket
+    radar'da yok) NaN. Kriterler `calculate_piotroski_f_score` ile birebir aynı
+    kuralları kullanır. `explain=True` ise `f_karne` / `f_detail` sütunları da eklenir;
+    tek şirket için `piotroski_explanation` ile sonradan da üretilebilir.
+
+    `point_in_time=True` geçmiş dönemler içindir: radar yok sayılır; net kar, işletme
+    nakit akışı ve ROA şirketin `curr` dönemindeki TTM değerlerinden okunur.
+    """
+    engine = engine or TTMEngine(universe)
+    stmt_mask = universe.common_mask(BALANCE, INCOME)
+    default_curr, default_prev = universe.latest_two(universe.common_mask(BALANCE, INCOME, CASHFLOW))
+    curr_cols = universe.period_columns(curr, default_curr)
+    prev_cols = universe.period_columns(prev, default_prev)
+
+    if point_in_time:
+        net_profit = take_columns(engine.ttm("net_profit"), curr_cols)
+        operating_cf = take_columns(engine.ttm("operating_cash_flow"), curr_cols)
+        in_radar = np.ones(len(universe.companies), dtype=bool)
+        roa = take_columns(roa_ttm_matrix(engine), curr_cols)
+    else:
+        net_profit, operating_cf, in_radar = _radar_values(universe, radar, engine)
+        # ROA, tekil hesapta olduğu gibi gelir+bilançonun ortak son döneminde (curr'den bağımsız)
+        roa = latest(roa_ttm_matrix(engine), stmt_mask)
+
+    at = universe.take
+
+    def ratio(num, den, cols):
+        return safe_divide_array(at(num, cols) if isinstance(num, str) else num,
+                                 at(den, cols))
+
+    with np.errstate(invalid="ignore"):
+        lev_c = ratio(at("short_term_liabilities", curr_cols) + at("long_term_liabilities", curr_cols),
+                      "total_assets", curr_cols)
+        lev_p = ratio(at("short_term_liabilities", prev_cols) + at("long_term_liabilities", prev_cols),
+                      "total_assets", prev_cols)
+        eq_c, eq_p = at("equity", curr_cols), at("equity", prev_cols)
+
+        criteria = {
+            "Net Kar > 0":              net_profit > 0,
+            "ROA > 0":                  roa > 0,
+            "Nakit Akışı > 0":          operating_cf > 0,
+            "Nakit Akışı > Net Kar":    operating_cf > net_profit,
+            "Borç Oranı Azalmış":       lev_c < lev_p,
+            "Cari Oran Artmış":         ratio("current_assets", "short_term_liabilities", curr_cols)
+                                        > ratio("current_assets", "short_term_liabilities", prev_cols),
+            "Öz Kaynak Artmış":         (eq_c != 0) & (eq_p != 0) & (eq_c >= eq_p),
+            "Brüt Kar Marjı Artmış":    ratio("gross_profit", "revenue", curr_cols)
+                                        > ratio("gross_profit", "revenue", prev_cols),
+            "Varlık Devir Hızı Artmış": ratio("revenue", "total_assets", curr_cols)
+                                        > ratio("revenue", "total_assets", prev_cols),
+        }
+
+    valid = in_radar & universe.covers(stmt_mask, curr_cols) & universe.covers(stmt_mask, prev_cols)
+
+    df = pd.DataFrame(criteria, index=pd.Index(universe.companies, name="hisse"))
+    df.insert(0, "curr", universe.labels(curr_cols))
+    df.insert(1, "prev", universe.labels(prev_cols))
+    df["f_score"] = np.where(valid, df[PIOTROSKI_CRITERIA].sum(axis=1), np.nan)
+    df["valid"] = valid
+
+    if explain:
+        explained = [piotroski_explanation(df.loc[c]) for c in df.index]
+        df["f_karne"] = [e[0] for e in explained]
+        df["f_detail"] = [e[1] for e in explained]
+    return df
+
+
+def piotroski_explanation(row: pd.Series):
+    """`piotroski_frame` satırından (karne, detay sözlüğü); PiotroskiScorer ile aynı metinler."""
+    if not row.get("valid", True):
+        return f_skor_karne_yorum(None), {}
+    f_score = int(row["f_score"])
+    detail = {key: int(bool(row[key])) for key in PIOTROSKI_CRITERIA}
+    return f_skor_karne_yorum(f_score), format_piotroski_detail(detail)
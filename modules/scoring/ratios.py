@@ -1,51 +1,51 @@
+import numpy as np
 import pandas as pd
-from modules.utils import scalar
-from modules.finance.financial_snapshot import build_snapshot
+from modules.finance.line_items import resolve_statements
+from modules.finance.statement_frame import StatementFrame
+from modules.finance.ttm import TTMEngine
 from modules.logger import logger 
 
+
+def roa_ttm_matrix(engine: TTMEngine) -> np.ndarray:
+    """
+    Şirket × dönem Yıllıklandırılmış ROA (%):
+    ROA = (TTM Net Kar) / (Son 4 çeyrek ortalama Toplam Varlık) * 100
+
+    4 çeyreğin hepsinde varlık > 0 değilse (veya 4 çeyrek yoksa) 0 döner.
+    """
+    net_ttm = engine.ttm("net_profit")
+    avg_assets = engine.average("total_assets")
+    min_assets = engine.rolling("total_assets", "min")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roa = np.where(min_assets > 0, net_ttm / avg_assets * 100, 0.0)
+    return roa
+
+
 def calculate_roa_ttm(income: pd.DataFrame, balance: pd.DataFrame, period_order_fn) -> float:
     """
-    Adım adım loglayarak Yıllıklandırılmış ROA hesapla:
-    ROA = (TTM Net Kar) / (Ortalama Toplam Varlık) * 100
+    Yıllıklandırılmış ROA hesapla (bkz. `roa_ttm_matrix`), gelir tablosu ve
+    bilançonun ortak son döneminde.
 
     Returns:
         float: Yüzde olarak ROA (örn: -4.92)
     """
     try:
+        income, balance = StatementFrame.of(income), StatementFrame.of(balance)
+
         # 1️⃣ Geçerli ortak dönemleri sırala
         valid_periods = sorted(
-            [c for c in income.columns if "/" in c and c in balance.columns],
+            [c for c in income.periods if c in balance.period_index],
             key=period_order_fn,
             reverse=True
         )
+        if not valid_periods:
+            return 0
 
-        # 2️⃣ Net Kar verilerini topla
-        net_incomes = []
-        for p in valid_periods[:4]:
-            snap_curr = build_snapshot(balance, income, None, period=p)
-            val = scalar(snap_curr.net_profit)
-            net_incomes.append(val or 0)
-
-        net_income_ttm = sum(net_incomes)
-
-        # 3️⃣ Toplam Varlık verilerini al (2 dönem)
-        assets = []
-        for p in valid_periods[:4]:
-            snap_curr = build_snapshot(balance, income, None, period=p)
-            val = scalar(snap_curr.total_assets)
-            assets.append(val or 0)
-
-        if all(a > 0 for a in assets):
-            avg_assets = sum(assets) / 4
-        else:
-            avg_assets = None
-
-        # 4️⃣ ROA hesapla
-        roa = (net_income_ttm / avg_assets) * 100 if avg_assets else 0
+        # 2️⃣ TTM net kar / ortalama varlık: tek şirketlik motor üzerinden
+        engine = TTMEngine.for_company("", resolve_statements(balance, income))
+        roa = roa_ttm_matrix(engine)[0, engine.universe.period_index[valid_periods[0]]]
         return roa
 
     except Exception as e:
         logger.exception("🚨 ROA TTM hesaplama hatası:", e)
         return 0
-
-
@@ -0,0 +1,351 @@
+
+"""Pluggable scorer registry with declared data dependencies.
+
+Every scorer declares what it reads: Fintables statements, canonical line items,
+radar columns, whether it needs the (curr, prev) period pair and which run
+parameters it uses. `plan()` turns a scorer selection into the minimum I/O for a
+run: a Graham + Lynch scan touches only the radar and never opens a workbook.
+
+A new scorer is one `register(ScorerSpec(...))` call; the scanner, the score
+cache and `ScoreAggregator` pick it up from here.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.finance import dcf
+from modules.finance.line_items import BALANCE, CASHFLOW, INCOME, STATEMENTS, resolve_statements
+from modules.finance.statement_frame import StatementFrame
+from modules.finance.ttm import TTMEngine, ttm_free_cash_flow
+from modules.finance.universe import CanonicalUniverse
+from modules.logger import logger
+from modules.scoring import beneish, graham, lynch, piotroski, timing
+
+# curr/prev: üç tablonun ortak son iki dönemi (tarayıcının eskiden beri kuralı)
+PERIOD_STATEMENTS: Tuple[str, ...] = STATEMENTS
+
+
+@dataclass
+class ScoreContext:
+    """Inputs handed to a scorer; statements not in the plan are absent."""
+    symbol: str
+    row: pd.DataFrame
+    statements: Dict[str, StatementFrame] = field(default_factory=dict)
+    curr: Optional[str] = None
+    prev: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def balance(self) -> Optional[StatementFrame]:
+        return self.statements.get(BALANCE)
+
+    @property
+    def income(self) -> Optional[StatementFrame]:
+        return self.statements.get(INCOME)
+
+    @property
+    def cashflow(self) -> Optional[StatementFrame]:
+        return self.statements.get(CASHFLOW)
+
+
+@dataclass
+class BatchContext:
+    """Inputs of a vectorized scorer: many companies at once.
+
+    `universe` holds only companies whose statements were loaded (None when no
+    selected scorer reads a statement); `curr` / `prev` map company -> period.
+    """
+    companies: List[str]
+    radar: pd.DataFrame
+    universe: Optional[CanonicalUniverse] = None
+    curr: Dict[str, str] = field(default_factory=dict)
+    prev: Dict[str, str] = field(default_factory=dict)
+    params: Dict[str, Any] = field(default_factory=dict)
+    _engine: Optional[TTMEngine] = None
+
+    @property
+    def engine(self) -> TTMEngine:
+        if self._engine is None:
+            self._engine = TTMEngine(self.universe)
+        return self._engine
+
+
+@dataclass(frozen=True)
+class ScorerSpec:
+    """
+    name       : sonuç sütunu (ör. "f_skor"); `columns` verilirse compute bir sözlük döner
+    compute    : ScoreContext -> skor; yalnızca sayısal yol, kart/metin üretmez
+    explain    : ScoreContext -> kart alanları sözlüğü; yalnızca kart istendiğinde
+                 (ScoreAggregator / şirket karnesi) çağrılır, opsiyonel
+    batch      : BatchContext -> şirket indeksli skor Series'i (vektörel yol), opsiyonel;
+                 `compute` ile aynı değerleri (None = hesaplanamadı) üretmelidir
+    statements : compute'un okuduğu tablolar
+    items      : okunan canonical kalemler (bilgi amaçlı, line_items id'leri)
+    radar      : okunan radar sütunları
+    periods    : (curr, prev) dönem çifti gerekiyor mu
+    params     : okunan çalıştırma parametreleri (ör. forecast_years)
+    when       : parametrelere göre bu çalıştırmada etkin mi (None = her zaman)
+    """
+    name: str
+    compute: Callable[[ScoreContext], Any]
+    explain: Optional[Callable[[ScoreContext], dict]] = None
+    batch: Optional[Callable[[BatchContext], pd.Series]] = None
+    statements: Tuple[str, ...] = ()
+    items: Tuple[str, ...] = ()
+    radar: Tuple[str, ...] = ()
+    periods: bool = False
+    params: Tuple[str, ...] = ()
+    columns: Tuple[str, ...] = ()
+    version: str = "1"
+    when: Optional[Callable[[dict], bool]] = None
+
+    @property
+    def needs_workbook(self) -> bool:
+        return bool(self.statements) or self.periods
+
+    def enabled(self, params: dict) -> bool:
+        return self.when is None or bool(self.when(params))
+
+    def run_params(self, params: dict) -> dict:
+        return {k: params.get(k) for k in self.params}
+
+
+@dataclass(frozen=True)
+class ScanPlan:
+    scorers: Tuple[ScorerSpec, ...]
+    statements: Tuple[str, ...]
+    periods: bool
+    radar: Tuple[str, ...]
+    columns: Tuple[str, ...] = ()
+
+    @property
+    def needs_workbook(self) -> bool:
+        return bool(self.statements)
+
+    @property
+    def names(self) -> List[str]:
+        return [s.name for s in self.scorers]
+
+
+_REGISTRY: Dict[str, ScorerSpec] = {}
+
+
+def register(spec: ScorerSpec, replace: bool = False) -> ScorerSpec:
+    if spec.name in _REGISTRY and not replace:
+        raise ValueError(f"'{spec.name}' skorlayıcısı zaten kayıtlı")
+    _REGISTRY[spec.name] = spec
+    return spec
+
+
+def unregister(name: str) -> None:
+    _REGISTRY.pop(name, None)
+
+
+def get_scorer(name: str) -> ScorerSpec:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"Bilinmeyen skorlayıcı: {name}") from None
+
+
+def scorers(names: Optional[Iterable[str]] = None, params: Optional[dict] = None) -> List[ScorerSpec]:
+    """Selected scorers in registration order (all enabled ones if `names` is None)."""
+    params = params or {}
+    if names is None:
+        return [s for s in _REGISTRY.values() if s.enabled(params)]
+    return [get_scorer(n) for n in names]
+
+
+def plan(names: Optional[Iterable[str]] = None, params: Optional[dict] = None) -> ScanPlan:
+    """Minimum inputs of a run: statements to load, period pair, radar columns."""
+    selected = tuple(scorers(names, params))
+    needed = {st for s in selected for st in s.statements}
+    periods = any(s.periods for s in selected)
+    if periods:
+        needed.update(PERIOD_STATEMENTS)
+    radar = tuple(dict.fromkeys(c for s in selected for c in s.radar))
+    # Varsayılan taramada parametreyle kapanan skorlayıcıların sütunları da (NaN) bulunur
+    pool = selected if names is not None else tuple(_REGISTRY.values())
+    columns = tuple(col for s in pool for col in s.columns)
+    return ScanPlan(selected, tuple(st for st in STATEMENTS if st in needed), periods, radar, columns)
+
+
+# ----------------------------------------------------------------------
+# Yerleşik skorlayıcılar
+# ----------------------------------------------------------------------
+def _piotroski_card(ctx: ScoreContext) -> dict:
+    f_score, f_karne, f_detail = piotroski.PiotroskiScorer(ctx.row, ctx.balance, ctx.income,
+                                                           ctx.curr, ctx.prev).calculate()
+    return {"f_score": f_score, "f_karne": f_karne, "f_detail": f_detail}
+
+
+def _beneish_card(ctx: ScoreContext) -> dict:
+    m_score, m_karne, m_lines = beneish.BeneishScorer(ctx.symbol, ctx.balance, ctx.income, ctx.cashflow,
+                                                      ctx.curr, ctx.prev).calculate()
+    return {"m_skor": m_score, "m_karne": m_karne, "m_lines": m_lines}
+
+
+def _graham_card(ctx: ScoreContext) -> dict:
+    score, karne, lines = graham.GrahamScorer(ctx.row).calculate()
+    return {"graham_skor": score, "graham_karne": karne, "graham_lines": lines}
+
+
+def _lynch_card(ctx: ScoreContext) -> dict:
+    score, karne, lines = lynch.LynchScorer(ctx.row).calculate()
+    return {"lynch_skor": score, "lynch_karne": karne, "lynch_lines": lines}
+
+
+def _as_scores(values: pd.Series, companies: List[str], cast=int, fill=None) -> pd.Series:
+    """Vektörel sonucu tekil yolun tiplerine çevirir: NaN -> `fill`, diğerleri `cast`."""
+    values = values.reindex(companies)
+    return pd.Series([fill if pd.isna(v) else cast(v) for v in values], index=values.index, dtype=object)
+
+
+def _piotroski_batch(ctx: BatchContext) -> pd.Series:
+    df = piotroski.piotroski_frame(ctx.universe, ctx.radar, ctx.curr, ctx.prev, engine=ctx.engine)
+    return _as_scores(df["f_score"], ctx.companies)
+
+
+def _beneish_batch(ctx: BatchContext) -> pd.Series:
+    df = beneish.beneish_frame(ctx.universe, ctx.curr, ctx.prev)
+    return _as_scores(df["m_score"], ctx.companies, cast=float)
+
+
+def _graham_batch(ctx: BatchContext) -> pd.Series:
+    # Radar'da olmayan şirketin kartı da 0 puan verir
+    return _as_scores(graham.graham_frame(ctx.radar)["graham"], ctx.companies, fill=0)
+
+
+def _lynch_batch(ctx: BatchContext) -> pd.Series:
+    return _as_scores(lynch.lynch_frame(ctx.radar)["lynch"], ctx.companies, fill=0)
+
+
+def _intrinsic_medians(fcfs, params: dict) -> np.ndarray:
+    """Monte-Carlo içsel değer medyanları (tek şirket ve toplu yol aynı çağrıyı kullanır)."""
+    return dcf.monte_carlo_dcf_batch(fcfs, forecast_years=params["forecast_years"],
+                                     n_sims=params["n_sims"]).median
+
+
+def _check_fcf(ttm_fcf: float) -> None:
+    if np.isnan(ttm_fcf):
+        raise ValueError("FCF verileri eksik.")
+    if ttm_fcf <= 0:
+        raise ValueError("Son FCF negatif.")
+
+
+def _mos_record(row: pd.DataFrame, intrinsic: float) -> dict:
+    cur_price   = row.get("Son Fiyat").iat[0]
+    market_cap  = row.get("Piyasa Değeri").iat[0]
+    if cur_price and market_cap and market_cap > 0:
+        shares_out = market_cap / cur_price
+        intrinsic_ps = intrinsic / shares_out
+        premium = (intrinsic_ps - cur_price) / cur_price
+
+        return {
+            "icsel_deger_medyan": intrinsic,
+            "piyasa_degeri":      market_cap,
+            "MOS":                premium,
+        }
+    return {}
+
+
+def _mos_fields(ctx: ScoreContext) -> dict:
+    """İçsel değer / MOS alanları; hesaplanamazsa boş sözlük (uyarı loglanır)."""
+    c = ctx.symbol
+    try:
+        with timing.stage("mos.fcf", c):
+            engine   = TTMEngine.for_company(c, resolve_statements(ctx.balance, ctx.income, ctx.cashflow))
+            ttm_fcf  = ttm_free_cash_flow(engine)[0]
+        _check_fcf(ttm_fcf)
+
+        with timing.stage("mos.dcf", c):
+            intrinsic = _intrinsic_medians([ttm_fcf], ctx.params)[0]
+        return _mos_record(ctx.row, intrinsic)
+    except Exception as mos_error:
+        logger.warning(f"{c}: MOS hesaplanamadı → {mos_error}")
+    return {}
+
+
+def _mos_batch(ctx: BatchContext) -> pd.Series:
+    """`_mos_fields` for every company: TTM FCF from the shared engine, one batch DCF call."""
+    with timing.stage("mos.fcf", ctx.companies):
+        fcf = pd.Series(ttm_free_cash_flow(ctx.engine), index=ctx.universe.companies).reindex(ctx.companies)
+
+    valid = fcf[fcf > 0]
+    with timing.stage("mos.dcf", ctx.companies):
+        intrinsic = dict(zip(valid.index, _intrinsic_medians(valid.to_numpy(), ctx.params)))
+
+    names = ctx.radar["Şirket"]
+    out = {}
+    for c in ctx.companies:
+        try:
+            _check_fcf(fcf[c])
+            out[c] = _mos_record(ctx.radar[names == c], intrinsic[c])
+        except Exception as mos_error:
+            logger.warning(f"{c}: MOS hesaplanamadı → {mos_error}")
+            out[c] = {}
+    return pd.Series(out, index=ctx.companies, dtype=object)
+
+
+register(ScorerSpec(
+    name="f_skor",
+    compute=lambda ctx: piotroski.PiotroskiScorer(ctx.row, ctx.balance, ctx.income,
+                                                  ctx.curr, ctx.prev).score(),
+    explain=_piotroski_card,
+    batch=_piotroski_batch,
+    statements=(BALANCE, INCOME),
+    items=("net_profit", "total_assets", "current_assets", "short_term_liabilities",
+           "long_term_liabilities", "equity", "gross_profit", "revenue"),
+    radar=(piotroski.RADAR_NET_PROFIT, piotroski.RADAR_OPERATING_CF),
+    periods=True,
+    version=piotroski.SCORER_VERSION,
+))
+
+register(ScorerSpec(
+    name="m_skor",
+    compute=lambda ctx: beneish.BeneishScorer(ctx.symbol, ctx.balance, ctx.income, ctx.cashflow,
+                                              ctx.curr, ctx.prev).score(),
+    explain=_beneish_card,
+    batch=_beneish_batch,
+    statements=(BALANCE, INCOME, CASHFLOW),
+    items=("trade_receivables", "sales", "cogs", "current_assets", "pp_e", "total_assets",
+           "depreciation", "g_and_a_exp", "marketing_exp", "net_profit", "operating_cash_flow",
+           "short_term_liabilities", "long_term_liabilities"),
+    periods=True,
+    version=beneish.SCORER_VERSION,
+))
+
+register(ScorerSpec(
+    name="graham",
+    compute=lambda ctx: graham.GrahamScorer(ctx.row).score(),
+    explain=_graham_card,
+    batch=_graham_batch,
+    radar=tuple(graham.RADAR_COLUMNS),
+    version=graham.SCORER_VERSION,
+))
+
+register(ScorerSpec(
+    name="lynch",
+    compute=lambda ctx: lynch.LynchScorer(ctx.row).score(),
+    explain=_lynch_card,
+    batch=_lynch_batch,
+    radar=tuple(lynch.RADAR_COLUMNS),
+    version=lynch.SCORER_VERSION,
+))
+
+register(ScorerSpec(
+    name="mos",
+    compute=_mos_fields,
+    batch=_mos_batch,
+    statements=(BALANCE, INCOME, CASHFLOW),
+    items=("operating_cash_flow", "capex"),
+    radar=("Son Fiyat", "Piyasa Değeri"),
+    params=("forecast_years", "n_sims"),
+    columns=("MOS", "icsel_deger_medyan", "piyasa_degeri"),
+    version=dcf.SCORER_VERSION,
+    when=lambda p: bool(p.get("forecast_years") and p.get("n_sims")),
+))
@@ -0,0 +1,203 @@
+
+"""Persistent per-ticker cache of scan scores (F, M, Graham, Lynch, MOS).
+
+One JSON file per ticker under `SCORE_CACHE_DIR`. Every score is stored with a
+key built only from the inputs its registry entry declares:
+
+  f_skor   workbook content hash + radar row hash + curr/prev + version
+  m_skor   workbook content hash + curr/prev + version
+  graham   radar row hash + version
+  lynch    radar row hash + version
+  mos      workbook content hash + radar row hash + simulation params + version
+
+so a new price in the radar re-scores Graham/Lynch/F/MOS but not the M-Score.
+Bumping a scorer's `version` (the module's `SCORER_VERSION`) invalidates its entries. curr/prev are a
+function of the workbook content, so they are stored with the content hash and
+reused while the hash matches; a hit never opens the workbook.
+
+A score that could not be computed from its inputs (None, NaN, an empty MOS
+dict: negative FCF, missing items) is stored as a "n/a" marker under the same
+key, so a rescan of unchanged data does not reload the workbook for it; `get`
+returns the scorer's empty value for it. Scores whose scorer raised are not
+stored at all (the caller skips `put`), so a transient failure is retried.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from config import SCORE_CACHE_DIR
+from modules.finance.data_loader import workbook_fingerprint
+from modules.logger import logger
+from modules.scoring.registry import ScorerSpec, get_scorer
+
+
+def score_inputs(spec: ScorerSpec) -> Tuple[str, ...]:
+    """Key components of a scorer, from its declared dependencies."""
+    inputs = []
+    if spec.needs_workbook:
+        inputs.append("workbook")
+    if spec.periods:
+        inputs.append("periods")
+    if spec.radar:
+        inputs.append("radar")
+    if spec.params:
+        inputs.append("params")
+    return tuple(inputs)
+
+
+_MISSING = object()
+
+
+def content_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def radar_row_hash(row) -> str:
+    """Hash of the company's radar row (first row if a frame is given)."""
+    if isinstance(row, pd.DataFrame):
+        row = row.iloc[0] if not row.empty else pd.Series(dtype=object)
+    payload = row.to_json(double_precision=15, default_handler=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ScoreCacheEntry:
+    """Cached scores of one ticker for the current workbook and radar row."""
+
+    def __init__(self, symbol: str, path: Path, data: dict, source: Optional[dict],
+                 workbook_hash: Optional[str], radar_hash: str, versions: Dict[str, str]):
+        self.symbol = symbol
+        self.path = path
+        self.versions = versions
+        self.radar_hash = radar_hash
+        self.workbook_hash = workbook_hash
+        self.source = source
+        same_workbook = workbook_hash is not None and data.get("workbook_hash") == workbook_hash
+        self.curr = data.get("curr") if same_workbook else None
+        self.prev = data.get("prev") if same_workbook else None
+        self.scores: Dict[str, dict] = data.get("scores", {})
+        self.dirty = data.get("source") != source or not same_workbook
+
+    def key(self, name: str, params: Optional[dict] = None) -> Optional[str]:
+        spec = get_scorer(name)
+        inputs = score_inputs(spec)
+        parts: Dict[str, Any] = {"score": name, "version": self.versions.get(name, spec.version)}
+        if "workbook" in inputs:
+            if self.workbook_hash is None:
+                return None
+            parts["workbook"] = self.workbook_hash
+        if "periods" in inputs:
+            if self.curr is None:
+                return None
+            parts["periods"] = [self.curr, self.prev]
+        if "radar" in inputs:
+            parts["radar"] = self.radar_hash
+        if "params" in inputs:
+            parts["params"] = params or {}
+        return hashlib.blake2b(json.dumps(parts, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, name: str, params: Optional[dict] = None, default=_MISSING):
+        key = self.key(name, params)
+        stored = self.scores.get(name)
+        if key is not None and stored is not None and stored.get("key") == key:
+            if stored.get("na"):
+                return {} if get_scorer(name).columns else None
+            return stored["value"]
+        return default
+
+    def put(self, name: str, value, params: Optional[dict] = None) -> None:
+        key = self.key(name, params)
+        if key is None:
+            return
+        if _not_computed(value):
+            # Girdilerden hesaplanamayan skor da aynı anahtarla saklanır (yeniden denenmez)
+            self.scores[name] = {"key": key, "na": True}
+        else:
+            self.scores[name] = {"key": key, "value": _plain(value)}
+        self.dirty = True
+
+    def set_periods(self, curr: str, prev: str) -> None:
+        if (curr, prev) != (self.curr, self.prev):
+            self.curr, self.prev = curr, prev
+            self.dirty = True
+
+    def to_dict(self) -> dict:
+        return {"source": self.source, "workbook_hash": self.workbook_hash,
+                "curr": self.curr, "prev": self.prev, "scores": self.scores}
+
+
+class ScoreCache:
+    def __init__(self, cache_dir: Path = Path(SCORE_CACHE_DIR),
+                 versions: Optional[Dict[str, str]] = None):
+        self.cache_dir = Path(cache_dir)
+        # Sürüm geçersiz kılma (ör. testler için); verilmeyenler registry'den okunur
+        self.versions = dict(versions or {})
+
+    def entry(self, symbol: str, workbook: Path, radar_row) -> ScoreCacheEntry:
+        path = self.cache_dir / f"{symbol}.json"
+        data = self._read(path)
+        source, wb_hash = None, None
+        if Path(workbook).exists():
+            source = workbook_fingerprint(Path(workbook))
+            # mtime/boyut aynıysa içerik özeti yeniden hesaplanmaz
+            wb_hash = data.get("workbook_hash") if data.get("source") == source else content_hash(workbook)
+        return ScoreCacheEntry(symbol, path, data, source, wb_hash, radar_row_hash(radar_row), self.versions)
+
+    def save(self, entry: ScoreCacheEntry) -> None:
+        if not entry.dirty:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = entry.path.with_suffix(f".json.{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp, entry.path)
+            entry.dirty = False
+        except Exception as e:
+            # Önbellek en iyi çaba esaslı: yazılamazsa skorlar yine de döner
+            logger.warning(f"{entry.symbol}: skor önbelleği yazılamadı → {e}")
+
+    def clear(self) -> None:
+        for f in self.cache_dir.glob("*.json"):
+            f.unlink(missing_ok=True)
+
+    @staticmethod
+    def _read(path: Path) -> dict:
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"{path.stem}: skor önbelleği okunamadı → {e}")
+            return {}
+
+
+def _not_computed(value) -> bool:
+    """Hesaplanamamış skor: None / NaN ya da tüm alanları boş sözlük (ör. MOS)."""
+    if isinstance(value, dict):
+        return all(_not_computed(v) for v in value.values())
+    if value is None:
+        return True
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _plain(value):
+    """numpy skalerlerini JSON'a yazılabilir Python tiplerine çevirir."""
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if hasattr(value, "item"):
+        return value.item()
+    return value
@@ -0,0 +1,90 @@
+
+"""Per-stage wall / CPU timing of a scan (diagnostics).
+
+Stages are recorded per company. A stage that runs once for many companies
+(vectorized scorers, building the universe) is split evenly across them.
+Dotted stages (`mos.fcf`, `mos.dcf`) are nested inside their parent and are
+already included in its time.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+TIMING_COLUMNS = ["hisse", "stage", "wall_s", "cpu_s"]
+
+_ACTIVE: ContextVar[Optional["StageTimer"]] = ContextVar("stage_timer", default=None)
+
+
+class StageTimer:
+    """Collects `(hisse, stage, wall_s, cpu_s)` rows while active."""
+
+    def __init__(self):
+        self.rows: List[Tuple[str, str, float, float]] = []
+
+    @contextmanager
+    def active(self):
+        token = _ACTIVE.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE.reset(token)
+
+    @contextmanager
+    def stage(self, name: str, companies: Union[str, Iterable[str]]):
+        companies = [companies] if isinstance(companies, str) else list(companies)
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            if companies:
+                n = len(companies)
+                wall = (time.perf_counter() - wall0) / n
+                cpu = (time.process_time() - cpu0) / n
+                self.rows.extend((c, name, wall, cpu) for c in companies)
+
+    def by_company(self) -> Dict[str, List[Tuple[str, float, float]]]:
+        out: Dict[str, List[Tuple[str, float, float]]] = {}
+        for c, name, wall, cpu in self.rows:
+            out.setdefault(c, []).append((name, wall, cpu))
+        return out
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.rows, columns=TIMING_COLUMNS)
+
+
+@contextmanager
+def stage(name: str, companies: Union[str, Iterable[str]]):
+    """Times a stage on the active `StageTimer`; a no-op when none is active."""
+    timer = _ACTIVE.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name, companies):
+        yield
+
+
+def summarize_timings(timings: pd.DataFrame) -> pd.DataFrame:
+    """Per stage: company count, wall / CPU totals and wall-time percentiles (seconds)."""
+    if timings.empty:
+        return pd.DataFrame(columns=["companies", "wall_total", "cpu_total", "wall_mean",
+                                     "wall_p50", "wall_p90", "wall_p99", "wall_max"])
+    # Aynı şirkette tekrar eden aşamalar (ör. iki kez yükleme) önce toplanır
+    per_company = timings.groupby(["stage", "hisse"], sort=False)[["wall_s", "cpu_s"]].sum()
+    g = per_company.groupby(level="stage", sort=False)
+    wall = g["wall_s"]
+    summary = pd.DataFrame({
+        "companies": g.size(),
+        "wall_total": wall.sum(),
+        "cpu_total": g["cpu_s"].sum(),
+        "wall_mean": wall.mean(),
+        "wall_p50": wall.quantile(0.50),
+        "wall_p90": wall.quantile(0.90),
+        "wall_p99": wall.quantile(0.99),
+        "wall_max": wall.max(),
+    })
+    return summary.sort_values("wall_total", ascending=False)
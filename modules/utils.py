@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 
+from modules.finance.statement_frame import StatementFrame
+
 # ------------------------------------------------------------------
 #  Güvenli hücre erişimi: Series   -> ilk eleman
 #                        ndarray   -> ilk eleman
@@ -19,36 +21,77 @@ def safe_float(x):
     return np.nan if pd.isna(x) else float(x)
 # ---------------------------------------------------------------
 
+def radar_by_company(radar: pd.DataFrame, companies=None) -> pd.DataFrame:
+    """Radar tablosunu şirket indeksine çevirir; tekrar eden şirkette ilk satır (tarayıcı gibi).
+    `companies` verilirse o sıraya göre yeniden indekslenir (radar'da olmayan → NaN)."""
+    first = radar.drop_duplicates("Şirket", keep="first").set_index("Şirket")
+    return first if companies is None else first.reindex(companies)
+
+def radar_columns(radar: pd.DataFrame, columns):
+    """Şirket başına ilk radar satırından sayısal sütunlar: (şirketler, {sütun: float dizi}, {sütun: hatalı}).
+    Üçüncü sözlük, dolu olup sayıya çevrilemeyen hücreleri işaretler (tekil kartlarda hata yolu)."""
+    names = radar["Şirket"]
+    keep = (names.notna() & ~names.duplicated()).to_numpy()
+    n = int(keep.sum())
+    values, invalid = {}, {}
+    for col in columns:
+        if col not in radar.columns:
+            values[col], invalid[col] = np.full(n, np.nan), np.zeros(n, dtype=bool)
+            continue
+        raw = radar[col]
+        if pd.api.types.is_numeric_dtype(raw.dtype):
+            # Sayısal sütunda çevrilemeyen hücre olamaz; to_numeric maliyetine gerek yok
+            values[col], invalid[col] = raw.to_numpy(dtype=float)[keep], np.zeros(n, dtype=bool)
+        else:
+            values[col] = radar_numeric(radar, col)[keep]
+            invalid[col] = raw.notna().to_numpy()[keep] & np.isnan(values[col])
+    return pd.Index(names.to_numpy()[keep], name="hisse"), values, invalid
+
+def radar_numeric(radar: pd.DataFrame, column: str) -> np.ndarray:
+    """Radar sütununu float dizi olarak döndürür; sütun yoksa / sayı değilse NaN."""
+    if column not in radar.columns:
+        return np.full(len(radar), np.nan)
+    return pd.to_numeric(radar[column], errors="coerce").to_numpy(dtype=float)
+
 def safe_divide(numerator, denominator):
     if pd.isna(numerator) or pd.isna(denominator) or denominator == 0:
         return 0
     return numerator / denominator
 
+def safe_divide_array(numerator, denominator):
+    """Element-wise `safe_divide`: 0 where either side is NaN or the denominator is 0."""
+    num = np.asarray(numerator, dtype=float)
+    den = np.asarray(denominator, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = num / den
+    return np.where(np.isnan(num) | np.isnan(den) | (den == 0), 0.0, out)
+
 def get_value(df, kalem_adlari, kolon):
     """
     Gerekli kalemi bulur. Eğer 'Hasılat' aranıyorsa, Yurt İçi + Yurt Dışı şeklinde toplar.
+    `df` DataFrame ya da StatementFrame olabilir; DataFrame değiştirilmez.
+    Aynı tablodan çok sayıda okuma yapılacaksa bir kez StatementFrame'e sarın.
     """
     if isinstance(kalem_adlari, str):
         kalem_adlari = [kalem_adlari]
 
-    df["Kalem"] = df["Kalem"].astype(str).str.strip()
+    sf = StatementFrame.of(df)
+    col = sf.period_index[kolon]
 
     for kalem in kalem_adlari:
         if kalem == "Toplam Hasılat":
             # Özel durum: Yurt İçi + Yurt Dışı
-            ic = df[df["Kalem"] == "Yurt İçi Satışlar"][kolon]
-            dis = df[df["Kalem"] == "Yurt Dışı Satışlar"][kolon]
             toplam = 0
-            if not ic.empty:
-                toplam += ic.values[0]
-            if not dis.empty:
-                toplam += dis.values[0]
+            for parca in ("Yurt İçi Satışlar", "Yurt Dışı Satışlar"):
+                pos = sf.position(parca)
+                if pos is not None:
+                    toplam += sf.values[pos, col]
             if toplam > 0:
                 return toplam
 
-        value = df[df["Kalem"] == kalem][kolon]
-        if not value.empty:
-            return value.values[0]
+        pos = sf.position(kalem)
+        if pos is not None:
+            return sf.values[pos, col]
 
     return 0
 
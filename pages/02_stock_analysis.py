@@ -2,9 +2,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from modules.finance.data_loader import load_financial_data
+from modules.finance.data_service import get_financial_data
 from modules.scores import (
-    calculate_scores,
     show_company_scorecard,
     fcf_detailed_analysis,
     fcf_detailed_analysis_plot,
@@ -12,6 +11,8 @@ from modules.scores import (
 )
 from modules.finance.profitability import build_profitability_table, compute_net_profit_cagr
 from modules.finance.dcf import monte_carlo_dcf_simple
+from modules.finance.ttm import get_company_ttm_engine, ttm_free_cash_flow
+from modules.scoring.aggregator import ScoreAggregator
 from modules.utils import period_order
 
 from modules.technical_analysis.cache_manager import get_price_df
@@ -75,11 +76,15 @@ default_symbol = params.get("symbol", "").upper()
 
 @st.cache_data(show_spinner=False)
 def get_scores_cached(symbol, radar_row, balance, income, cashflow, curr, prev):
-    return calculate_scores(symbol, radar_row, balance, income, cashflow, curr, prev)
+    # Tablolar önbellek anahtarına girer (dosya değişince yeniden hesaplanır); skorlar
+    # sayfanın yüklediği tablolar ve başlıkta gösterilen dönemlerle, tarayıcıyla aynı
+    # skorlayıcılardan; kartlar yalnızca Skor Detayları sekmesinde üretilir
+    ctx = ScoreAggregator.context(symbol, radar_row, balance, income, cashflow, curr, prev)
+    return ScoreAggregator.score_context(ctx, scorers=["f_skor", "m_skor", "graham", "lynch"])
 
-@st.cache_data(show_spinner=False)
+# st.cache_data yerine süreç genelindeki servis: dosya değişince (mtime) kendiliğinden yenilenir
 def get_financials(symbol: str):
-    return load_financial_data(symbol)
+    return get_financial_data(symbol)
 
 @st.cache_data(show_spinner=False)
 def get_radar() -> pd.DataFrame:
@@ -95,6 +100,15 @@ def _fmt(val, pattern="{:+.2f}", default="-"):
     except (TypeError, ValueError):
         return default
 
+def _score_metric(label: str, value, out_of: int, caption) -> None:
+    # Hesaplanamayan skor (None) "-" olarak gösterilir
+    if value is None:
+        st.metric(label, "-")
+        st.caption("⚪ Hesaplanamadı")
+        return
+    st.metric(label, f"{value} / {out_of}")
+    st.caption(caption(value))
+
 def format_scores_for_clipboard(data: dict) -> str:
     s = data["scores"]
 
@@ -169,18 +183,21 @@ def main():
             df_price_tech = tech_indicators.get("price_df")
 
 
+        if scores.get("error"):
+            st.warning(f"Bazı skorlar hesaplanamadı: {scores['error']}")
+
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Piotroski F-Skor", f"{scores['f_score']} / 9")
-            st.caption("🟢 Sağlam" if scores["f_score"] >= 7 else "🟡 Orta" if scores["f_score"] >= 4 else "🔴 Zayıf")
+            _score_metric("Piotroski F-Skor", scores["f_skor"], 9,
+                          lambda v: "🟢 Sağlam" if v >= 7 else "🟡 Orta" if v >= 4 else "🔴 Zayıf")
             mskor = scores["m_skor"]
             st.metric("Beneish M-Skor", f"{mskor:.2f}" if mskor is not None else "-")
             st.caption("🟢 Güvenilir" if mskor is not None and mskor < -2.22 else "🔴 Riskli")
         with col2:
-            st.metric("Graham Skor", f"{scores['graham_skor']} / 5")
-            st.caption("🟢 Güçlü" if scores["graham_skor"] >= 4 else "🟡 Sınırlı" if scores["graham_skor"] == 3 else "🔴 Zayıf")
-            st.metric("Peter Lynch Skor", f"{scores['lynch_skor']} / 3")
-            st.caption("🟢 Sağlam" if scores["lynch_skor"] == 3 else "🟡 Orta" if scores["lynch_skor"] == 2 else "🔴 Zayıf")
+            _score_metric("Graham Skor", scores["graham"], 5,
+                          lambda v: "🟢 Güçlü" if v >= 4 else "🟡 Sınırlı" if v == 3 else "🔴 Zayıf")
+            _score_metric("Peter Lynch Skor", scores["lynch"], 3,
+                          lambda v: "🟢 Sağlam" if v == 3 else "🟡 Orta" if v == 2 else "🔴 Zayıf")
 
         # DEĞİŞTİRİLDİ: Yeni sekme eklendi
         tab_score, tab_fcf, tab_valuation, tab_profit, tab_tech = st.tabs([
@@ -215,15 +232,10 @@ def main():
         
         with tab_valuation:
             st.subheader("Monte Carlo Destekli DCF")
-            df_fcf = fcf_detailed_analysis(symbol, radar_row)
-            if df_fcf is None or df_fcf.empty:
+            last_fcf = ttm_free_cash_flow(get_company_ttm_engine(symbol))[0]
+            if np.isnan(last_fcf):
                 st.info("Değerleme için FCF verileri eksik.")
             else:
-                if len(df_fcf) >= 4:
-                    last_fcf = df_fcf["FCF"].iloc[-4:].sum()
-                else:
-                    last_fcf = df_fcf["FCF"].iloc[-1]
-                
                 if last_fcf <= 0:
                     st.warning("Son FCF negatif veya sıfır, değerleme anlamsız.")
                 else:
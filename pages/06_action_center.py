@@ -4,8 +4,8 @@ from config import RADAR_XLSX
 
 # Action modules (our library)
 from modules.page_actions.radar_analysis import run_radar_analysis_workflow,render_analysis_controls
-from modules.page_actions.performance_log import run_performance_log_update
-from modules.page_actions.balance_download import run_balance_download_workflow
+from modules.page_actions.jobs_panel import enqueue_job, render_job_status
+from modules.job_worker import BALANCE_DOWNLOAD, PERFORMANCE_LOG
 
 # Required DB functions
 from modules.db.performance_log import load_performance_log
@@ -27,7 +27,8 @@ with tab1:
     st.header("Calculate & Save Radar Scores")
     st.info(
         "This action calculates fundamental and technical analysis scores and saves the results to the `radar_scores` table. \n\n"
-        "This process may take a few minutes depending on the number of companies."
+        "The scan runs in the background worker (`python -m modules.job_worker`); "
+        "you can leave this page while it runs."
     )
     try:
         df_radar = pd.read_excel(RADAR_XLSX)
@@ -57,20 +58,17 @@ with tab2:
         return df_portfoy, df_log
 
     df_portfoy, df_log = load_log_data()
-    
-    if not df_portfoy.empty:
-        df_portfoy["alis_tarihi"] = pd.to_datetime(df_portfoy["alis_tarihi"])
-        df_portfoy["Hisse"] = df_portfoy["hisse"].str.upper().str.strip()
-    if not df_log.empty:
-        df_log["tarih"] = pd.to_datetime(df_log["tarih"])
-    
-    acik_pozisyonlar = df_portfoy[df_portfoy["satis_fiyat"].isna()] if not df_portfoy.empty else pd.DataFrame()
 
     if st.button("⏱️ Log Missing Weekly Closes", key="run_log_update", type="primary"):
-        run_performance_log_update(acik_pozisyonlar, df_log)
-        # Reload data to show the most up-to-date log after the operation
+        enqueue_job(PERFORMANCE_LOG)
+    render_job_status(PERFORMANCE_LOG)
+
+    if st.button("🔄 Reload Timeline", key="reload_log"):
+        # Reload data to show the most up-to-date log after a finished job
         st.cache_data.clear()
         df_portfoy, df_log = load_log_data()
+    if not df_log.empty:
+        df_log["tarih"] = pd.to_datetime(df_log["tarih"])
 
     st.subheader("📊 Current Performance Timeline")
     if df_log.empty:
@@ -98,7 +96,8 @@ with tab3:
         """
     )
     if st.button("🔽 Download Balances", key="download_balances", type="primary"):
-        run_balance_download_workflow()
+        enqueue_job(BALANCE_DOWNLOAD)
+    render_job_status(BALANCE_DOWNLOAD)
 
     st.markdown("---")
     with st.expander("Page Description and Technical Details"):
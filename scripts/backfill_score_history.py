@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+"""
+Backfills F-Score / M-Score for every consecutive quarter pair of every company
+into score_history (PostgreSQL). Only periods not yet in the table are computed.
+
+Usage:
+  python scripts/backfill_score_history.py          # incremental
+  python scripts/backfill_score_history.py --full   # recompute the whole history
+"""
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from modules.db.score_history import backfill_score_history
+
+if __name__ == "__main__":
+    df = backfill_score_history(full="--full" in sys.argv[1:])
+    print(f"✅ {len(df)} satır yazıldı")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Benchmarks the single-pass Fintables reader against the legacy loader
+(three `pd.read_excel` calls per workbook) on the workbooks under COMPANIES_DIR.
+
+Usage:
+  python scripts/benchmark_fintables_reader.py --limit 300 --engines openpyxl calamine
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from config import COMPANIES_DIR
+from modules.finance.data_loader import load_financial_data
+from modules.finance.fintables_reader import STATEMENT_SHEETS, read_fintables_workbook
+
+
+def legacy_load(path: Path):
+    """Eski `load_financial_data` davranışı: her sayfa için dosya yeniden açılır."""
+    return [pd.read_excel(path, sheet_name=name) for name in STATEMENT_SHEETS]
+
+
+def time_all(label: str, fn, items) -> dict:
+    errors = 0
+    start = time.perf_counter()
+    for item in items:
+        try:
+            fn(item)
+        except Exception:
+            errors += 1
+    total = time.perf_counter() - start
+    return {"yöntem": label, "dosya": len(items), "hata": errors,
+            "toplam_sn": round(total, 3), "dosya_başı_ms": round(1000 * total / max(len(items), 1), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-dir", type=Path, default=Path(COMPANIES_DIR))
+    parser.add_argument("--limit", type=int, default=300)
+    parser.add_argument("--engines", nargs="+", default=["openpyxl", "calamine"])
+    args = parser.parse_args()
+
+    paths = sorted(args.base_dir.glob("*/* (TRY).xlsx"))[: args.limit]
+    if not paths:
+        print(f"❌ {args.base_dir} altında çalışma kitabı bulunamadı.")
+        return
+    symbols = [p.parent.name for p in paths]
+    print(f"⏳ {len(paths)} çalışma kitabı ölçülüyor...")
+
+    results = [time_all("legacy (3× read_excel)", legacy_load, paths)]
+    for engine in args.engines:
+        results.append(time_all(f"tek geçiş ({engine})",
+                                lambda p, e=engine: read_fintables_workbook(p, engine=e), paths))
+
+    # Parquet önbelleği: ilk tur önbelleği doldurur, ikinci tur sıcak okumayı ölçer
+    with tempfile.TemporaryDirectory() as cache_dir:
+        load = lambda s: load_financial_data(s, args.base_dir, cache_dir=Path(cache_dir))
+        results.append(time_all("load_financial_data (soğuk cache)", load, symbols))
+        results.append(time_all("load_financial_data (sıcak cache)", load, symbols))
+
+    df = pd.DataFrame(results)
+    base = df.loc[0, "toplam_sn"]
+    df["hızlanma"] = (base / df["toplam_sn"]).round(1)
+    print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Testler depo kökünden `modules` / `config` paketlerini içe aktarır
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,130 @@
+"""The vectorized `*_frame` scorers must give the scalar scorers' results.
+
+Small synthetic universe: random companies plus edge cases (NaN equity, a
+missing previous period, zero denominators) and radar rows with missing,
+zero, negative and non-numeric cells.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.finance.line_items import resolve_statements
+from modules.finance.statement_frame import StatementFrame
+from modules.finance.universe import CanonicalUniverse
+from modules.scoring import beneish, graham, lynch, piotroski
+
+PERIODS = ["2025/6", "2025/3", "2024/12", "2024/9", "2024/6", "2024/3"]
+CURR, PREV = PERIODS[0], PERIODS[1]
+
+BALANCE_ITEMS = ["Toplam Dönen Varlıklar", "Ticari Alacaklar", "Maddi Duran Varlıklar", "Toplam Varlıklar",
+                 "Toplam Kısa Vadeli Yükümlülükler", "Toplam Uzun Vadeli Yükümlülükler", "Toplam Özkaynaklar"]
+INCOME_ITEMS = ["Satış Gelirleri", "Yurt İçi Satışlar", "Yurt Dışı Satışlar", "Satışların Maliyeti (-)",
+                "Ticari Faaliyetlerden Brüt Kar (Zarar)", "Genel Yönetim Giderleri (-)",
+                "Pazarlama, Satış ve Dağıtım Giderleri (-)", "Dönem Karı (Zararı)"]
+CASHFLOW_ITEMS = ["Dönem Karı (Zararı)", "Amortisman ve İtfa Gideri İle İlgili Düzeltmeler",
+                  "İşletme Faaliyetlerinden Nakit Akışları", "Maddi ve Maddi Olmayan Duran Varlık Alımları"]
+
+
+def _statement(labels, rng, overrides):
+    values = rng.uniform(-2e7, 1e8, size=(len(labels), len(PERIODS)))
+    df = pd.DataFrame(values, columns=PERIODS)
+    df.insert(0, "Kalem", labels)
+    for (label, period), value in overrides.items():
+        if label in labels:
+            df.loc[df["Kalem"] == label, period] = value
+    return df
+
+
+def _company(seed, cells=None):
+    """(bilanço, gelir, nakit akış); `cells`: {(kalem, dönem): değer} üzerine yazılır."""
+    rng = np.random.default_rng(seed)
+    return tuple(_statement(labels, rng, cells or {}) for labels in (BALANCE_ITEMS, INCOME_ITEMS, CASHFLOW_ITEMS))
+
+
+# şirket -> (bilanço, gelir, nakit akış, curr, prev)
+COMPANIES = {f"R{i}": (*_company(i), CURR, PREV) for i in range(8)}
+COMPANIES["NANEQ"] = (*_company(100, cells={("Toplam Özkaynaklar", CURR): np.nan}), CURR, PREV)
+COMPANIES["NOPREV"] = (*_company(101), CURR, "2023/12")
+COMPANIES["ZERO"] = (*_company(102, cells={
+    ("Toplam Varlıklar", PREV): 0.0,
+    ("Satış Gelirleri", CURR): 0.0,
+    ("Yurt İçi Satışlar", CURR): 0.0,
+    ("Yurt Dışı Satışlar", CURR): 0.0,
+    ("Toplam Kısa Vadeli Yükümlülükler", CURR): 0.0,
+}), CURR, PREV)
+
+RADAR_VALUES = [np.nan, None, 0, -5.0, 3.5, 12.0, 1.2, 150.0, 1e6, -1e8, 5e7, 1e9, "abc", "12"]
+RADAR_COLUMNS = list(dict.fromkeys(graham.RADAR_COLUMNS + lynch.RADAR_COLUMNS
+                                   + [piotroski.RADAR_NET_PROFIT, piotroski.RADAR_OPERATING_CF]))
+
+
+def _statement_radar():
+    rng = np.random.default_rng(7)
+    rows = [{"Şirket": c, piotroski.RADAR_NET_PROFIT: rng.uniform(-1e7, 1e7),
+             piotroski.RADAR_OPERATING_CF: rng.uniform(-1e7, 1e7)} for c in COMPANIES]
+    # Sayıya çevrilemeyen, sayı metni ve boş hücreler
+    rows[0][piotroski.RADAR_NET_PROFIT] = "-"
+    rows[1][piotroski.RADAR_OPERATING_CF] = "abc"
+    rows[2][piotroski.RADAR_NET_PROFIT] = "12"
+    rows[3][piotroski.RADAR_OPERATING_CF] = None
+    return pd.DataFrame(rows, dtype=object)
+
+
+def _random_radar(n=400):
+    rng = np.random.default_rng(11)
+    rows = [{"Şirket": f"S{i}", **{col: RADAR_VALUES[rng.integers(len(RADAR_VALUES))] for col in RADAR_COLUMNS}}
+            for i in range(n)]
+    return pd.DataFrame(rows, dtype=object)
+
+
+def _missing(value) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+@pytest.fixture(scope="module")
+def universe():
+    return CanonicalUniverse.from_canonical({c: resolve_statements(b, i, cf)
+                                             for c, (b, i, cf, _, _) in COMPANIES.items()})
+
+
+def _periods():
+    return ({c: v[3] for c, v in COMPANIES.items()}, {c: v[4] for c, v in COMPANIES.items()})
+
+
+def test_piotroski_frame_matches_scalar(universe):
+    radar = _statement_radar()
+    curr, prev = _periods()
+    frame = piotroski.piotroski_frame(universe, radar, curr, prev)
+    for c, (b, i, _, cur, prv) in COMPANIES.items():
+        expected = piotroski.PiotroskiScorer(radar[radar["Şirket"] == c], StatementFrame.of(b),
+                                             StatementFrame.of(i), cur, prv).score()
+        got = frame.at[c, "f_score"]
+        if _missing(expected):
+            assert _missing(got), c
+        else:
+            assert got == expected, c
+
+
+def test_beneish_frame_matches_scalar(universe):
+    curr, prev = _periods()
+    frame = beneish.beneish_frame(universe, curr, prev)
+    for c, (b, i, cf, cur, prv) in COMPANIES.items():
+        expected = beneish.BeneishScorer(c, b, i, cf, cur, prv).score()
+        got = frame.at[c, "m_score"]
+        if _missing(expected):
+            assert _missing(got), c
+        else:
+            assert got == pytest.approx(expected, abs=1e-9), c
+
+
+@pytest.mark.parametrize("frame_fn, column, scorer", [
+    (graham.graham_frame, "graham", graham.GrahamScorer),
+    (lynch.lynch_frame, "lynch", lynch.LynchScorer),
+])
+def test_radar_frames_match_scalar(frame_fn, column, scorer):
+    radar = _random_radar()
+    frame = frame_fn(radar)
+    for c in radar["Şirket"]:
+        row = radar[radar["Şirket"] == c]
+        assert frame.at[c, column] == scorer(row).score(), c
+        assert frame.at[c, column] == scorer(row).calculate()[0], c